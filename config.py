@@ -7,7 +7,7 @@ Bu modül tüm sistem ayarlarını tek bir yerden yönetir.
 import os
 import yaml
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
@@ -18,7 +18,7 @@ load_dotenv()
 @dataclass
 class DatabaseConfig:
     """Veritabanı konfigürasyonu"""
-    # Veritabanı türü: 
+    # Veritabanı türü: "mssql" (SQL Server) veya "sqlite" (WAL modunda, sunucu gerektirmez)
     db_type: str = "mssql"
     
     # SQLite ayarları 
@@ -35,6 +35,23 @@ class DatabaseConfig:
     # Genel ayarlar
     timeout: int = 30
     pool_size: int = 5
+    
+    # Bağlantı havuzu (QueuePool) ayarları
+    pool_max_overflow: int = 10
+    pool_timeout: int = 30  # Boş bağlantı için en fazla bekleme (saniye)
+    pool_recycle_seconds: int = 1800  # Bu süreden eski bağlantılar yenilenir
+    pool_pre_ping: bool = True
+    pool_slow_checkout_ms: int = 500  # Bu süreyi aşan bekleme loglanır
+    
+    # pyodbc fast_executemany: toplu INSERT'ler tek gidiş-dönüşte gönderilir
+    fast_executemany: bool = True
+    
+    # Embedding'ler okunurken sunucudan parça parça çekilen satır sayısı
+    fetch_chunk_size: int = 2048
+    
+    # Bu süreden eski silme kayıtları (embedding_tombstones) açılışta temizlenir; daha eski
+    # token'la gelen okuyucu tam yeniden yüklemeye döner (0 = temizleme kapalı)
+    tombstone_retention_days: int = 30
     backup_enabled: bool = True
     backup_interval_hours: int = 24
     backup_directory: str = "backups"
@@ -43,6 +60,13 @@ class DatabaseConfig:
     connection_string: Optional[str] = None
     trust_server_certificate: bool = True
     encrypt: bool = False
+    
+    # face_embeddings.embedding blob formatı: "pickle" (eski), "float32", "float16", "int8"
+    embedding_blob_format: str = "float32"
+    
+    # Başlıksız eski pickle blob'ları (kısıtlı unpickler ile) okunur mu; embedding_migration
+    # tüm satırları çevirdikten sonra False yapılmalı
+    allow_legacy_pickle_blobs: bool = True
 
 @dataclass
 class APIConfig:
@@ -79,6 +103,34 @@ class AIModelConfig:
     face_recognition_threshold: float = 0.55
     face_quality_threshold: float = 0.60
     
+    # Grup fotoğrafları (en az group_photo_face_count yüz) daha toleranslı eşikle tanınır
+    group_photo_face_count: int = 5
+    group_recognition_threshold: float = 0.25
+    
+    # Yüklenecek InsightFace modülleri (buffalo_l: detection, recognition, landmark_2d_106,
+    # landmark_3d_68, genderage). Sistem yalnızca bbox, 106 nokta, embedding ve det_score kullanır;
+    # boş liste = paketteki tüm modüller
+    face_analysis_modules: List[str] = field(default_factory=lambda: ["detection", "recognition", "landmark_2d_106"])
+    
+    # Yaklaşık en yakın komşu (ANN) araması - büyük galeriler için IVF-flat indeks
+    ann_enabled: bool = False
+    ann_min_gallery_size: int = 20000
+    ann_n_lists: int = 0  # 0 = otomatik (4 * sqrt(N))
+    ann_n_probe: int = 16
+    
+    # İki aşamalı eşleşme: prototipi en yakın K öğrenci (0 = kapalı, tam arama)
+    student_shortlist_k: int = 0
+    
+    # Grup fotoğraflarında yüz→öğrenci birebir atama yöntemi: "none" (kapalı, yüz başına eşleşme),
+    # "hungarian" veya "greedy"
+    face_assignment_method: str = "none"
+    
+    # Bellekteki galeri matrisinin türü: "float32", "float16", "int8"
+    gallery_dtype: str = "float32"
+    
+    # Açılışta galeriyi cache dizinindeki bellek eşlemeli anlık görüntüden yükle
+    gallery_snapshot_enabled: bool = True
+    
     # Model indirilecek URL'ler
     model_urls: Dict[str, str] = field(default_factory=lambda: {
         "buffalo_l": "https://github.com/deepinsight/insightface/releases/download/v0.7/buffalo_l.zip",
@@ -88,6 +140,10 @@ class AIModelConfig:
     batch_size: int = 1
     num_threads: int = 4
     memory_limit_gb: int = 4
+    
+    # Toplu kayıt/tanıma süreç havuzu (worker_farm.py); her süreç modelleri bir kez yükler
+    worker_processes: int = 0  # 0 = otomatik (çekirdek sayısı / worker_onnx_threads)
+    worker_onnx_threads: int = 1  # Süreç başına ONNX iş parçacığı (aşırı abonelik olmasın)
 
 @dataclass
 class EmotionConfig:
@@ -133,8 +189,13 @@ class PhotoConfig:
     """Fotoğraf işleme konfigürasyonu"""
     photos_directory: str = "photos"
     temp_directory: str = "temp"
+    # Yüz tespiti uzun kenarı bu değeri aşan fotoğrafları küçültülmüş kopya üzerinde yapar (0 = kapalı)
     max_photo_dimension: int = 1920
     jpeg_quality: int = 95
+    # Son çözülen fotoğraf sayısı (tespit/kalite/duygu aynı fotoğrafı yeniden çözmez; 0 = kapalı)
+    decoded_image_cache_size: int = 4
+    # Toplu tespitte sonraki fotoğrafları önceden çözen iş parçacığı sayısı (0 = sıralı)
+    decode_prefetch_workers: int = 2
     
     auto_cleanup_temp: bool = True
     temp_file_max_age_hours: int = 24
@@ -415,12 +476,23 @@ class ConfigManager:
             "": None,
             
             "database": {
+                "db_type": "mssql",
                 "path": "face_recognition.db",
                 "timeout": 30,
                 "pool_size": 5,
+                "pool_max_overflow": 10,
+                "pool_timeout": 30,
+                "pool_recycle_seconds": 1800,
+                "pool_pre_ping": True,
+                "pool_slow_checkout_ms": 500,
+                "fast_executemany": True,
+                "fetch_chunk_size": 2048,
+                "tombstone_retention_days": 30,
                 "backup_enabled": True,
                 "backup_interval_hours": 24,
-                "backup_directory": "backups"
+                "backup_directory": "backups",
+                "embedding_blob_format": "float32",
+                "allow_legacy_pickle_blobs": True
             },
             
             "api": {
@@ -446,9 +518,22 @@ class ConfigManager:
                 "face_detection_threshold": 0.5,
                 "face_recognition_threshold": 0.55,
                 "face_quality_threshold": 0.60,
+                "group_photo_face_count": 5,
+                "group_recognition_threshold": 0.25,
+                "face_analysis_modules": ["detection", "recognition", "landmark_2d_106"],
+                "ann_enabled": False,
+                "ann_min_gallery_size": 20000,
+                "ann_n_lists": 0,
+                "ann_n_probe": 16,
+                "student_shortlist_k": 0,
+                "face_assignment_method": "none",
+                "gallery_dtype": "float32",
+                "gallery_snapshot_enabled": True,
                 "batch_size": 1,
                 "num_threads": 4,
-                "memory_limit_gb": 4
+                "memory_limit_gb": 4,
+                "worker_processes": 0,
+                "worker_onnx_threads": 1
             },
             
             "photos": {
@@ -456,6 +541,8 @@ class ConfigManager:
                 "temp_directory": "temp",
                 "max_photo_dimension": 1920,
                 "jpeg_quality": 95,
+                "decoded_image_cache_size": 4,
+                "decode_prefetch_workers": 2,
                 "auto_cleanup_temp": True,
                 "temp_file_max_age_hours": 24,
                 "quality_criteria": {
@@ -515,13 +602,19 @@ class ConfigManager:
                     yaml_content.append("")
             else:
                 yaml_content.append(f"{key}:")
-                yaml_content.append(yaml.dump(value, default_flow_style=False, indent=2).rstrip())
+                dumped = yaml.dump(value, default_flow_style=False, indent=2, allow_unicode=True).rstrip()
+                yaml_content.append("\n".join(f"  {line}" for line in dumped.splitlines()))
                 yaml_content.append("")
         
         with open(path, 'w', encoding='utf-8') as f:
             
-            content = """# OKULDAN Yüz Tanıma Sistemi - Konfigürasyon Dosyası
-# Bu dosyayı config.yaml olarak kopyalayın
+            f.write("\n".join(yaml_content))
+        
+        print(f"Örnek konfigürasyon dosyası oluşturuldu: {path}")
+
+# Global config instance
+config: Optional[ConfigManager] = None
+
 def get_config() -> ConfigManager:
     """Global config instance'ını döndürür"""
     global config
@@ -1,19 +1,25 @@
 #!/usr/bin/env python3
 """
-OKULDAN Yüz Tanıma Sistemi - MSSQL Veritabanı Yöneticisi
+OKULDAN Yüz Tanıma Sistemi - Veritabanı Yöneticisi (MSSQL / SQLite)
 """
 
-import pyodbc
-import pymssql
 import numpy as np
-import pickle
 import os
 import json
+import time
 import logging
-from typing import List, Tuple, Optional, Dict, Union
-from urllib.parse import quote_plus
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import StaticPool
+import threading
+from typing import Iterator, List, Tuple, Optional, Dict, Union
+from sqlalchemy import create_engine, text, exc
+from sqlalchemy.pool import QueuePool
+
+from embedding_cache import EmbeddingCache
+from embedding_gallery import ChangeToken, EmbeddingChanges, EmbeddingGallery, EmbeddingRows
+from embedding_codec import encode_embedding, decode_embedding, decode_embedding_into
+from db_dialects import get_dialect
+from schema_migrations import migrate
+from quality_statistics import (add_quality_buckets, collect_quality_buckets, format_quality_statistics,
+                                quality_buckets_from_scores, remove_quality_buckets)
 
 # Config sistemi import
 try:
@@ -25,6 +31,7 @@ except ImportError:
     CONFIG_AVAILABLE = False
     class DefaultDBConfig:
         db_type = "mssql"
+        path = "face_recognition_test.db"
         server = "localhost"
         database = "FaceRecognition_TestDB"
         username = ""
@@ -37,12 +44,59 @@ except ImportError:
         connection_string = None
         trust_server_certificate = True
         encrypt = False
+        embedding_blob_format = "float32"
+        allow_legacy_pickle_blobs = True
+        pool_size = 5
+        pool_max_overflow = 10
+        pool_timeout = 30
+        pool_recycle_seconds = 1800
+        pool_pre_ping = True
+        pool_slow_checkout_ms = 500
+        fast_executemany = True
+        fetch_chunk_size = 2048
+        tombstone_retention_days = 30
     
     db_config = DefaultDBConfig()
 
+class ConnectionPoolMetrics:
+    """Bağlantı havuzu checkout sayısı, bekleme süreleri ve zaman aşımlarını izler (thread-safe)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+        self.peak_checked_out = 0
+    
+    def record_checkout(self, wait_seconds: float, checked_out: int, slow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait_seconds
+            self.max_wait = max(self.max_wait, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if slow:
+                self.slow_checkouts += 1
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'slow_checkouts': self.slow_checkouts,
+                'avg_wait_ms': (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+                'peak_checked_out': self.peak_checked_out
+            }
+
 class DatabaseManager:
     def __init__(self, connection_params: Optional[Union[Dict, str]] = None):
-        """MSSQL Veritabanı yöneticisini başlatır"""
+        """Veritabanı yöneticisini başlatır (DatabaseConfig.db_type: "mssql" veya "sqlite")"""
         
         self.logger = logging.getLogger(__name__)
         
@@ -50,21 +104,27 @@ class DatabaseManager:
             if isinstance(connection_params, str):
                 self.connection_params = self._get_connection_params_from_config()
                 print(f"String db_path kullanımı deprecated: {connection_params}")
-                print("Config sisteminden MSSQL ayarları kullanılıyor...")
+                print("Config sisteminden veritabanı ayarları kullanılıyor...")
             else:
                 self.connection_params = connection_params
         else:
             self.connection_params = self._get_connection_params_from_config()
         
+        self.dialect = get_dialect(self.connection_params.get('db_type', 'mssql'))
+        self.pool_metrics = ConnectionPoolMetrics()
         self.engine = self._create_engine()
+        self.embedding_cache = EmbeddingCache(self)
         
-        print(f"Veritabanı: MSSQL ({self.connection_params['server']}/{self.connection_params['database']})")
+        print(f"Veritabanı: {self.dialect.describe(self.connection_params)}")
         print(f"Timeout: {self.connection_params['timeout']}s")
+        print(f"Bağlantı havuzu: {self.connection_params.get('pool_size', 5)} (+{self.connection_params.get('pool_max_overflow', 10)} taşma)")
         print(f"Backup: {'Etkin' if self.connection_params['backup_enabled'] else 'Devre dışı'}")
         
         self.init_database()
     
     def _get_connection_params_from_config(self) -> Dict:
+        db_type = os.getenv('DB_TYPE', db_config.db_type if CONFIG_AVAILABLE else 'mssql')
+        path = os.getenv('DB_PATH', db_config.path if CONFIG_AVAILABLE else 'face_recognition_test.db')
         server = os.getenv('DB_SERVER', db_config.server if CONFIG_AVAILABLE else 'localhost')
         database = os.getenv('DB_DATABASE', db_config.database if CONFIG_AVAILABLE else 'FaceRecognitionDB')
         username = os.getenv('DB_USERNAME', db_config.username if CONFIG_AVAILABLE else '')
@@ -73,6 +133,8 @@ class DatabaseManager:
         driver = os.getenv('DB_DRIVER', db_config.driver if CONFIG_AVAILABLE else 'ODBC Driver 17 for SQL Server')
         
         return {
+            'db_type': db_type,
+            'path': path,
             'server': server,
             'database': database,
             'username': username,
@@ -84,155 +146,125 @@ class DatabaseManager:
             'backup_directory': db_config.backup_directory if CONFIG_AVAILABLE else 'backups',
             'connection_string': db_config.connection_string if CONFIG_AVAILABLE else None,
             'trust_server_certificate': db_config.trust_server_certificate if CONFIG_AVAILABLE else True,
-            'encrypt': db_config.encrypt if CONFIG_AVAILABLE else False
+            'encrypt': db_config.encrypt if CONFIG_AVAILABLE else False,
+            'embedding_blob_format': db_config.embedding_blob_format if CONFIG_AVAILABLE else 'float32',
+            'allow_legacy_pickle_blobs': db_config.allow_legacy_pickle_blobs if CONFIG_AVAILABLE else True,
+            'pool_size': db_config.pool_size if CONFIG_AVAILABLE else 5,
+            'pool_max_overflow': db_config.pool_max_overflow if CONFIG_AVAILABLE else 10,
+            'pool_timeout': db_config.pool_timeout if CONFIG_AVAILABLE else 30,
+            'pool_recycle_seconds': db_config.pool_recycle_seconds if CONFIG_AVAILABLE else 1800,
+            'pool_pre_ping': db_config.pool_pre_ping if CONFIG_AVAILABLE else True,
+            'pool_slow_checkout_ms': db_config.pool_slow_checkout_ms if CONFIG_AVAILABLE else 500,
+            'fast_executemany': db_config.fast_executemany if CONFIG_AVAILABLE else True,
+            'fetch_chunk_size': db_config.fetch_chunk_size if CONFIG_AVAILABLE else 2048,
+            'tombstone_retention_days': db_config.tombstone_retention_days if CONFIG_AVAILABLE else 30
         }
     
     def _create_engine(self):
         """SQLAlchemy engine'i oluşturur"""
         try:
-            if self.connection_params['connection_string']:
-                connection_string = self.connection_params['connection_string']
-            else:
-                if self.connection_params['username'] and self.connection_params['password']:
-                    connection_string = (
-                        f"mssql+pyodbc://{quote_plus(self.connection_params['username'])}:"
-                        f"{quote_plus(self.connection_params['password'])}@"
-                        f"{self.connection_params['server']}:{self.connection_params['port']}/"
-                        f"{self.connection_params['database']}"
-                        f"?driver={quote_plus(self.connection_params['driver'])}"
-                        f"&TrustServerCertificate={'yes' if self.connection_params['trust_server_certificate'] else 'no'}"
-                        f"&Encrypt={'yes' if self.connection_params['encrypt'] else 'no'}"
-                    )
-                else:
-                    connection_string = (
-                        f"mssql+pyodbc://@{self.connection_params['server']}:{self.connection_params['port']}/"
-                        f"{self.connection_params['database']}"
-                        f"?driver={quote_plus(self.connection_params['driver'])}"
-                        f"&Trusted_Connection=yes"
-                        f"&TrustServerCertificate={'yes' if self.connection_params['trust_server_certificate'] else 'no'}"
-                        f"&Encrypt={'yes' if self.connection_params['encrypt'] else 'no'}"
-                    )
-            
+            # GUI birden fazla thread'den DB çağrısı yapar; her thread havuzdan kendi bağlantısını alır
             engine = create_engine(
-                connection_string,
-                poolclass=StaticPool,
-                echo=False  
+                self.dialect.connection_url(self.connection_params),
+                poolclass=QueuePool,
+                pool_size=self.connection_params.get('pool_size', 5),
+                max_overflow=self.connection_params.get('pool_max_overflow', 10),
+                pool_timeout=self.connection_params.get('pool_timeout', 30),
+                pool_recycle=self.connection_params.get('pool_recycle_seconds', 1800),
+                pool_pre_ping=self.connection_params.get('pool_pre_ping', True),
+                echo=False,
+                **self.dialect.engine_options(self.connection_params)
             )
-            
+            self.dialect.configure_engine(engine, self.connection_params)
             
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
             
-            self.logger.info(f"MSSQL bağlantısı başarılı: {self.connection_params['server']}/{self.connection_params['database']}")
+            self.logger.info(f"Veritabanı bağlantısı başarılı: {self.dialect.describe(self.connection_params)}")
             return engine
             
         except Exception as e:
-            self.logger.error(f"MSSQL bağlantı hatası: {e}")
+            self.logger.error(f"Veritabanı bağlantı hatası: {e}")
             raise
     
     def get_connection(self):
-        """Yeni bağlantı döndürür"""
-        return self.engine.connect()
+        """Havuzdan bağlantı alır; bekleme süresi ve zaman aşımları metriklere yazılır"""
+        start_time = time.perf_counter()
+        try:
+            conn = self.engine.connect()
+        except exc.TimeoutError:
+            self.pool_metrics.record_timeout()
+            self.logger.error(f"Bağlantı havuzu zaman aşımı: {self.engine.pool.status()}")
+            raise
+        
+        wait_seconds = time.perf_counter() - start_time
+        slow = wait_seconds * 1000 >= self.connection_params.get('pool_slow_checkout_ms', 500)
+        self.pool_metrics.record_checkout(wait_seconds, self.engine.pool.checkedout(), slow)
+        if slow:
+            self.logger.warning(f"Yavaş bağlantı alımı ({wait_seconds * 1000:.0f} ms): {self.engine.pool.status()}")
+        return conn
+    
+    def get_pool_stats(self) -> Dict:
+        """
+        Bağlantı havuzunun anlık durumu ve birikimli metrikleri
+        Havuz darboğaz mı: timeouts > 0 veya max_wait_ms yüksekse pool_size / pool_max_overflow artırılmalı
+        """
+        pool = self.engine.pool
+        stats = self.pool_metrics.snapshot()
+        stats.update({
+            'pool_size': pool.size(),
+            'max_overflow': self.connection_params.get('pool_max_overflow', 10),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow()
+        })
+        return stats
     
     def init_database(self):
-        """Veritabanını oluşturur ve tabloları hazırlar"""
+        """Veritabanını oluşturur ve bekleyen şema göçlerini uygular (şema güncelse yalnızca sürüm kontrolü)"""
         if self.connection_params['backup_enabled']:
             os.makedirs(self.connection_params['backup_directory'], exist_ok=True)
         
         with self.get_connection() as conn:
-            # Öğrenci tablosu
-            conn.execute(text('''
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='students' AND xtype='U')
-                CREATE TABLE students (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    name NVARCHAR(255) NOT NULL,
-                    student_id NVARCHAR(100) UNIQUE NOT NULL,
-                    student_class NVARCHAR(50),
-                    photo_count INT DEFAULT 0,
-                    created_at DATETIME2 DEFAULT GETDATE()
-                )
-            '''))
-            
-            # Yüz embedding tablosu
-            conn.execute(text('''
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='face_embeddings' AND xtype='U')
-                CREATE TABLE face_embeddings (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    student_id INT,
-                    embedding VARBINARY(MAX) NOT NULL,
-                    photo_path NVARCHAR(500),
-                    quality_score FLOAT,
-                    quality_details NVARCHAR(MAX),
-                    quality_report NVARCHAR(MAX),
-                    created_at DATETIME2 DEFAULT GETDATE(),
-                    FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
-                )
-            '''))
-            
-            # Başarısız kayıtlar tablosu
-            conn.execute(text('''
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='failed_registrations' AND xtype='U')
-                CREATE TABLE failed_registrations (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    student_name NVARCHAR(255) NOT NULL,
-                    student_id NVARCHAR(100) NOT NULL,
-                    student_class NVARCHAR(50),
-                    photo_path NVARCHAR(500),
-                    quality_score FLOAT,
-                    quality_details NVARCHAR(MAX),
-                    quality_report NVARCHAR(MAX),
-                    failure_reason NVARCHAR(MAX),
-                    created_at DATETIME2 DEFAULT GETDATE()
-                )
-            '''))
-            
-
-            self._add_missing_columns(conn)
-            
-            conn.commit()
+            self.schema_version = migrate(conn, self.dialect, self.logger)
+        
+        self.prune_embedding_tombstones()
     
-    def _add_missing_columns(self, conn):
-        """Eksik olan alanları güvenli bir şekilde ekler"""
-        try:
-            result = conn.execute(text("""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_NAME = 'face_embeddings' AND COLUMN_NAME = 'quality_details'
-            """))
-            if result.scalar() == 0:
-                conn.execute(text("ALTER TABLE face_embeddings ADD quality_details NVARCHAR(MAX)"))
-                self.logger.info("quality_details alanı eklendi")
-            
-            result = conn.execute(text("""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_NAME = 'face_embeddings' AND COLUMN_NAME = 'quality_report'
-            """))
-            if result.scalar() == 0:
-                conn.execute(text("ALTER TABLE face_embeddings ADD quality_report NVARCHAR(MAX)"))
-                self.logger.info("quality_report alanı eklendi")
-            
-            result = conn.execute(text("""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_NAME = 'students' AND COLUMN_NAME = 'student_class'
-            """))
-            if result.scalar() == 0:
-                conn.execute(text("ALTER TABLE students ADD student_class NVARCHAR(50)"))
-                self.logger.info("student_class alanı eklendi")
-                
-        except Exception as e:
-            self.logger.warning(f"Migration uyarısı: {e}")
+    def prune_embedding_tombstones(self, retention_days: Optional[int] = None) -> int:
+        """
+        Saklama süresinden eski silme kayıtlarını temizler; silinen kayıt sayısını döndürür
+        En yeni kayıt her zaman tutulur: daha eski bir token'la gelen okuyucu, kalan en küçük
+        id'ye bakarak kayıp silmeleri fark eder ve tam yeniden yüklemeye döner.
+        """
+        if retention_days is None:
+            retention_days = self.connection_params.get('tombstone_retention_days', 30)
+        if not retention_days or retention_days <= 0:
+            return 0
+        
+        with self.get_connection() as conn:
+            try:
+                result = conn.execute(text(f'''
+                    DELETE FROM embedding_tombstones
+                    WHERE deleted_at < {self.dialect.days_ago_sql()}
+                      AND id < (SELECT MAX(id) FROM embedding_tombstones)
+                '''), {'days': int(retention_days)})
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self.logger.error(f"Silme kayıtları temizlenemedi: {e}")
+                return 0
+        
+        if result.rowcount:
+            self.logger.info(f"{result.rowcount} eski silme kaydı temizlendi")
+        return max(result.rowcount, 0)
     
     def add_student(self, name: str, student_id: str, student_class: str = None) -> int:
         """Yeni öğrenci ekler"""
         with self.get_connection() as conn:
             try:
-                result = conn.execute(text("""
-                    INSERT INTO students (name, student_id, student_class) 
-                    OUTPUT INSERTED.id
-                    VALUES (:name, :student_id, :student_class)
-                """), {
+                result = conn.execute(text(self.dialect.insert_returning_id(
+                    'students', ['name', 'student_id', 'student_class']
+                )), {
                     'name': name,
                     'student_id': student_id,
                     'student_class': student_class
@@ -249,61 +281,389 @@ class DatabaseManager:
     def add_face_embedding(self, student_pk: int, embedding: np.ndarray, 
                           photo_path: str, quality_score: float, 
                           quality_details: Dict = None, quality_report: str = None):
-        """Yüz embedding'i, detaylı kalite analizini ve formatlanmış raporu ekler"""
+        """
+        Yüz embedding'i, detaylı kalite analizini ve formatlanmış raporu ekler
+        Öğrencinin sınıfı ve sunucu zamanı fotoğraf sayısı güncellenirken alınır; embedding bu
+        zamanla yazıldığından kalite dilimi eklenen satır geri okunmadan skordan hesaplanır.
+        """
         with self.get_connection() as conn:
             try:
-                embedding_blob = pickle.dumps(embedding)
+                student = conn.execute(text(self.dialect.update_returning(
+                    'students', "photo_count = photo_count + 1", "id = :student_id",
+                    ['student_class'], with_timestamp=True
+                )), {'student_id': student_pk}).fetchone()
+                if student is None:
+                    raise ValueError(f"Öğrenci bulunamadı: {student_pk}")
+                student_class, created_at = student
                 
-                quality_details_json = None
-                if quality_details:
-                    try:
-                        quality_details_json = json.dumps(quality_details, ensure_ascii=False, indent=2)
-                    except (TypeError, ValueError) as e:
-                        self.logger.warning(f"Kalite detayları JSON'a çevrilemedi: {e}")
-                        quality_details_json = None
+                embedding_id = conn.execute(text(self.dialect.insert_returning_id(
+                    'face_embeddings', self.EMBEDDING_COLUMNS + ['created_at']
+                )), dict(self._embedding_params(student_pk, embedding, photo_path, quality_score),
+                         created_at=created_at)).scalar()
                 
-                conn.execute(text('''
-                    INSERT INTO face_embeddings 
-                    (student_id, embedding, photo_path, quality_score, quality_details, quality_report) 
-                    VALUES (:student_id, :embedding, :photo_path, :quality_score, :quality_details, :quality_report)
-                '''), {
-                    'student_id': student_pk,
-                    'embedding': embedding_blob,
-                    'photo_path': photo_path,
-                    'quality_score': quality_score,
-                    'quality_details': quality_details_json,
-                    'quality_report': quality_report
-                })
+                quality_params = self._quality_params(embedding_id, quality_details, quality_report)
+                if quality_params:
+                    conn.execute(self._insert_quality_sql(), quality_params)
                 
-                conn.execute(text('''
-                    UPDATE students 
-                    SET photo_count = photo_count + 1 
-                    WHERE id = :student_id
-                '''), {'student_id': student_pk})
+                add_quality_buckets(conn, self.dialect, quality_buckets_from_scores(
+                    student_class, self.dialect.date_value(created_at), [quality_score]
+                ))
                 
                 conn.commit()
+                self.embedding_cache.mark_stale()
                 
             except Exception as e:
                 conn.rollback()
                 self.logger.error(f"Embedding ekleme hatası: {e}")
                 raise
     
+    def register_student_bulk(self, name: str, student_id: str, student_class: str,
+                              photos: List[Tuple[np.ndarray, str, float, Optional[Dict], Optional[str]]]) -> int:
+        """
+        Öğrenciyi ve tüm fotoğraf embedding'lerini tek bir işlemde kaydeder
+        Sabit sayıda ifade, her biri tek gidiş-dönüş: öğrenci INSERT'i (id ve sunucu zamanı döner),
+        embedding'ler için tek executemany, kalite satırları için tek executemany ve kalite dilimi
+        upsert'i. Kalite satırları embedding'e (student_id, photo_path) anahtarıyla INSERT ... SELECT
+        içinde bağlanır; id'ler geri okunmaz ve sırayla eşlenmez. Embedding'ler bu sunucu zamanı
+        created_at olarak yazıldığından kalite dilimi bellekteki skorlardan hesaplanır.
+        Fotoğraf yolları tekil değilse embedding'ler tek tek eklenip id'leri INSERT'ten alınır.
+        Herhangi bir hata olursa öğrenci de dahil hiçbir şey kaydedilmez.
+        photos: [(embedding, photo_path, quality_score, quality_details, quality_report), ...]
+        Returns: Öğrencinin primary key'i
+        """
+        with self.get_connection() as conn:
+            try:
+                student_pk, created_at = conn.execute(text(self.dialect.insert_returning_id(
+                    'students', ['name', 'student_id', 'student_class', 'photo_count'], with_timestamp=True
+                )), {
+                    'name': name,
+                    'student_id': student_id,
+                    'student_class': student_class,
+                    'photo_count': len(photos)
+                }).fetchone()
+                
+                if photos:
+                    embedding_rows = [
+                        dict(self._embedding_params(student_pk, *photo[:3]), created_at=created_at)
+                        for photo in photos
+                    ]
+                    photo_paths = [photo[1] for photo in photos]
+                    if None not in photo_paths and len(set(photo_paths)) == len(photo_paths):
+                        conn.execute(self._insert_embedding_sql(), embedding_rows)
+                        quality_rows = []
+                        for photo in photos:
+                            quality_params = self._quality_params(None, *photo[3:5])
+                            if quality_params:
+                                del quality_params['embedding_id']
+                                quality_params.update(student_id=student_pk, photo_path=photo[1])
+                                quality_rows.append(quality_params)
+                        if quality_rows:
+                            conn.execute(self._insert_quality_by_photo_sql(), quality_rows)
+                    else:
+                        insert_sql = text(self.dialect.insert_returning_id(
+                            'face_embeddings', self.EMBEDDING_COLUMNS + ['created_at']
+                        ))
+                        for row, photo in zip(embedding_rows, photos):
+                            quality_params = self._quality_params(
+                                conn.execute(insert_sql, row).scalar(), *photo[3:5]
+                            )
+                            if quality_params:
+                                conn.execute(self._insert_quality_sql(), quality_params)
+                    
+                    add_quality_buckets(conn, self.dialect, quality_buckets_from_scores(
+                        student_class, self.dialect.date_value(created_at), [photo[2] for photo in photos]
+                    ))
+                
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                if "UNIQUE" in str(e) or "duplicate" in str(e).lower():
+                    raise ValueError(f"Öğrenci ID '{student_id}' zaten mevcut!")
+                self.logger.error(f"Toplu öğrenci kaydı hatası: {e}")
+                raise
+        
+        self.embedding_cache.mark_stale()
+        return student_pk
+    
+    # face_embeddings dar tutulur (galeri taraması için); kalite JSON'u ve raporu face_embedding_quality'de
+    EMBEDDING_COLUMNS = ['student_id', 'embedding', 'photo_path', 'quality_score']
+    
+    @staticmethod
+    def _insert_embedding_sql():
+        return text('''
+            INSERT INTO face_embeddings 
+            (student_id, embedding, photo_path, quality_score, created_at) 
+            VALUES (:student_id, :embedding, :photo_path, :quality_score, :created_at)
+        ''')
+    
+    @staticmethod
+    def _insert_quality_sql():
+        return text('''
+            INSERT INTO face_embedding_quality 
+            (embedding_id, quality_details, quality_report) 
+            VALUES (:embedding_id, :quality_details, :quality_report)
+        ''')
+    
+    @staticmethod
+    def _insert_quality_by_photo_sql():
+        # Embedding id'si aynı işlemde eklenen satırdan (student_id, photo_path) ile alınır
+        return text('''
+            INSERT INTO face_embedding_quality 
+            (embedding_id, quality_details, quality_report) 
+            SELECT id, :quality_details, :quality_report 
+            FROM face_embeddings 
+            WHERE student_id = :student_id AND photo_path = :photo_path
+        ''')
+    
+    def _embedding_params(self, student_pk: int, embedding: np.ndarray, photo_path: str,
+                          quality_score: float) -> Dict:
+        """face_embeddings INSERT parametrelerini hazırlar (blob kodlama)"""
+        return {
+            'student_id': student_pk,
+            'embedding': encode_embedding(embedding, self.connection_params.get('embedding_blob_format', 'float32')),
+            'photo_path': photo_path,
+            'quality_score': quality_score
+        }
+    
+    def _quality_params(self, embedding_id: int, quality_details: Dict = None,
+                        quality_report: str = None) -> Optional[Dict]:
+        """face_embedding_quality INSERT parametreleri (kalite bilgisi yoksa None)"""
+        quality_details_json = self._quality_details_json(quality_details)
+        if quality_details_json is None and not quality_report:
+            return None
+        return {
+            'embedding_id': embedding_id,
+            'quality_details': quality_details_json,
+            'quality_report': quality_report
+        }
+    
+    def _quality_details_json(self, quality_details: Dict = None) -> Optional[str]:
+        """Kalite detaylarını kompakt JSON'a çevirir (girintisiz, ayırıcılarda boşluksuz)"""
+        if not quality_details:
+            return None
+        try:
+            return json.dumps(quality_details, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Kalite detayları JSON'a çevrilemedi: {e}")
+            return None
+    
     def get_all_embeddings(self) -> List[Tuple[int, str, np.ndarray]]:
-        """Tüm embedding'leri döndürür"""
+        """
+        Tüm embedding'leri döndürür
+        Satırlar tek bir matrise akıtılır; dönen embedding'ler bu matrisin satır görünümleridir.
+        """
+        rows = self.get_embedding_arrays_since(0)
+        return list(zip(rows.student_ids.tolist(), rows.names.tolist(), rows.matrix))
+    
+    def iter_embedding_chunks(self, last_embedding_id: int = 0,
+                              chunk_size: Optional[int] = None) -> Iterator[EmbeddingRows]:
+        """
+        Filigrandan sonraki embedding'leri id sırasıyla parça parça akıtır
+        Sunucu tarafı imleçle (yield_per) en fazla chunk_size satır bellekte tutulur;
+        her parça ilk satırlar gelir gelmez üretilir.
+        """
+        allow_pickle = self.connection_params.get('allow_legacy_pickle_blobs', True)
+        for rows in self._stream_embedding_rows(last_embedding_id, None, chunk_size):
+            matrix = np.empty((len(rows), decode_embedding(rows[0][4], allow_pickle).size), dtype=np.float32)
+            for i, row in enumerate(rows):
+                decode_embedding_into(row[4], matrix[i], allow_pickle)
+            yield EmbeddingRows(
+                np.array([row[0] for row in rows], dtype=np.int64),
+                np.array([row[1] for row in rows], dtype=np.int64),
+                np.array([row[2] for row in rows], dtype=object),
+                np.array([row[3] for row in rows], dtype=object),
+                matrix
+            )
+    
+    def get_embedding_arrays_since(self, last_embedding_id: int = 0,
+                                   chunk_size: Optional[int] = None,
+                                   below_embedding_id: Optional[int] = None) -> EmbeddingRows:
+        """
+        Filigrandan sonraki embedding'leri sütun dizileri olarak döndürür
+        Satır sayısı önce alınır, matris bir kez ayrılır ve her parça doğrudan
+        matrisin ilgili dilimine çözülür (satır başına ara liste/dizi oluşturulmaz).
+        below_embedding_id verilirse yalnızca bu id'den küçük satırlar okunur.
+        """
+        upper_bound = "AND f.id < :below_id" if below_embedding_id is not None else ""
+        with self.get_connection() as conn:
+            count, max_id = conn.execute(text(f'''
+                SELECT COUNT(*), MAX(f.id)
+                FROM face_embeddings f
+                INNER JOIN students s ON s.id = f.student_id
+                WHERE f.id > :last_id {upper_bound}
+            '''), {'last_id': last_embedding_id, 'below_id': below_embedding_id}).fetchone()
+        
+        if not count:
+            return EmbeddingRows.from_records([])
+        
+        row_ids = np.empty(count, dtype=np.int64)
+        student_ids = np.empty(count, dtype=np.int64)
+        names = np.empty(count, dtype=object)
+        student_classes = np.empty(count, dtype=object)
+        matrix = None
+        filled = 0
+        allow_pickle = self.connection_params.get('allow_legacy_pickle_blobs', True)
+        
+        # Sayımdan sonra eklenen satırlar bir sonraki artımlı yenilemeye kalır
+        for rows in self._stream_embedding_rows(last_embedding_id, max_id, chunk_size):
+            rows = rows[:count - filled]
+            for offset, (row_id, student_pk, name, student_class, embedding_blob) in enumerate(rows, filled):
+                if matrix is None:
+                    matrix = np.empty((count, decode_embedding(embedding_blob, allow_pickle).size), dtype=np.float32)
+                row_ids[offset] = row_id
+                student_ids[offset] = student_pk
+                names[offset] = name
+                student_classes[offset] = student_class
+                decode_embedding_into(embedding_blob, matrix[offset], allow_pickle)
+            filled += len(rows)
+        
+        if matrix is None:
+            return EmbeddingRows.from_records([])
+        # Sayım ile okuma arasında silinen satırlar olduysa dizi kırpılır
+        return EmbeddingRows(row_ids[:filled], student_ids[:filled], names[:filled],
+                             student_classes[:filled], matrix[:filled])
+    
+    def _stream_embedding_rows(self, last_embedding_id: int, max_embedding_id: Optional[int],
+                               chunk_size: Optional[int]):
+        """(id, student_pk, name, student_class, blob) satırlarını parça listeleri hâlinde akıtır"""
+        chunk_size = chunk_size or self.connection_params.get('fetch_chunk_size', 2048)
+        upper_bound = "AND f.id <= :max_id" if max_embedding_id is not None else ""
+        
+        with self.get_connection() as conn:
+            # yield_per: sunucu tarafı imleç (stream_results); satırlar fetchmany ile chunk_size'lık parçalar hâlinde gelir
+            result = conn.execute(text(f'''
+                SELECT f.id, s.id, s.name, s.student_class, f.embedding 
+                FROM face_embeddings f 
+                INNER JOIN students s ON s.id = f.student_id
+                WHERE f.id > :last_id {upper_bound}
+                ORDER BY f.id
+            '''), {'last_id': last_embedding_id, 'max_id': max_embedding_id},
+                execution_options={'yield_per': chunk_size})
+            
+            for partition in result.partitions(chunk_size):
+                yield partition
+    
+    def get_embeddings_since(self, last_embedding_id: int = 0) -> List[Tuple[int, int, str, Optional[str], np.ndarray]]:
+        """
+        face_embeddings.id değeri verilen filigrandan büyük olan embedding'leri id sırasıyla döndürür
+        Returns: [(embedding_id, student_pk, name, student_class, embedding), ...]
+        """
+        rows = self.get_embedding_arrays_since(last_embedding_id)
+        return list(zip(rows.row_ids.tolist(), rows.student_ids.tolist(), rows.names.tolist(),
+                        rows.student_classes.tolist(), rows.matrix))
+    
+    def get_embedding_changes(self, since_token: Optional[Union[ChangeToken, str]] = None) -> EmbeddingChanges:
+        """
+        Token'dan bu yana eklenen embedding satırlarını ve silinen embedding id'lerini döndürür
+        Maliyet tablo boyutuyla değil değişiklik sayısıyla orantılıdır. since_token None ise
+        tüm satırlar eklenmiş sayılır ve silmeler şu andan itibaren izlenir.
+        Filigranlar commit'i bekleyen en küçük id'yi geçmez (dialect.change_feed_bound_sql);
+        o satırlar commit edilince bir sonraki çağrıda gelir.
+        Token'dan sonraki silme kayıtları temizlendiyse tüm satırlar reset=True ile döner.
+        Dönen token (str() ile metne çevrilebilir) bir sonraki çağrıda verilir.
+        """
+        token = ChangeToken.parse(since_token)
+        
+        # Silme kayıtları eklemelerden önce okunur: bu arada silinen satırlar eklemelerde
+        # görünmez, silme kaydı da bir sonraki çağrıda gelir (silmeler tekrar uygulanabilir)
         with self.get_connection() as conn:
-            result = conn.execute(text('''
-                SELECT s.id, s.name, f.embedding 
-                FROM students s 
-                INNER JOIN face_embeddings f ON s.id = f.student_id
-            '''))
+            tombstone_bound = self._change_feed_bound(conn, 'embedding_tombstones', token.tombstone_id or 0)
+            min_tombstone_id, max_tombstone_id = conn.execute(text(f'''
+                SELECT MIN(id), MAX(id) FROM embedding_tombstones
+                {"WHERE id < :below_id" if tombstone_bound is not None else ""}
+            '''), {'below_id': tombstone_bound}).fetchone()
+            max_tombstone_id = max_tombstone_id or 0
+            # Token'ın gördüğü son kayıttan sonraki silmeler prune_embedding_tombstones ile temizlenmiş
+            pruned = (token.tombstone_id is not None and min_tombstone_id is not None
+                      and min_tombstone_id > token.tombstone_id + 1)
             
-            results = []
-            for row in result:
-                student_id, name, embedding_blob = row
-                embedding = pickle.loads(embedding_blob)
-                results.append((student_id, name, embedding))
+            deleted = []
+            if not pruned and token.tombstone_id is not None and max_tombstone_id > token.tombstone_id:
+                deleted = conn.execute(text('''
+                    SELECT embedding_id, student_id
+                    FROM embedding_tombstones
+                    WHERE id > :last_id AND id <= :max_id
+                    ORDER BY id
+                '''), {'last_id': token.tombstone_id, 'max_id': max_tombstone_id}).fetchall()
             
-            return results
+            embedding_bound = self._change_feed_bound(conn, 'face_embeddings', token.embedding_id)
+        
+        if pruned:
+            return self.get_embedding_changes(None)._replace(reset=True)
+        
+        inserted = self.get_embedding_arrays_since(token.embedding_id, below_embedding_id=embedding_bound)
+        embedding_id = max(token.embedding_id, int(inserted.row_ids.max()) if len(inserted.row_ids) else 0)
+        max_tombstone_id = max(max_tombstone_id, token.tombstone_id or 0)
+        
+        return EmbeddingChanges(
+            inserted,
+            np.array([row[0] for row in deleted], dtype=np.int64),
+            np.array([row[1] for row in deleted], dtype=np.int64),
+            ChangeToken(embedding_id, max_tombstone_id)
+        )
+    
+    def _change_feed_bound(self, conn, table: str, last_id: int) -> Optional[int]:
+        """Değişiklik akışında okunabilecek id'lerin üst sınırı (hariç; lehçe gerektirmiyorsa None)"""
+        bound_sql = self.dialect.change_feed_bound_sql(table)
+        if bound_sql is None:
+            return None
+        return int(conn.execute(text(bound_sql), {'last_id': last_id}).scalar())
+    
+    def count_embeddings_until(self, last_embedding_id: int) -> int:
+        """face_embeddings.id değeri verilen filigrana eşit veya küçük olan satır sayısı"""
+        with self.get_connection() as conn:
+            return conn.execute(text(
+                "SELECT COUNT(*) FROM face_embeddings f "
+                "INNER JOIN students s ON s.id = f.student_id WHERE f.id <= :last_id"
+            ), {'last_id': last_embedding_id}).scalar() or 0
+    
+    def get_embedding_blobs_after(self, last_embedding_id: int, limit: int) -> List[Tuple[int, bytes]]:
+        """Filigrandan sonraki en fazla limit adet ham embedding blob'unu id sırasıyla döndürür"""
+        with self.get_connection() as conn:
+            result = conn.execute(text(f'''
+                SELECT {self.dialect.top()} id, embedding
+                FROM face_embeddings
+                WHERE id > :last_id
+                ORDER BY id
+                {self.dialect.limit()}
+            '''), {'limit': limit, 'last_id': last_embedding_id})
+            return [(row[0], row[1]) for row in result]
+    
+    def update_embedding_blobs(self, blobs: List[Tuple[int, bytes]]):
+        """Verilen (id, blob) çiftlerini tek bir işlemde (executemany) günceller"""
+        if not blobs:
+            return
+        
+        with self.get_connection() as conn:
+            try:
+                conn.execute(text(
+                    "UPDATE face_embeddings SET embedding = :embedding WHERE id = :id"
+                ), [{'id': row_id, 'embedding': blob} for row_id, blob in blobs])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self.logger.error(f"Embedding blob güncelleme hatası: {e}")
+                raise
+    
+    def get_gallery(self, student_classes: Optional[List[str]] = None) -> EmbeddingGallery:
+        """
+        Önbellekteki güncel embedding galerisini döndürür (değişiklik yoksa DB'ye gidilmez)
+        student_classes verilirse yalnızca o sınıflardaki öğrencilerin bölümü döner
+        """
+        return self.embedding_cache.get_gallery(student_classes)
+    
+    def get_student_classes(self) -> List[str]:
+        """Kayıtlı öğrencilerin farklı sınıf adlarını döndürür"""
+        with self.get_connection() as conn:
+            try:
+                result = conn.execute(text(
+                    "SELECT DISTINCT student_class FROM students "
+                    "WHERE student_class IS NOT NULL AND student_class <> '' ORDER BY student_class"
+                ))
+                return [row[0] for row in result]
+            except Exception as e:
+                self.logger.error(f"Sınıf listesi sorgu hatası: {e}")
+                return []
     
     def get_student_by_id(self, student_id: str) -> Optional[Tuple[int, str, str]]:
         """Öğrenci ID'ye göre öğrenci bilgisini getirir"""
@@ -324,6 +684,42 @@ class DatabaseManager:
             
             return [tuple(row) for row in result]
     
+    def get_students_page(self, after_key: Optional[Tuple[str, str]] = None, limit: int = 100,
+                          class_filter: Optional[str] = None,
+                          name_prefix: Optional[str] = None) -> Tuple[List[Tuple[str, str, str, int]], Optional[Tuple[str, str]]]:
+        """
+        Öğrencileri (name, student_id) sırasıyla sayfa sayfa listeler (keyset pagination)
+        OFFSET kullanılmaz: her sayfa önceki sayfanın son anahtarından index seek ile başlar,
+        bu yüzden sayfa maliyeti öğrenci sayısından bağımsızdır.
+        Returns: (öğrenciler, sonraki sayfanın after_key'i veya son sayfaysa None)
+        """
+        conditions, params = [], {'limit': limit}
+        if class_filter:
+            conditions.append("student_class = :student_class")
+            params['student_class'] = class_filter
+        if name_prefix:
+            # Önek araması index'te aralık taramasıdır; LIKE joker karakterleri kaçışlanır
+            escaped = name_prefix.replace('!', '!!').replace('%', '!%').replace('_', '!_').replace('[', '![')
+            conditions.append("name LIKE :name_prefix ESCAPE '!'")
+            params['name_prefix'] = escaped + '%'
+        if after_key:
+            conditions.append("(name > :after_name OR (name = :after_name AND student_id > :after_id))")
+            params['after_name'], params['after_id'] = after_key
+        
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.get_connection() as conn:
+            result = conn.execute(text(f'''
+                SELECT {self.dialect.top()} student_id, name, student_class, photo_count
+                FROM students
+                {where_sql}
+                ORDER BY name, student_id
+                {self.dialect.limit()}
+            '''), params)
+            students = [tuple(row) for row in result]
+        
+        next_key = (students[-1][1], students[-1][0]) if len(students) == limit else None
+        return students, next_key
+    
     def delete_student(self, student_id: str) -> bool:
         """Öğrenciyi ve ilgili tüm verilerini siler"""
         with self.get_connection() as conn:
@@ -338,6 +734,17 @@ class DatabaseManager:
                 
                 internal_id = row[0]
                 
+                # Kalite istatistiklerinden çıkarılacak katkı satırlar silinmeden okunur
+                quality_buckets = collect_quality_buckets(
+                    conn, self.dialect, "f.student_id = :student_id", {'student_id': internal_id}
+                )
+                
+                # Silme kayıtları (tombstone) aynı işlemde yazılır; diğer süreçler değişiklik akışından görür
+                conn.execute(text('''
+                    INSERT INTO embedding_tombstones (embedding_id, student_id)
+                    SELECT id, student_id FROM face_embeddings WHERE student_id = :internal_id
+                '''), {'internal_id': internal_id})
+                
                 conn.execute(text(
                     "DELETE FROM face_embeddings WHERE student_id = :internal_id"
                 ), {'internal_id': internal_id})
@@ -346,8 +753,11 @@ class DatabaseManager:
                     "DELETE FROM students WHERE id = :internal_id"
                 ), {'internal_id': internal_id})
                 
+                remove_quality_buckets(conn, self.dialect, quality_buckets)
+                
                 deleted_count = result.rowcount
                 conn.commit()
+                self.embedding_cache.remove_students([internal_id])
                 
                 return deleted_count > 0
                 
@@ -375,14 +785,15 @@ class DatabaseManager:
                 return 0
     
     def get_student_quality_report(self, student_id: str) -> List[Dict]:
-        """Öğrencinin tüm fotoğraflarının kalite raporunu döndürür"""
+        """Öğrencinin tüm fotoğraflarının kalite raporunu döndürür (kalite JSON'u yalnızca burada okunur)"""
         with self.get_connection() as conn:
             try:
                 result = conn.execute(text("""
-                    SELECT fe.photo_path, fe.quality_score, fe.quality_details, 
-                           fe.quality_report, fe.created_at
+                    SELECT fe.photo_path, fe.quality_score, q.quality_details, 
+                           q.quality_report, fe.created_at
                     FROM face_embeddings fe
                     INNER JOIN students s ON fe.student_id = s.id
+                    LEFT JOIN face_embedding_quality q ON q.embedding_id = fe.id
                     WHERE s.student_id = :student_id
                     ORDER BY fe.created_at DESC
                 """), {'student_id': student_id})
@@ -413,70 +824,67 @@ class DatabaseManager:
                 self.logger.error(f"Kalite raporu sorgu hatası: {e}")
                 return []
     
-    def get_quality_statistics(self) -> Dict:
-        """Tüm sistemin kalite istatistiklerini döndürür"""
+    def get_quality_statistics(self, student_class: Optional[str] = None) -> Dict:
+        """
+        Tüm sistemin (veya bir sınıfın) kalite istatistiklerini döndürür
+        face_embeddings taranmaz; (sınıf, gün) başına tutulan quality_statistics toplamları okunur.
+        """
+        where_sql, params = "1 = 1", {}
+        if student_class is not None:
+            where_sql, params = "student_class = :student_class", {'student_class': student_class}
+        
         with self.get_connection() as conn:
             try:
-                result = conn.execute(text("""
-                    SELECT 
-                        COUNT(*) as total_photos,
-                        AVG(quality_score) as avg_quality,
-                        MIN(quality_score) as min_quality,
-                        MAX(quality_score) as max_quality,
-                        SUM(CASE WHEN quality_score >= 0.80 THEN 1 ELSE 0 END) as excellent_photos,
-                        SUM(CASE WHEN quality_score >= 0.60 AND quality_score < 0.80 THEN 1 ELSE 0 END) as good_photos,
-                        SUM(CASE WHEN quality_score < 0.60 THEN 1 ELSE 0 END) as poor_photos
-                    FROM face_embeddings
-                    WHERE quality_score IS NOT NULL
-                """))
-                
-                row = result.fetchone()
+                row = conn.execute(text(f"""
+                    SELECT SUM(photo_count), SUM(quality_sum), MIN(min_quality), MAX(max_quality),
+                           SUM(excellent_count), SUM(good_count), SUM(poor_count)
+                    FROM quality_statistics
+                    WHERE {where_sql}
+                """), params).fetchone()
                 
-                if row and row[0] > 0:
-                    total, avg, min_q, max_q, excellent, good, poor = row
-                    return {
-                        'total_photos': total,
-                        'average_quality': round(float(avg), 3) if avg else 0,
-                        'min_quality': round(float(min_q), 3) if min_q else 0,
-                        'max_quality': round(float(max_q), 3) if max_q else 0,
-                        'excellent_photos': excellent,
-                        'good_photos': good,
-                        'poor_photos': poor,
-                        'quality_distribution': {
-                            'excellent': round((excellent / total) * 100, 1) if total > 0 else 0,
-                            'good': round((good / total) * 100, 1) if total > 0 else 0,
-                            'poor': round((poor / total) * 100, 1) if total > 0 else 0
-                        }
-                    }
-                else:
-                    return {
-                        'total_photos': 0,
-                        'average_quality': 0,
-                        'min_quality': 0,
-                        'max_quality': 0,
-                        'excellent_photos': 0,
-                        'good_photos': 0,
-                        'poor_photos': 0,
-                        'quality_distribution': {'excellent': 0, 'good': 0, 'poor': 0}
-                    }
+                return format_quality_statistics(*row)
                 
             except Exception as e:
                 self.logger.error(f"Kalite istatistikleri sorgu hatası: {e}")
                 return {}
     
+    def get_quality_statistics_breakdown(self, group_by: str = "student_class") -> List[Dict]:
+        """
+        Kalite istatistiklerini sınıf ("student_class") veya gün ("stat_date") bazında döndürür
+        Her eleman get_quality_statistics alanlarına ek olarak gruplama anahtarını içerir.
+        """
+        if group_by not in ("student_class", "stat_date"):
+            raise ValueError(f"Desteklenmeyen gruplama: {group_by}")
+        
+        with self.get_connection() as conn:
+            try:
+                result = conn.execute(text(f"""
+                    SELECT {group_by}, SUM(photo_count), SUM(quality_sum), MIN(min_quality), MAX(max_quality),
+                           SUM(excellent_count), SUM(good_count), SUM(poor_count)
+                    FROM quality_statistics
+                    GROUP BY {group_by}
+                    ORDER BY {group_by}
+                """))
+                
+                breakdown = []
+                for row in result:
+                    stats = format_quality_statistics(*row[1:])
+                    # Sınıfsız öğrenciler tabloda boş metinle tutulur
+                    stats[group_by] = (row[0] or None) if group_by == "student_class" else str(row[0])
+                    breakdown.append(stats)
+                return breakdown
+                
+            except Exception as e:
+                self.logger.error(f"Kalite istatistikleri dağılım sorgu hatası: {e}")
+                return []
+    
     def add_failed_registration(self, student_name: str, student_id: str, student_class: str, 
                                photo_path: str, quality_score: float, quality_details: Dict = None, 
                                quality_report: str = None, failure_reason: str = None):
         """Başarısız kayıt bilgilerini veritabanına kaydeder"""
         with self.get_connection() as conn:
             try:
-                quality_details_json = None
-                if quality_details:
-                    try:
-                        quality_details_json = json.dumps(quality_details, ensure_ascii=False, indent=2)
-                    except (TypeError, ValueError) as e:
-                        self.logger.warning(f"Kalite detayları JSON'a çevrilemedi: {e}")
-                        quality_details_json = None
+                quality_details_json = self._quality_details_json(quality_details)
                 
                 conn.execute(text('''
                     INSERT INTO failed_registrations 
@@ -660,22 +1068,18 @@ class DatabaseManager:
             return f"Formatlanmış rapor oluşturulurken hata: {e}"
     
     def backup_database(self) -> bool:
-        """Veritabanı yedeği oluşturur (MSSQL için)"""
+        """Veritabanı yedeği oluşturur (MSSQL: BACKUP DATABASE, SQLite: VACUUM INTO)"""
         if not self.connection_params['backup_enabled']:
             return False
         
         try:
             import datetime
-            backup_filename = f"face_recognition_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.bak"
-            backup_path = os.path.join(self.connection_params['backup_directory'], backup_filename)
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            os.makedirs(self.connection_params['backup_directory'], exist_ok=True)
             
             with self.get_connection() as conn:
-                conn.execute(text(f"""
-                    BACKUP DATABASE [{self.connection_params['database']}] 
-                    TO DISK = :backup_path
-                    WITH FORMAT, INIT
-                """), {'backup_path': backup_path})
-                
+                backup_path = self.dialect.backup(conn, self.connection_params,
+                                                  self.connection_params['backup_directory'], timestamp)
                 conn.commit()
             
             self.logger.info(f"Veritabanı yedeği oluşturuldu: {backup_path}")
@@ -686,6 +1090,8 @@ class DatabaseManager:
             return False
     
     def close(self):
-        """Bağlantı havuzunu kapatır"""
+        """Galeri anlık görüntüsünü kaydeder ve bağlantı havuzunu kapatır"""
+        if hasattr(self, 'embedding_cache'):
+            self.embedding_cache.save_snapshot()
         if hasattr(self, 'engine'):
             self.engine.dispose()
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Veritabanı Lehçeleri (Dialect)
+DatabaseManager'ın veritabanına özgü SQL ve bağlantı ayrıntıları burada toplanır.
+DatabaseConfig.db_type ile seçilir: "mssql" (SQL Server) veya "sqlite" (WAL modunda).
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote_plus
+from sqlalchemy import event, text
+
+
+class SQLDialect:
+    """Lehçe arayüzü; DatabaseManager yalnızca bu metotlar üzerinden SQL farklarına erişir"""
+
+    name = ""
+
+    def connection_url(self, params: Dict) -> str:
+        raise NotImplementedError
+
+    def engine_options(self, params: Dict) -> Dict:
+        """create_engine'e lehçeye özgü ek argümanlar"""
+        return {}
+
+    def configure_engine(self, engine, params: Dict):
+        """Engine oluşturulduktan sonra (ör. bağlantı PRAGMA'ları) yapılandırma"""
+
+    def describe(self, params: Dict) -> str:
+        raise NotImplementedError
+
+    def create_table_statements(self) -> List[str]:
+        raise NotImplementedError
+
+    def schema_version_statement(self) -> str:
+        """Uygulanan şema göçlerinin tutulduğu schema_version tablosu"""
+        raise NotImplementedError
+
+    def table_exists(self, conn, table: str) -> bool:
+        raise NotImplementedError
+
+    def column_exists(self, conn, table: str, column: str) -> bool:
+        raise NotImplementedError
+
+    def create_index_sql(self, name: str, table: str, columns: List[str], include: List[str] = ()) -> str:
+        """Yoksa index oluşturur; include kolonları destekleyen lehçede index'i kapsayıcı (covering) yapar"""
+        raise NotImplementedError
+
+    def quality_table_statement(self) -> str:
+        """Embedding başına kalite JSON'u ve raporunu tutan yan tablo (face_embedding_quality)"""
+        raise NotImplementedError
+
+    def quality_statistics_statement(self) -> str:
+        """(sınıf, gün) başına artımlı kalite istatistikleri tablosu (quality_statistics)"""
+        raise NotImplementedError
+
+    def quality_statistics_upsert_sql(self) -> str:
+        """
+        Bir (sınıf, gün) dilimine katkıyı tek atomik komutla ekler (dilim yoksa oluşturur)
+        Parametreler: student_class, stat_date, count, total, min_q, max_q, excellent, good, poor
+        """
+        raise NotImplementedError
+
+    def date_sql(self, column: str) -> str:
+        """Tarih-saat kolonunun gün kısmı"""
+        raise NotImplementedError
+
+    def drop_column_sql(self, table: str, column: str) -> str:
+        return f"ALTER TABLE {table} DROP COLUMN {column}"
+
+    def reclaim_space_sql(self, table: str) -> Optional[str]:
+        """Silinen kolonların kapladığı alanı geri kazanan komut (işlem içinde çalışabiliyorsa)"""
+        return None
+
+    def add_column_sql(self, table: str, column: str, column_type: str) -> str:
+        return f"ALTER TABLE {table} ADD {column} {self.column_types[column_type]}"
+
+    def insert_returning_id(self, table: str, columns: List[str], with_timestamp: bool = False) -> str:
+        """
+        INSERT sorgusu; eklenen satırın id'si sonuç olarak döner (result.scalar())
+        with_timestamp ile ikinci kolon olarak sunucunun created_at varsayılanıyla aynı an döner.
+        """
+        raise NotImplementedError
+
+    def update_returning(self, table: str, set_sql: str, where_sql: str, columns: List[str],
+                         with_timestamp: bool = False) -> str:
+        """UPDATE sorgusu; güncellenen satırın kolonları (ve istenirse sunucu zamanı) sonuç olarak döner"""
+        raise NotImplementedError
+
+    def update_lock_hint(self) -> str:
+        """UPDATE hedefi için işlem sonuna kadar tutulan satır/aralık kilidi ipucu"""
+        return ""
+
+    def date_value(self, timestamp) -> Any:
+        """Sürücünün döndürdüğü tarih-saat değerinin date_sql ile aynı biçimdeki gün kısmı"""
+        raise NotImplementedError
+
+    def change_version_column_sql(self, table: str) -> Optional[str]:
+        """Değişiklik akışı sınırı için satır sürümü kolonu ekleyen komut (gerekmiyorsa None)"""
+        return None
+
+    def change_feed_bound_sql(self, table: str) -> Optional[str]:
+        """
+        Değişiklik akışında güvenle okunabilecek id'lerin üst sınırı (hariç), :last_id'den sonrası için
+        Commit'i bekleyen en küçük id'nin altında kalınır; id'ler commit sırasıyla görünüyorsa None.
+        """
+        return None
+
+    def days_ago_sql(self, days_param: str = "days") -> str:
+        """Şu andan :days_param gün önceki tarih-saat"""
+        raise NotImplementedError
+
+    def top(self, limit_param: str = "limit") -> str:
+        """SELECT'ten hemen sonra gelen satır sınırı (MSSQL: TOP)"""
+        return ""
+
+    def limit(self, limit_param: str = "limit") -> str:
+        """Sorgunun sonuna eklenen satır sınırı (SQLite: LIMIT)"""
+        return ""
+
+    def backup(self, conn, params: Dict, backup_directory: str, timestamp: str) -> str:
+        """Veritabanı yedeği alır; yedek dosyasının yolunu döndürür"""
+        raise NotImplementedError
+
+    # Genel kolon türleri → lehçe türleri
+    column_types: Dict[str, str] = {}
+
+
+class MSSQLDialect(SQLDialect):
+    """SQL Server (pyodbc) lehçesi"""
+
+    name = "mssql"
+    column_types = {
+        'text': "NVARCHAR(MAX)",
+        'short_text': "NVARCHAR(50)",
+        'blob': "VARBINARY(MAX)",
+        'float': "FLOAT",
+        'int': "INT"
+    }
+
+    def connection_url(self, params: Dict) -> str:
+        if params.get('connection_string'):
+            return params['connection_string']
+
+        options = (
+            f"?driver={quote_plus(params['driver'])}"
+            f"{'' if params['username'] and params['password'] else '&Trusted_Connection=yes'}"
+            f"&TrustServerCertificate={'yes' if params['trust_server_certificate'] else 'no'}"
+            f"&Encrypt={'yes' if params['encrypt'] else 'no'}"
+        )
+        if params['username'] and params['password']:
+            return (
+                f"mssql+pyodbc://{quote_plus(params['username'])}:{quote_plus(params['password'])}@"
+                f"{params['server']}:{params['port']}/{params['database']}{options}"
+            )
+        return f"mssql+pyodbc://@{params['server']}:{params['port']}/{params['database']}{options}"
+
+    def engine_options(self, params: Dict) -> Dict:
+        if self.connection_url(params).startswith("mssql+pyodbc"):
+            # executemany (toplu embedding ekleme) tek gidiş-dönüşte gönderilir
+            return {'fast_executemany': params.get('fast_executemany', True)}
+        return {}
+
+    def describe(self, params: Dict) -> str:
+        return f"MSSQL ({params['server']}/{params['database']})"
+
+    def create_table_statements(self) -> List[str]:
+        return [
+            # Öğrenci tablosu
+            '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='students' AND xtype='U')
+            CREATE TABLE students (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                name NVARCHAR(255) NOT NULL,
+                student_id NVARCHAR(100) UNIQUE NOT NULL,
+                student_class NVARCHAR(50),
+                photo_count INT DEFAULT 0,
+                created_at DATETIME2 DEFAULT GETDATE()
+            )
+            ''',
+            # Yüz embedding tablosu
+            '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='face_embeddings' AND xtype='U')
+            CREATE TABLE face_embeddings (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                student_id INT,
+                embedding VARBINARY(MAX) NOT NULL,
+                photo_path NVARCHAR(500),
+                quality_score FLOAT,
+                created_at DATETIME2 DEFAULT GETDATE(),
+                row_version ROWVERSION,
+                FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
+            )
+            ''',
+            # Başarısız kayıtlar tablosu
+            '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='failed_registrations' AND xtype='U')
+            CREATE TABLE failed_registrations (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                student_name NVARCHAR(255) NOT NULL,
+                student_id NVARCHAR(100) NOT NULL,
+                student_class NVARCHAR(50),
+                photo_path NVARCHAR(500),
+                quality_score FLOAT,
+                quality_details NVARCHAR(MAX),
+                quality_report NVARCHAR(MAX),
+                failure_reason NVARCHAR(MAX),
+                created_at DATETIME2 DEFAULT GETDATE()
+            )
+            ''',
+            # Silinen embedding'lerin kayıtları (değişiklik akışı, get_embedding_changes)
+            '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='embedding_tombstones' AND xtype='U')
+            CREATE TABLE embedding_tombstones (
+                id BIGINT IDENTITY(1,1) PRIMARY KEY,
+                embedding_id INT NOT NULL,
+                student_id INT NOT NULL,
+                deleted_at DATETIME2 DEFAULT GETDATE(),
+                row_version ROWVERSION
+            )
+            '''
+        ]
+
+    def schema_version_statement(self) -> str:
+        return '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='schema_version' AND xtype='U')
+            CREATE TABLE schema_version (
+                version INT PRIMARY KEY,
+                description NVARCHAR(255),
+                applied_at DATETIME2 DEFAULT GETDATE()
+            )
+            '''
+
+    def table_exists(self, conn, table: str) -> bool:
+        return conn.execute(text("SELECT OBJECT_ID(:table, 'U')"), {'table': table}).scalar() is not None
+
+    def create_index_sql(self, name: str, table: str, columns: List[str], include: List[str] = ()) -> str:
+        return (
+            f"IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = '{name}' AND object_id = OBJECT_ID('{table}')) "
+            f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+            f"{' INCLUDE (' + ', '.join(include) + ')' if include else ''}"
+        )
+
+    def quality_table_statement(self) -> str:
+        return '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='face_embedding_quality' AND xtype='U')
+            CREATE TABLE face_embedding_quality (
+                embedding_id INT PRIMARY KEY,
+                quality_details NVARCHAR(MAX),
+                quality_report NVARCHAR(MAX),
+                FOREIGN KEY (embedding_id) REFERENCES face_embeddings (id) ON DELETE CASCADE
+            )
+            '''
+
+    def quality_statistics_statement(self) -> str:
+        return '''
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='quality_statistics' AND xtype='U')
+            CREATE TABLE quality_statistics (
+                student_class NVARCHAR(50) NOT NULL,
+                stat_date DATE NOT NULL,
+                photo_count INT NOT NULL,
+                quality_sum FLOAT NOT NULL,
+                min_quality FLOAT,
+                max_quality FLOAT,
+                excellent_count INT NOT NULL,
+                good_count INT NOT NULL,
+                poor_count INT NOT NULL,
+                PRIMARY KEY (student_class, stat_date)
+            )
+            '''
+
+    def quality_statistics_upsert_sql(self) -> str:
+        # HOLDLOCK: eşzamanlı iki kayıt aynı yeni dilimi açarsa ikincisi bekler ve UPDATE koluna düşer
+        return '''
+            MERGE quality_statistics WITH (HOLDLOCK) AS target
+            USING (SELECT :student_class AS student_class, CAST(:stat_date AS DATE) AS stat_date) AS source
+            ON target.student_class = source.student_class AND target.stat_date = source.stat_date
+            WHEN MATCHED THEN UPDATE SET
+                photo_count = target.photo_count + :count,
+                quality_sum = target.quality_sum + :total,
+                min_quality = CASE WHEN :min_q < target.min_quality THEN :min_q ELSE target.min_quality END,
+                max_quality = CASE WHEN :max_q > target.max_quality THEN :max_q ELSE target.max_quality END,
+                excellent_count = target.excellent_count + :excellent,
+                good_count = target.good_count + :good,
+                poor_count = target.poor_count + :poor
+            WHEN NOT MATCHED THEN
+                INSERT (student_class, stat_date, photo_count, quality_sum, min_quality, max_quality,
+                        excellent_count, good_count, poor_count)
+                VALUES (source.student_class, source.stat_date, :count, :total, :min_q, :max_q,
+                        :excellent, :good, :poor);
+            '''
+
+    def date_sql(self, column: str) -> str:
+        return f"CAST({column} AS DATE)"
+
+    def reclaim_space_sql(self, table: str) -> Optional[str]:
+        # DROP COLUMN yalnızca meta veriyi değiştirir; sayfalar tablo yeniden oluşturulunca küçülür
+        return f"ALTER TABLE {table} REBUILD"
+
+    def column_exists(self, conn, table: str, column: str) -> bool:
+        result = conn.execute(text("""
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME = :table AND COLUMN_NAME = :column
+        """), {'table': table, 'column': column})
+        return result.scalar() > 0
+
+    def insert_returning_id(self, table: str, columns: List[str], with_timestamp: bool = False) -> str:
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"OUTPUT INSERTED.id{', GETDATE()' if with_timestamp else ''} "
+            f"VALUES ({', '.join(':' + c for c in columns)})"
+        )
+
+    def update_returning(self, table: str, set_sql: str, where_sql: str, columns: List[str],
+                         with_timestamp: bool = False) -> str:
+        return (
+            f"UPDATE {table} SET {set_sql} "
+            f"OUTPUT {', '.join('INSERTED.' + c for c in columns)}{', GETDATE()' if with_timestamp else ''} "
+            f"WHERE {where_sql}"
+        )
+
+    def update_lock_hint(self) -> str:
+        # HOLDLOCK: dilim satırı silinse bile anahtar aralığı kilitli kalır, eşzamanlı MERGE bekler
+        return "WITH (UPDLOCK, HOLDLOCK)"
+
+    def date_value(self, timestamp) -> Any:
+        return timestamp.date()
+
+    def change_version_column_sql(self, table: str) -> Optional[str]:
+        return f"ALTER TABLE {table} ADD row_version ROWVERSION"
+
+    def change_feed_bound_sql(self, table: str) -> Optional[str]:
+        # IDENTITY değerleri commit'ten önce dağıtılır; eşzamanlı kayıtlar sıra dışı commit edebilir.
+        # Sürümü MIN_ACTIVE_ROWVERSION()'dan küçük olmayan satırlar henüz commit edilmemiş (veya
+        # ondan sonra yazılmış) sayılır; bunlar yoksa okuma anındaki en büyük id sınırdır.
+        return f'''
+            SELECT COALESCE(
+                MIN(CASE WHEN row_version >= MIN_ACTIVE_ROWVERSION() THEN id END),
+                MAX(id) + 1,
+                :last_id + 1
+            )
+            FROM {table} WITH (READUNCOMMITTED)
+            WHERE id > :last_id
+        '''
+
+    def days_ago_sql(self, days_param: str = "days") -> str:
+        return f"DATEADD(day, -:{days_param}, GETDATE())"
+
+    def top(self, limit_param: str = "limit") -> str:
+        return f"TOP (:{limit_param})"
+
+    def backup(self, conn, params: Dict, backup_directory: str, timestamp: str) -> str:
+        backup_path = os.path.join(backup_directory, f"face_recognition_backup_{timestamp}.bak")
+        conn.execute(text(f"""
+            BACKUP DATABASE [{params['database']}]
+            TO DISK = :backup_path
+            WITH FORMAT, INIT
+        """), {'backup_path': backup_path})
+        return backup_path
+
+
+class SQLiteDialect(SQLDialect):
+    """
+    SQLite lehçesi (SQL Server gerektirmeyen küçük kurulumlar ve yerel benchmark için)
+    WAL modunda çalışır: okuyucular yazarı beklemez, GUI thread'leri aynı dosyayı paylaşabilir.
+    """
+
+    name = "sqlite"
+    column_types = {
+        'text': "TEXT",
+        'short_text': "TEXT",
+        'blob': "BLOB",
+        'float': "REAL",
+        'int': "INTEGER"
+    }
+
+    def connection_url(self, params: Dict) -> str:
+        return f"sqlite:///{params['path']}"
+
+    def engine_options(self, params: Dict) -> Dict:
+        return {'connect_args': {'check_same_thread': False, 'timeout': params.get('timeout', 30)}}
+
+    def configure_engine(self, engine, params: Dict):
+        directory = os.path.dirname(params['path'])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        busy_timeout_ms = int(params.get('timeout', 30) * 1000)
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+            cursor.close()
+
+    def describe(self, params: Dict) -> str:
+        return f"SQLite ({params['path']}, WAL)"
+
+    def create_table_statements(self) -> List[str]:
+        # AUTOINCREMENT: silinen id'ler yeniden kullanılmaz (embedding filigranı buna dayanır)
+        return [
+            '''
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                student_id TEXT UNIQUE NOT NULL,
+                student_class TEXT,
+                photo_count INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS face_embeddings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER,
+                embedding BLOB NOT NULL,
+                photo_path TEXT,
+                quality_score REAL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS failed_registrations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_name TEXT NOT NULL,
+                student_id TEXT NOT NULL,
+                student_class TEXT,
+                photo_path TEXT,
+                quality_score REAL,
+                quality_details TEXT,
+                quality_report TEXT,
+                failure_reason TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS embedding_tombstones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                embedding_id INTEGER NOT NULL,
+                student_id INTEGER NOT NULL,
+                deleted_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            '''
+        ]
+
+    def schema_version_statement(self) -> str:
+        return '''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            '''
+
+    def table_exists(self, conn, table: str) -> bool:
+        return conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :table"
+        ), {'table': table}).scalar() is not None
+
+    def create_index_sql(self, name: str, table: str, columns: List[str], include: List[str] = ()) -> str:
+        # SQLite INCLUDE desteklemez; kapsanacak kolonlar index anahtarının sonuna eklenir
+        return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(list(columns) + list(include))})"
+
+    def quality_table_statement(self) -> str:
+        return '''
+            CREATE TABLE IF NOT EXISTS face_embedding_quality (
+                embedding_id INTEGER PRIMARY KEY,
+                quality_details TEXT,
+                quality_report TEXT,
+                FOREIGN KEY (embedding_id) REFERENCES face_embeddings (id) ON DELETE CASCADE
+            )
+            '''
+
+    def quality_statistics_statement(self) -> str:
+        return '''
+            CREATE TABLE IF NOT EXISTS quality_statistics (
+                student_class TEXT NOT NULL,
+                stat_date TEXT NOT NULL,
+                photo_count INTEGER NOT NULL,
+                quality_sum REAL NOT NULL,
+                min_quality REAL,
+                max_quality REAL,
+                excellent_count INTEGER NOT NULL,
+                good_count INTEGER NOT NULL,
+                poor_count INTEGER NOT NULL,
+                PRIMARY KEY (student_class, stat_date)
+            )
+            '''
+
+    def quality_statistics_upsert_sql(self) -> str:
+        # ON CONFLICT SQLite 3.24+ ile desteklenir
+        return '''
+            INSERT INTO quality_statistics
+            (student_class, stat_date, photo_count, quality_sum, min_quality, max_quality,
+             excellent_count, good_count, poor_count)
+            VALUES (:student_class, :stat_date, :count, :total, :min_q, :max_q, :excellent, :good, :poor)
+            ON CONFLICT (student_class, stat_date) DO UPDATE SET
+                photo_count = photo_count + excluded.photo_count,
+                quality_sum = quality_sum + excluded.quality_sum,
+                min_quality = CASE WHEN excluded.min_quality < min_quality THEN excluded.min_quality ELSE min_quality END,
+                max_quality = CASE WHEN excluded.max_quality > max_quality THEN excluded.max_quality ELSE max_quality END,
+                excellent_count = excellent_count + excluded.excellent_count,
+                good_count = good_count + excluded.good_count,
+                poor_count = poor_count + excluded.poor_count
+            '''
+
+    def date_sql(self, column: str) -> str:
+        return f"date({column})"
+
+    def column_exists(self, conn, table: str, column: str) -> bool:
+        result = conn.execute(text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in result)
+
+    def insert_returning_id(self, table: str, columns: List[str], with_timestamp: bool = False) -> str:
+        # RETURNING SQLite 3.35+ ile desteklenir
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)}) "
+            f"RETURNING id{', CURRENT_TIMESTAMP' if with_timestamp else ''}"
+        )
+
+    def update_returning(self, table: str, set_sql: str, where_sql: str, columns: List[str],
+                         with_timestamp: bool = False) -> str:
+        return (
+            f"UPDATE {table} SET {set_sql} WHERE {where_sql} "
+            f"RETURNING {', '.join(columns)}{', CURRENT_TIMESTAMP' if with_timestamp else ''}"
+        )
+
+    def date_value(self, timestamp) -> Any:
+        # CURRENT_TIMESTAMP metin olarak döner ('YYYY-MM-DD HH:MM:SS'); date() ilk 10 karakterdir
+        return str(timestamp)[:10]
+
+    def change_feed_bound_sql(self, table: str) -> Optional[str]:
+        # Tek yazar: id'ler commit sırasıyla görünür, değişiklik akışı sınırı gerekmez
+        return None
+
+    def days_ago_sql(self, days_param: str = "days") -> str:
+        # CURRENT_TIMESTAMP ile aynı biçim (UTC, 'YYYY-MM-DD HH:MM:SS')
+        return f"datetime('now', '-' || :{days_param} || ' days')"
+
+    def limit(self, limit_param: str = "limit") -> str:
+        return f"LIMIT :{limit_param}"
+
+    def backup(self, conn, params: Dict, backup_directory: str, timestamp: str) -> str:
+        backup_path = os.path.join(backup_directory, f"face_recognition_backup_{timestamp}.db")
+        # VACUUM INTO tutarlı, sıkıştırılmış bir kopya üretir (WAL içeriği dahil)
+        conn.execute(text("VACUUM INTO :backup_path"), {'backup_path': backup_path})
+        return backup_path
+
+
+DIALECTS = {
+    MSSQLDialect.name: MSSQLDialect,
+    SQLiteDialect.name: SQLiteDialect
+}
+
+
+def get_dialect(db_type: str) -> SQLDialect:
+    """DatabaseConfig.db_type değerine göre lehçe döndürür"""
+    dialect_class = DIALECTS.get((db_type or "mssql").lower())
+    if dialect_class is None:
+        raise ValueError(f"Desteklenmeyen veritabanı türü: {db_type} (desteklenen: {', '.join(DIALECTS)})")
+    return dialect_class()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Süreç Seviyesi Embedding Önbelleği
+Galeri bir kez yüklenir, sonrasında yalnızca değişiklik akışındaki (get_embedding_changes)
+face_embeddings.id filigranından (watermark) sonra eklenen satırlar ve silmeler uygulanır.
+"""
+
+import os
+import threading
+import logging
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from embedding_gallery import ChangeToken, EmbeddingChanges, EmbeddingGallery
+from ann_index import DEFAULT_INDEX_FILENAME, IVFFlatIndex, build_search_index, load_search_index
+from embedding_quantization import quantize_gallery
+from embedding_snapshot import load_snapshot, save_snapshot
+
+# Config import
+try:
+    from config import get_ai_config
+    ai_config = get_ai_config()
+except ImportError:
+    class DefaultAIConfig:
+        gallery_dtype = "float32"
+        gallery_snapshot_enabled = True
+    ai_config = DefaultAIConfig()
+
+
+class EmbeddingCache:
+    """DatabaseManager'ın embedding'lerini bellekte tutan, artımlı yenilenen önbellek"""
+
+    def __init__(self, db_manager, snapshot_directory: Optional[str] = None,
+                 use_snapshot: Optional[bool] = None):
+        """
+        Args:
+            db_manager: get_embedding_changes / count_embeddings_until sağlayan veritabanı yöneticisi
+            snapshot_directory: Disk anlık görüntüsünün dizini (None = SystemConfig.cache_directory)
+            use_snapshot: Anlık görüntü kullanımı (None = AIModelConfig.gallery_snapshot_enabled)
+        """
+        self.db_manager = db_manager
+        self.snapshot_directory = snapshot_directory
+        self.use_snapshot = (getattr(ai_config, 'gallery_snapshot_enabled', True)
+                             if use_snapshot is None else use_snapshot)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._gallery: Optional[EmbeddingGallery] = None
+        self._watermark = 0
+        # Değişiklik akışında son görülen silme kaydı (tombstone) id'si
+        self._tombstone_watermark: Optional[int] = None
+        self._stale = True
+        # Son kayıttan / yüklemeden beri diskteki anlık görüntüden farklı mı
+        self._snapshot_dirty = False
+        # Sınıf bölümleri (students.student_class) galeri değiştikçe yeniden oluşturulur
+        self._partitions: Dict[Tuple[str, ...], EmbeddingGallery] = {}
+
+    @property
+    def watermark(self) -> int:
+        """Önbellekteki en büyük face_embeddings.id değeri"""
+        return self._watermark
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._gallery is not None
+
+    def get_gallery(self, student_classes: Optional[Sequence[str]] = None) -> EmbeddingGallery:
+        """
+        Güncel galeriyi döndürür
+        Önbellek güncelse veritabanına hiç gidilmez; yeni kayıt bildirildiyse
+        yalnızca filigrandan sonraki satırlar çekilir.
+        student_classes verilirse yalnızca o sınıfların bölümü döndürülür.
+        """
+        with self._lock:
+            if self._gallery is None:
+                self._load_full()
+            elif self._stale:
+                self._load_incremental()
+
+            if not student_classes:
+                return self._gallery
+
+            key = tuple(sorted(set(student_classes)))
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._gallery.partition(key)
+                self._partitions[key] = partition
+            return partition
+
+    @property
+    def change_token(self) -> ChangeToken:
+        """Önbelleğin değişiklik akışında kaldığı yer"""
+        return ChangeToken(self._watermark, self._tombstone_watermark)
+
+    def mark_stale(self):
+        """Yeni embedding eklendiğini bildirir; bir sonraki okumada artımlı yenileme yapılır"""
+        with self._lock:
+            self._stale = True
+
+    def refresh(self) -> EmbeddingGallery:
+        """
+        Diğer süreçlerin kayıt ve silmelerini değişiklik akışından çeker
+        Maliyet yalnızca değişiklik sayısıyla orantılıdır (değişiklik yoksa iki küçük sorgu).
+        """
+        self.mark_stale()
+        return self.get_gallery()
+
+    def remove_students(self, student_pks: Sequence[int]):
+        """Silinen öğrencilerin satırlarını veritabanına gitmeden önbellekten çıkarır"""
+        with self._lock:
+            if self._gallery is not None:
+                self._gallery = self._gallery.without_students(student_pks)
+                self._partitions.clear()
+                self._snapshot_dirty = True
+
+    def invalidate(self):
+        """Önbelleği tamamen boşaltır; bir sonraki okumada tam yükleme yapılır"""
+        with self._lock:
+            self._gallery = None
+            self._watermark = 0
+            self._tombstone_watermark = None
+            self._stale = True
+            self._snapshot_dirty = False
+            self._partitions.clear()
+
+    def save_snapshot(self) -> bool:
+        """Güncel galeriyi (ANN açıksa IVF indeksini) bir sonraki açılış için diske yazar"""
+        with self._lock:
+            if self._gallery is None or not self.use_snapshot or not self._snapshot_dirty:
+                return False
+            return self._write_snapshot()
+
+    def _index_path(self) -> Optional[str]:
+        """IVF indeksinin yolu (None = ann_index.default_index_path)"""
+        if self.snapshot_directory is None:
+            return None
+        return os.path.join(self.snapshot_directory, DEFAULT_INDEX_FILENAME)
+
+    def _write_snapshot(self) -> bool:
+        try:
+            if isinstance(self._gallery, IVFFlatIndex):
+                # İndeks satırları da içerir; ayrıca düz anlık görüntü yazılmaz
+                self._gallery.save(self._index_path())
+            else:
+                save_snapshot(self._gallery, self._watermark, self.snapshot_directory)
+            self._snapshot_dirty = False
+            return True
+        except OSError as e:
+            self.logger.warning(f"Galeri anlık görüntüsü yazılamadı: {e}")
+            return False
+
+    def _load_full(self):
+        if self.use_snapshot and self._load_snapshot():
+            return
+
+        changes = self.db_manager.get_embedding_changes(None)
+        self._gallery = EmbeddingGallery([], [])
+        self._apply_changes(changes)
+        self.logger.info(f"Embedding önbelleği yüklendi: {len(self._gallery)} satır (filigran: {self._watermark})")
+
+        if self.use_snapshot:
+            self._write_snapshot()
+
+    def _load_snapshot(self) -> bool:
+        """
+        Diskteki anlık görüntüyü açar ve yalnızca filigrandan sonraki satırları çeker
+        ANN açıksa önce kaydedilmiş IVF indeksi denenir; yeni satırlar indeksin kuyruğuna
+        eklenir, yeniden kümeleme yapılmaz. Anlık görüntüden sonra silme yapıldıysa
+        (satır sayısı tutmuyorsa) kullanılmaz.
+        """
+        index = load_search_index(self._index_path())
+        snapshot = (index, index.watermark) if index is not None else load_snapshot(self.snapshot_directory)
+        if snapshot is None:
+            return False
+
+        gallery, watermark = snapshot
+        if self.db_manager.count_embeddings_until(watermark) != len(gallery):
+            self.logger.info("Galeri anlık görüntüsü güncel değil, tam yükleme yapılacak")
+            return False
+
+        self._gallery = gallery
+        self._watermark = watermark
+        self._snapshot_dirty = False
+        # Satır sayısı tuttuğu için silme geçmişi atlanır, silmeler şu andan itibaren izlenir
+        changes = self.db_manager.get_embedding_changes(ChangeToken(watermark, None))
+        if len(changes.inserted.row_ids):
+            self._apply_changes(changes)
+        else:
+            self._tombstone_watermark = changes.token.tombstone_id
+            self._stale = False
+            self._prepare_search()
+        self.logger.info(f"Embedding önbelleği anlık görüntüden açıldı: {len(self._gallery)} satır "
+                         f"(+{len(changes.inserted.row_ids)} yeni, filigran: {self._watermark})")
+        return True
+
+    def _load_incremental(self):
+        changes = self.db_manager.get_embedding_changes(self.change_token)
+        if len(changes.inserted.row_ids) or len(changes.deleted_ids) or changes.reset:
+            self._apply_changes(changes)
+            self.logger.info(f"Embedding önbelleği güncellendi: +{len(changes.inserted.row_ids)} / "
+                             f"-{len(changes.deleted_ids)} satır (filigran: {self._watermark})")
+        else:
+            self._tombstone_watermark = changes.token.tombstone_id
+        self._stale = False
+
+    def _apply_changes(self, changes: EmbeddingChanges):
+        """Değişiklik akışını uygular: önce silinen öğrencilerin satırları çıkarılır, sonra yeni satırlar eklenir"""
+        self._stale = False
+        self._tombstone_watermark = changes.token.tombstone_id
+        rows = changes.inserted
+
+        if changes.reset:
+            self.logger.info("Silme kayıtları token'dan sonra temizlenmiş, önbellek baştan kuruluyor")
+            self._gallery = EmbeddingGallery([], [], dimension=self._gallery.dimension)
+            self._watermark = 0
+            self._partitions.clear()
+            self._snapshot_dirty = True
+        if len(changes.deleted_student_ids):
+            # Öğrenci id'leri yeniden kullanılmaz; silme zaten uygulandıysa (remove_students) etkisizdir
+            self._gallery = self._gallery.without_students(np.unique(changes.deleted_student_ids))
+            self._partitions.clear()
+            self._snapshot_dirty = True
+        if not len(rows.row_ids):
+            return
+
+        # Düz galeride ve IVF indeksinin kuyruğunda satırlar tamponun boş kapasitesine yazılır;
+        # nicemlenmiş galeri ise append sırasında kod matrisini yeniden oluşturur
+        self._gallery = self._gallery.append(
+            rows.student_ids,
+            rows.names,
+            rows.matrix,
+            rows.student_classes
+        )
+        self._partitions.clear()
+        self._watermark = max(self._watermark, int(rows.row_ids.max()))
+        self._snapshot_dirty = True
+        self._prepare_search()
+
+    def _prepare_search(self):
+        # Galeri ANN eşiğini aştıysa IVF indeksine geçilir (indeks eklemeleri kendisi yönetir)
+        self._gallery = build_search_index(self._gallery, self._watermark)
+        if hasattr(self._gallery, 'watermark'):
+            self._gallery.watermark = self._watermark
+        else:
+            # ANN indeksi float32 kalır; düz galeri config'e göre nicemlenir
+            self._gallery = quantize_gallery(self._gallery, getattr(ai_config, 'gallery_dtype', 'float32'))
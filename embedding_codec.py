@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Embedding Blob Kodlayıcı
+face_embeddings.embedding alanı için kompakt ikili format ve nicemleme (quantization).
+
+Format (little-endian):
+    magic  4 byte   b'EMB1'
+    dtype  1 byte   0 = float32, 1 = float16, 2 = int8
+    pad    3 byte
+    dim    uint32
+    scale  float32  (yalnızca int8 için, vektör başına ölçek)
+    data   dim * itemsize byte
+
+Başlığı olmayan blob'lar eski pickle formatı kabul edilir; embedding_migration
+modülü bunları yerinde ham formata çevirir. Eski blob'lar yalnızca numpy dizisi
+kurabilen kısıtlı bir unpickler ile okunur; göç tamamlandıktan sonra
+allow_pickle=False (DatabaseConfig.allow_legacy_pickle_blobs) ile tamamen reddedilir.
+"""
+
+import io
+import pickle
+import struct
+import numpy as np
+from typing import Tuple
+
+BLOB_MAGIC = b'EMB1'
+BLOB_HEADER = struct.Struct('<4sBxxxI')
+BLOB_SCALE = struct.Struct('<f')
+
+BLOB_FORMATS = ("pickle", "float32", "float16", "int8")
+DTYPE_CODES = {"float32": 0, "float16": 1, "int8": 2}
+CODE_DTYPES = {0: np.dtype('<f4'), 1: np.dtype('<f2'), 2: np.dtype('i1')}
+
+# pickle.dumps(ndarray) çıktısının başvurduğu global'ler (numpy 1.x ve 2.x, protokol 2-5)
+LEGACY_PICKLE_GLOBALS = {
+    ("numpy", "ndarray"), ("numpy", "dtype"), ("_codecs", "encode"),
+    ("numpy.core.multiarray", "_reconstruct"), ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy.core.numeric", "_frombuffer"), ("numpy._core.numeric", "_frombuffer"),
+}
+
+
+class _NumpyArrayUnpickler(pickle.Unpickler):
+    """Yalnızca numpy dizisi yeniden kurma yolundaki global'lere izin veren unpickler"""
+
+    def find_class(self, module, name):
+        if (module, name) not in LEGACY_PICKLE_GLOBALS:
+            raise pickle.UnpicklingError(f"Eski embedding blob'unda izin verilmeyen nesne: {module}.{name}")
+        return super().find_class(module, name)
+
+
+def _load_legacy_blob(blob: bytes, allow_pickle: bool) -> np.ndarray:
+    """Başlıksız (eski pickle) blob'u kısıtlı unpickler ile sayısal bir diziye çevirir"""
+    if not allow_pickle:
+        raise ValueError("Başlıksız (eski pickle) embedding blob'u reddedildi; "
+                         "embedding_migration ile ham formata çevrilmeli")
+    embedding = _NumpyArrayUnpickler(io.BytesIO(blob)).load()
+    if not isinstance(embedding, np.ndarray) or embedding.dtype.kind not in "fiu":
+        raise ValueError("Eski embedding blob'u sayısal bir numpy dizisi değil")
+    return embedding
+
+
+def quantize_matrix(matrix: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Satır matrisini nicemler
+    Returns: (codes, scales) - float16 için ölçek 1'dir, int8 için satır başına max|x|/127
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    if dtype == "float32":
+        return matrix, np.ones(len(matrix), dtype=np.float32)
+    if dtype == "float16":
+        return matrix.astype(np.float16), np.ones(len(matrix), dtype=np.float32)
+    if dtype == "int8":
+        max_abs = np.abs(matrix).max(axis=1) if matrix.size else np.zeros(len(matrix), dtype=np.float32)
+        scales = np.where(max_abs == 0, 1.0, max_abs / 127.0).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Desteklenmeyen nicemleme türü: {dtype}")
+
+
+def dequantize_matrix(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Nicemlenmiş satırları float32'ye geri çevirir"""
+    matrix = codes.astype(np.float32)
+    if codes.dtype == np.int8:
+        matrix *= scales[:, None]
+    return matrix
+
+
+def encode_embedding(embedding: np.ndarray, blob_format: str = "float32") -> bytes:
+    """Embedding'i veritabanına yazılacak blob'a çevirir"""
+    if blob_format == "pickle":
+        return pickle.dumps(embedding)
+    if blob_format not in DTYPE_CODES:
+        raise ValueError(f"Desteklenmeyen embedding blob formatı: {blob_format}")
+
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    codes, scales = quantize_matrix(vector, blob_format)
+    header = BLOB_HEADER.pack(BLOB_MAGIC, DTYPE_CODES[blob_format], vector.shape[0])
+    scale = BLOB_SCALE.pack(float(scales[0])) if blob_format == "int8" else b''
+    return header + scale + codes.astype(CODE_DTYPES[DTYPE_CODES[blob_format]], copy=False).tobytes()
+
+
+def detect_blob_format(blob: bytes) -> str:
+    """Blob'un formatını döndürür: "pickle", "float32", "float16" veya "int8" """
+    if bytes(blob[:4]) != BLOB_MAGIC:
+        return "pickle"
+    dtype_code = BLOB_HEADER.unpack_from(blob, 0)[1]
+    return next(name for name, code in DTYPE_CODES.items() if code == dtype_code)
+
+
+def _parse_blob(blob: bytes) -> Tuple[np.ndarray, float]:
+    """Başlığı çözer; kodlar blob üzerinde kopyasız (salt okunur) görünüm olarak döner"""
+    _, dtype_code, dimension = BLOB_HEADER.unpack_from(blob, 0)
+    offset = BLOB_HEADER.size
+    scale = 1.0
+    if dtype_code == DTYPE_CODES["int8"]:
+        scale = BLOB_SCALE.unpack_from(blob, offset)[0]
+        offset += BLOB_SCALE.size
+    return np.frombuffer(blob, dtype=CODE_DTYPES[dtype_code], count=dimension, offset=offset), scale
+
+
+def decode_embedding(blob: bytes, allow_pickle: bool = True) -> np.ndarray:
+    """
+    Blob'u float32 embedding'e çevirir (allow_pickle ise eski pickle blob'ları da okunur)
+    float32 blob'lar kopyalanmaz; dönen dizi blob üzerinde salt okunur bir görünümdür.
+    Raises: ValueError / pickle.UnpicklingError (reddedilen veya numpy dizisi olmayan eski blob)
+    """
+    if bytes(blob[:4]) != BLOB_MAGIC:
+        return _load_legacy_blob(blob, allow_pickle)
+
+    codes, scale = _parse_blob(blob)
+    if codes.dtype == np.float32:
+        return codes
+    return codes.astype(np.float32) * np.float32(scale)
+
+
+def decode_embedding_into(blob: bytes, out: np.ndarray, allow_pickle: bool = True):
+    """Blob'u önceden ayrılmış matris satırına doğrudan yazar (ara dizi oluşturmadan)"""
+    if bytes(blob[:4]) != BLOB_MAGIC:
+        out[:] = np.asarray(_load_legacy_blob(blob, allow_pickle), dtype=np.float32).ravel()
+        return
+
+    codes, scale = _parse_blob(blob)
+    out[:] = codes
+    if codes.dtype == np.int8:
+        out *= np.float32(scale)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Vektörel Embedding Galerisi
+Kayıtlı tüm embedding'leri tek bir normalize edilmiş float32 matriste tutar,
+böylece bir sorgu tek bir matris-vektör çarpımıyla cevaplanır.
+"""
+
+import numpy as np
+from typing import List, NamedTuple, Tuple, Optional, Sequence
+
+# Macar (Hungarian) algoritması için scipy (scikit-learn ile birlikte gelir)
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class EmbeddingRows(NamedTuple):
+    """Veritabanından sütun dizileri hâlinde okunan face_embeddings satırları"""
+    row_ids: np.ndarray          # face_embeddings.id (int64)
+    student_ids: np.ndarray      # students.id (int64)
+    names: np.ndarray            # object
+    student_classes: np.ndarray  # object, boş sınıflar None
+    matrix: np.ndarray           # (N, D) float32, normalize edilmemiş
+
+    @classmethod
+    def from_records(cls, rows: Sequence[Tuple[int, int, str, Optional[str], np.ndarray]],
+                     dimension: int = 512) -> "EmbeddingRows":
+        """(row_id, student_pk, name, student_class, embedding) listesinden oluşturur"""
+        matrix = np.empty((len(rows), np.asarray(rows[0][4]).size if rows else dimension), dtype=np.float32)
+        for i, row in enumerate(rows):
+            matrix[i] = np.asarray(row[4]).ravel()
+        return cls(
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([row[1] for row in rows], dtype=np.int64),
+            np.array([row[2] for row in rows], dtype=object),
+            np.array([row[3] for row in rows], dtype=object),
+            matrix
+        )
+
+
+class ChangeToken(NamedTuple):
+    """Değişiklik akışında kalınan yer: son görülen embedding id'si ve silme kaydı (tombstone) id'si"""
+    embedding_id: int = 0
+    tombstone_id: Optional[int] = None  # None = geçmiş silmeler atlanır, şu andan itibaren izlenir
+
+    def __str__(self) -> str:
+        return f"{self.embedding_id}:{'' if self.tombstone_id is None else self.tombstone_id}"
+
+    @classmethod
+    def parse(cls, token) -> "ChangeToken":
+        """ChangeToken, "embedding_id:tombstone_id" metni veya None kabul eder"""
+        if token is None:
+            return cls()
+        if isinstance(token, ChangeToken):
+            return token
+        embedding_id, _, tombstone_id = str(token).partition(":")
+        try:
+            return cls(int(embedding_id or 0), int(tombstone_id) if tombstone_id else None)
+        except ValueError:
+            raise ValueError(f"Geçersiz değişiklik token'ı: {token}")
+
+
+class EmbeddingChanges(NamedTuple):
+    """get_embedding_changes sonucu; önce silmeler, sonra eklemeler uygulanmalıdır"""
+    inserted: EmbeddingRows
+    deleted_ids: np.ndarray          # silinen face_embeddings.id değerleri
+    deleted_student_ids: np.ndarray  # silinen satırların students.id değerleri
+    token: ChangeToken               # bir sonraki çağrıda verilecek token
+    # True ise token'dan sonraki silme kayıtları temizlenmiştir; inserted tüm satırlardır ve
+    # önbellek baştan kurulmalıdır
+    reset: bool = False
+
+
+class EmbeddingGallery:
+    """Önceden normalize edilmiş, bitişik (contiguous) embedding galerisi"""
+
+    # append() ile büyüyen galerilerde matris, boş kapasitesi olan bir tamponun ilk satırlarıdır;
+    # _buffer_rows tampona yazılmış satır sayısıdır ve aynı tamponu gören galeriler arasında paylaşılır
+    _buffer: Optional[np.ndarray] = None
+    _buffer_rows: Optional[List[int]] = None
+
+    def __init__(self, student_ids: Sequence[int], names: Sequence[str],
+                 embeddings: Optional[np.ndarray] = None, dimension: int = 512,
+                 student_classes: Optional[Sequence[Optional[str]]] = None):
+        """
+        Args:
+            student_ids: Her satırın ait olduğu öğrenci primary key'i
+            names: Her satırın öğrenci adı
+            embeddings: (N, D) embedding matrisi (normalize edilmemiş olabilir)
+            dimension: Galeri boşsa kullanılacak embedding boyutu
+            student_classes: Her satırın öğrenci sınıfı (students.student_class), opsiyonel
+        """
+        self.student_ids = np.asarray(student_ids, dtype=np.int64)
+        self.names = np.asarray(names, dtype=object)
+        self.student_classes = self._as_class_array(student_classes, len(self.student_ids))
+
+        if embeddings is None or len(self.student_ids) == 0:
+            self.matrix = np.zeros((0, dimension), dtype=np.float32)
+        else:
+            self.matrix = self._normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+        if not (len(self.student_ids) == len(self.names) == len(self.student_classes) == self.matrix.shape[0]):
+            raise ValueError("student_ids, names, student_classes ve embedding satır sayıları eşit olmalı")
+
+    @classmethod
+    def from_records(cls, records: List[Tuple[int, str, np.ndarray]]) -> "EmbeddingGallery":
+        """get_all_embeddings() çıktısından galeri oluşturur"""
+        if not records:
+            return cls([], [])
+
+        student_ids = [record[0] for record in records]
+        names = [record[1] for record in records]
+        embeddings = np.stack([np.asarray(record[2], dtype=np.float32).ravel() for record in records])
+        return cls(student_ids, names, embeddings)
+
+    @classmethod
+    def _from_arrays(cls, student_ids: np.ndarray, names: np.ndarray, matrix: np.ndarray,
+                     student_classes: np.ndarray) -> "EmbeddingGallery":
+        """Zaten normalize edilmiş dizilerden kopyalamadan galeri oluşturur"""
+        gallery = EmbeddingGallery.__new__(EmbeddingGallery)
+        gallery.student_ids = student_ids
+        gallery.names = names
+        gallery.matrix = matrix
+        gallery.student_classes = student_classes
+        return gallery
+
+    @staticmethod
+    def _as_class_array(student_classes: Optional[Sequence[Optional[str]]], length: int) -> np.ndarray:
+        """Sınıf bilgisini object dizisine çevirir; boş sınıflar None olur"""
+        if student_classes is None:
+            return np.full(length, None, dtype=object)
+        return np.asarray([(c.strip() or None) if isinstance(c, str) else c for c in student_classes],
+                          dtype=object).reshape(-1)
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """Satırları L2 normuna böler; sıfır normlu satırlar sıfır kalır"""
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        safe_norms = np.where(norms == 0, 1.0, norms)
+        return np.ascontiguousarray(matrix / safe_norms, dtype=np.float32)
+
+    @staticmethod
+    def normalize(embedding: np.ndarray) -> np.ndarray:
+        """Tek bir sorgu embedding'ini normalize eder"""
+        return EmbeddingGallery._normalize_rows(np.asarray(embedding, dtype=np.float32).ravel())[0]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Galeri matrisinin bellekte kapladığı alan (byte)"""
+        return self.matrix.nbytes
+
+    def rows_matrix(self, rows: np.ndarray) -> np.ndarray:
+        """Seçilen satırların float32 embedding'lerini döndürür"""
+        return self.matrix[rows]
+
+    def similarities(self, target_embedding: np.ndarray) -> np.ndarray:
+        """Sorgunun tüm galeri satırlarıyla kosinüs benzerliğini döndürür (N,)"""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.normalize(target_embedding)
+
+    def similarities_batch(self, target_embeddings: np.ndarray) -> np.ndarray:
+        """Birden fazla sorguyu tek matris çarpımıyla skorlar (F, N)"""
+        queries = self._normalize_rows(np.asarray(target_embeddings, dtype=np.float32))
+        if len(self) == 0:
+            return np.zeros((queries.shape[0], 0), dtype=np.float32)
+        return queries @ self.matrix.T
+
+    def append(self, student_ids: Sequence[int], names: Sequence[str],
+               embeddings: np.ndarray,
+               student_classes: Optional[Sequence[Optional[str]]] = None) -> "EmbeddingGallery":
+        """
+        Yeni satırlar eklenmiş yeni bir galeri döndürür (mevcut galeri değişmez)
+
+        Yeni satırlar matrisin arkasındaki tamponun boş kapasitesine yazılır; mevcut satırlar
+        yalnızca tampon yoksa (ör. bellek eşlemeli anlık görüntü) ya da kapasite dolduğunda
+        iki katı kapasiteli yeni tampona bir kez kopyalanır. Eski galeri tamponun kendi
+        satırlarını görmeye devam eder. Aynı galeriden eşzamanlı append çağrıları dışarıda
+        kilitlenmelidir (EmbeddingCache bunu kendi kilidiyle yapar).
+        """
+        if len(student_ids) == 0:
+            return self
+
+        appended = EmbeddingGallery(student_ids, names, embeddings, dimension=self.dimension,
+                                    student_classes=student_classes)
+        if len(self) == 0:
+            return appended
+
+        rows, new_rows = len(self), len(appended)
+        buffer, written = self._buffer, self._buffer_rows
+        # Tampondan başka bir galeri daha önce satır eklediyse (written[0] != rows) o satırların
+        # üzerine yazılmaması için yeni tampon açılır
+        if buffer is None or written[0] != rows or rows + new_rows > buffer.shape[0]:
+            buffer = np.empty((2 * (rows + new_rows), self.dimension), dtype=np.float32)
+            buffer[:rows] = self.matrix
+            written = [rows]
+        buffer[rows:rows + new_rows] = appended.matrix
+        written[0] = rows + new_rows
+
+        gallery = EmbeddingGallery._from_arrays(
+            np.concatenate([self.student_ids, appended.student_ids]),
+            np.concatenate([self.names, appended.names]),
+            buffer[:rows + new_rows],
+            np.concatenate([self.student_classes, appended.student_classes])
+        )
+        gallery._buffer = buffer
+        gallery._buffer_rows = written
+        return gallery
+
+    def take(self, rows: np.ndarray) -> "EmbeddingGallery":
+        """Seçilen satırlardan (maske veya indeks) yeni bir düz galeri oluşturur"""
+        return EmbeddingGallery._from_arrays(
+            self.student_ids[rows],
+            self.names[rows],
+            np.ascontiguousarray(self.matrix[rows]),
+            self.student_classes[rows]
+        )
+
+    def without_students(self, student_ids: Sequence[int]) -> "EmbeddingGallery":
+        """Verilen öğrencilerin satırları çıkarılmış yeni bir galeri döndürür"""
+        keep = ~np.isin(self.student_ids, np.asarray(student_ids, dtype=np.int64))
+        if keep.all():
+            return self
+        return self.take(keep)
+
+    def partition(self, student_classes: Sequence[Optional[str]]) -> "EmbeddingGallery":
+        """Yalnızca verilen sınıflardaki öğrencilerin satırlarını içeren alt galeri döndürür"""
+        wanted = set(self._as_class_array(student_classes, 0).tolist()) if student_classes else set()
+        mask = np.fromiter((c in wanted for c in self.student_classes), dtype=bool, count=len(self))
+        return self.take(mask)
+
+    def class_names(self) -> List[str]:
+        """Galeride bulunan (boş olmayan) sınıf adlarını sıralı döndürür"""
+        return sorted({c for c in self.student_classes.tolist() if c})
+
+    def student_groups(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Satırları öğrenciye göre gruplar ve öğrenci prototiplerini hesaplar
+        Prototip, öğrencinin normalize embedding'lerinin ortalamasının normalize hâlidir.
+        Returns: (unique_student_ids, row_order, group_starts, group_counts, prototypes)
+        """
+        groups = getattr(self, '_student_groups', None)
+        if groups is None:
+            order = np.argsort(self.student_ids, kind='stable')
+            unique_ids, starts, counts = np.unique(self.student_ids[order], return_index=True, return_counts=True)
+            if len(order) > 0:
+                prototypes = self._normalize_rows(np.add.reduceat(self.rows_matrix(order), starts, axis=0))
+            else:
+                prototypes = np.zeros((0, self.dimension), dtype=np.float32)
+            groups = (unique_ids, order, starts, counts, prototypes)
+            self._student_groups = groups
+        return groups
+
+    def shortlist_similarities(self, target_embedding: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        İki aşamalı arama: önce prototiplerle en yakın top_k öğrenci seçilir,
+        sonra yalnızca bu öğrencilerin fotoğrafları skorlanır. Diğer satırlar -inf alır (N,)
+        """
+        return self.shortlist_similarities_batch(self.normalize(target_embedding).reshape(1, -1), top_k)[0]
+
+    def shortlist_similarities_batch(self, target_embeddings: np.ndarray, top_k: int) -> np.ndarray:
+        """Tüm sorguların prototip skorları tek matris çarpımıyla hesaplanır (F, N)"""
+        queries = self._normalize_rows(np.asarray(target_embeddings, dtype=np.float32))
+        scores = np.full((queries.shape[0], len(self)), -np.inf, dtype=np.float32)
+        if len(self) == 0:
+            return scores
+
+        _, order, starts, counts, prototypes = self.student_groups()
+        k = max(1, min(int(top_k), len(prototypes)))
+        prototype_scores = queries @ prototypes.T
+
+        for face_index, query in enumerate(queries):
+            if k < len(prototypes):
+                shortlisted = np.argpartition(-prototype_scores[face_index], k - 1)[:k]
+            else:
+                shortlisted = np.arange(len(prototypes))
+            rows = np.concatenate([order[starts[i]:starts[i] + counts[i]] for i in shortlisted])
+            scores[face_index, rows] = self.rows_matrix(rows) @ query
+        return scores
+
+    def student_score_matrix(self, score_matrix: np.ndarray) -> np.ndarray:
+        """
+        Yüz×satır skor matrisini yüz×öğrenci matrisine indirger (F, S)
+        Her hücre, öğrencinin en yüksek skorlu fotoğrafının skorudur;
+        sütun sırası student_groups() içindeki unique_student_ids sırasıdır.
+        """
+        unique_ids, order, starts, _, _ = self.student_groups()
+        if len(unique_ids) == 0:
+            return np.zeros((score_matrix.shape[0], 0), dtype=np.float32)
+        return np.maximum.reduceat(score_matrix[:, order], starts, axis=1)
+
+    def top_k_students(self, score_matrix: np.ndarray, k: int) -> List[List[Tuple[int, str, float, float]]]:
+        """
+        Her yüz için en yüksek skorlu K öğrenciyi sıralı döndürür
+        Öğrenci skoru en iyi fotoğrafının skorudur; ortalama skor da raporlanır.
+        Tüm öğrenciler sıralanmaz, argpartition ile yalnızca ilk K seçilir.
+        Returns: Her yüz için [(student_id, name, best_score, avg_score), ...]
+        """
+        unique_ids, order, starts, counts, _ = self.student_groups()
+        if len(unique_ids) == 0 or k <= 0:
+            return [[] for _ in range(score_matrix.shape[0])]
+
+        ordered_scores = score_matrix[:, order]
+        best_scores = np.maximum.reduceat(ordered_scores, starts, axis=1)
+        avg_scores = np.add.reduceat(ordered_scores, starts, axis=1) / counts
+        names = self.names[order[starts]]
+
+        k = min(k, len(unique_ids))
+        results = []
+        for face_best, face_avg in zip(best_scores, avg_scores):
+            if k < len(unique_ids):
+                columns = np.argpartition(-face_best, k - 1)[:k]
+            else:
+                columns = np.arange(len(unique_ids))
+            columns = columns[np.argsort(-face_best[columns], kind='stable')]
+            results.append([
+                (int(unique_ids[c]), names[c], float(face_best[c]), float(face_avg[c]))
+                for c in columns if np.isfinite(face_best[c])
+            ])
+        return results
+
+    def unique_names(self) -> List[str]:
+        """Galerideki farklı öğrenci adlarını döndürür"""
+        return list(set(self.names.tolist()))
+
+    def student_scores(self, scores: np.ndarray, student_id: int, threshold: float) -> np.ndarray:
+        """Bir öğrencinin eşiği geçen tüm fotoğraf skorlarını döndürür"""
+        mask = (self.student_ids == student_id) & (scores > threshold)
+        return scores[mask]
+
+
+def solve_assignment(score_matrix: np.ndarray, threshold: float,
+                     method: str = "hungarian") -> List[Tuple[int, int]]:
+    """
+    Yüz×öğrenci skor matrisinde birebir atama yapar
+    Yalnızca eşiği geçen çiftler atanır; her yüz ve her öğrenci en fazla bir kez kullanılır.
+    method: "hungarian" (toplam skoru maksimize eder, scipy gerekir) veya "greedy" (en yüksek skor önce)
+    Returns: [(face_index, student_column), ...]
+    """
+    if score_matrix.size == 0:
+        return []
+
+    valid = score_matrix > threshold
+    # Hiçbir yüzde eşiği geçmeyen öğrenciler problemden çıkarılır
+    candidate_columns = np.flatnonzero(valid.any(axis=0))
+    if len(candidate_columns) == 0:
+        return []
+
+    scores = score_matrix[:, candidate_columns]
+    valid = valid[:, candidate_columns]
+
+    if method == "hungarian" and SCIPY_AVAILABLE:
+        # Geçersiz çiftler, hiçbir geçerli çiftten daha iyi olamayacak bir ceza alır
+        cost = np.where(valid, -scores, 2.0 * max(scores.shape) + 1.0)
+        face_indices, columns = linear_sum_assignment(cost)
+        pairs = [(int(f), int(c)) for f, c in zip(face_indices, columns) if valid[f, c]]
+    else:
+        face_indices, columns = np.nonzero(valid)
+        ranking = np.argsort(-scores[face_indices, columns], kind='stable')
+        used_faces, used_columns, pairs = set(), set(), []
+        for f, c in zip(face_indices[ranking], columns[ranking]):
+            if f not in used_faces and c not in used_columns:
+                used_faces.add(f)
+                used_columns.add(c)
+                pairs.append((int(f), int(c)))
+
+    return sorted((f, int(candidate_columns[c])) for f, c in pairs)
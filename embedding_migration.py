@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Embedding Blob Göçü
+face_embeddings tablosundaki eski pickle blob'larını yerinde ham (EMB1) formata çevirir.
+Satırlar id sırasıyla partiler hâlinde işlenir; her parti tek işlemde yazılır ve
+ilerleme cache dizinine kaydedilir. Yarıda kalan göç aynı komutla kaldığı yerden sürer.
+
+Kullanım:
+    python embedding_migration.py [--format float32] [--batch-size 500] [--restart]
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+from typing import Callable, Dict, Optional
+
+from embedding_codec import BLOB_FORMATS, decode_embedding, detect_blob_format, encode_embedding
+from embedding_snapshot import remove_snapshot
+from ann_index import remove_index
+
+# Config import
+try:
+    from config import get_system_config
+    system_config = get_system_config()
+except ImportError:
+    class DefaultSystemConfig:
+        cache_directory = "cache"
+    system_config = DefaultSystemConfig()
+
+CHECKPOINT_FILENAME = "embedding_migration.json"
+
+
+def default_checkpoint_path() -> str:
+    """Göç ilerleme dosyasının SystemConfig.cache_directory altındaki yolu"""
+    return os.path.join(system_config.cache_directory, CHECKPOINT_FILENAME)
+
+
+def _load_checkpoint(path: str, target_format: str) -> Dict:
+    empty = {'target_format': target_format, 'last_id': 0, 'converted': 0, 'skipped': 0}
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    # Hedef format değiştiyse göç baştan başlar
+    return checkpoint if checkpoint.get('target_format') == target_format else empty
+
+
+def _save_checkpoint(path: str, checkpoint: Dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+
+def migrate_embedding_blobs(db_manager, target_format: str = "float32", batch_size: int = 500,
+                            checkpoint_path: Optional[str] = None, restart: bool = False,
+                            progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Hedef formatta olmayan embedding blob'larını partiler hâlinde yeniden kodlar
+    float32 hedefinde her satırın değeri kayıpsız korunur (yazmadan önce doğrulanır).
+    Returns: {'target_format', 'last_id', 'converted', 'skipped', 'elapsed'}
+    """
+    if target_format not in BLOB_FORMATS:
+        raise ValueError(f"Desteklenmeyen embedding blob formatı: {target_format}")
+
+    checkpoint_path = checkpoint_path or default_checkpoint_path()
+    checkpoint = _load_checkpoint(checkpoint_path, target_format)
+    if restart:
+        checkpoint.update({'last_id': 0, 'converted': 0, 'skipped': 0})
+
+    start_time = time.time()
+    while True:
+        rows = db_manager.get_embedding_blobs_after(checkpoint['last_id'], batch_size)
+        if not rows:
+            break
+
+        updates = []
+        for row_id, blob in rows:
+            if detect_blob_format(blob) == target_format:
+                checkpoint['skipped'] += 1
+                continue
+
+            embedding = np.asarray(decode_embedding(blob), dtype=np.float32)
+            new_blob = encode_embedding(embedding, target_format)
+            if target_format == "float32" and not np.array_equal(decode_embedding(new_blob), embedding.ravel()):
+                raise ValueError(f"Embedding {row_id} kayıpsız dönüştürülemedi")
+            updates.append((row_id, new_blob))
+
+        db_manager.update_embedding_blobs(updates)
+        checkpoint['converted'] += len(updates)
+        checkpoint['last_id'] = rows[-1][0]
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+        if progress:
+            progress(dict(checkpoint))
+
+    # Kayıplı formatlarda değerler değiştiği için önbellek, disk anlık görüntüsü ve ANN indeksi yenilenmeli
+    if target_format in ("float16", "int8") and checkpoint['converted']:
+        if hasattr(db_manager, 'embedding_cache'):
+            db_manager.embedding_cache.invalidate()
+        remove_snapshot()
+        remove_index()
+
+    checkpoint['elapsed'] = time.time() - start_time
+    return checkpoint
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="face_embeddings blob'larını ham formata taşır")
+    parser.add_argument("--format", default="float32", choices=BLOB_FORMATS, help="Hedef blob formatı")
+    parser.add_argument("--batch-size", type=int, default=500, help="Parti başına satır sayısı")
+    parser.add_argument("--restart", action="store_true", help="Kayıtlı ilerlemeyi yok sayıp baştan başla")
+    args = parser.parse_args()
+
+    from database import DatabaseManager
+
+    db_manager = DatabaseManager()
+    print("🔁 EMBEDDING BLOB GÖÇÜ")
+    print("=" * 50)
+    result = migrate_embedding_blobs(
+        db_manager, target_format=args.format, batch_size=args.batch_size, restart=args.restart,
+        progress=lambda c: print(f"   id ≤ {c['last_id']}: {c['converted']} dönüştürüldü, {c['skipped']} zaten güncel")
+    )
+    print(f"✅ Tamamlandı: {result['converted']} satır dönüştürüldü, {result['skipped']} satır atlandı "
+          f"({result['elapsed']:.1f}s)")
+    if args.format != "pickle":
+        print("ℹ️ Eski pickle blob'u kalmadı; DatabaseConfig.allow_legacy_pickle_blobs = False ile "
+              "başlıksız blob'lar reddedilebilir")
+    db_manager.close()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Nicemlenmiş (float16 / int8) Embedding Galerisi
+Galeri matrisi float16 veya satır ölçekli int8 olarak tutulur; skorlama
+küçük parçalar float32'ye açılarak BLAS ile yapılır. Modül doğrudan
+çalıştırıldığında float32'ye göre doğruluk raporu üretir.
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from embedding_gallery import EmbeddingGallery
+from embedding_codec import quantize_matrix, dequantize_matrix
+
+GALLERY_DTYPES = ("float32", "float16", "int8")
+
+
+class QuantizedEmbeddingGallery(EmbeddingGallery):
+    """Matrisi nicemlenmiş olarak saklayan EmbeddingGallery"""
+
+    # Skorlama sırasında float32'ye açılan parça boyutu (satır)
+    chunk_size = 4096
+
+    def __init__(self, gallery: EmbeddingGallery, dtype: str = "float16"):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Desteklenmeyen galeri nicemleme türü: {dtype}")
+
+        self.student_ids = gallery.student_ids
+        self.names = gallery.names
+        self.student_classes = gallery.student_classes
+        self.dtype = dtype
+        self._dimension = gallery.dimension
+        self.codes, self.scales = quantize_matrix(gallery.matrix, dtype)
+
+    @classmethod
+    def _from_codes(cls, student_ids: np.ndarray, names: np.ndarray, student_classes: np.ndarray,
+                    codes: np.ndarray, scales: np.ndarray, dtype: str) -> "QuantizedEmbeddingGallery":
+        gallery = cls.__new__(cls)
+        gallery.student_ids = student_ids
+        gallery.names = names
+        gallery.student_classes = student_classes
+        gallery.dtype = dtype
+        gallery._dimension = codes.shape[1]
+        gallery.codes = np.ascontiguousarray(codes)
+        gallery.scales = scales
+        return gallery
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Tüm galerinin float32 hâli (yalnızca indeks oluşturma gibi seyrek işler için)"""
+        return dequantize_matrix(self.codes, self.scales)
+
+    def rows_matrix(self, rows: np.ndarray) -> np.ndarray:
+        return dequantize_matrix(self.codes[rows], self.scales[rows])
+
+    def similarities(self, target_embedding: np.ndarray) -> np.ndarray:
+        return self.similarities_batch(self.normalize(target_embedding).reshape(1, -1))[0]
+
+    def similarities_batch(self, target_embeddings: np.ndarray) -> np.ndarray:
+        """Parça parça float32'ye açarak (F, N) skor matrisini hesaplar"""
+        queries = self._normalize_rows(np.asarray(target_embeddings, dtype=np.float32))
+        scores = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), self.chunk_size):
+            end = start + self.chunk_size
+            block = self.codes[start:end].astype(np.float32)
+            scores[:, start:end] = (queries @ block.T) * self.scales[start:end]
+        return scores
+
+    def append(self, student_ids: Sequence[int], names: Sequence[str],
+               embeddings: np.ndarray,
+               student_classes: Optional[Sequence[Optional[str]]] = None) -> "QuantizedEmbeddingGallery":
+        if len(student_ids) == 0:
+            return self
+
+        appended = QuantizedEmbeddingGallery(
+            EmbeddingGallery(student_ids, names, embeddings, dimension=self.dimension,
+                             student_classes=student_classes),
+            self.dtype
+        )
+        return QuantizedEmbeddingGallery._from_codes(
+            np.concatenate([self.student_ids, appended.student_ids]),
+            np.concatenate([self.names, appended.names]),
+            np.concatenate([self.student_classes, appended.student_classes]),
+            np.vstack([self.codes, appended.codes]),
+            np.concatenate([self.scales, appended.scales]),
+            self.dtype
+        )
+
+    def take(self, rows: np.ndarray) -> "QuantizedEmbeddingGallery":
+        return QuantizedEmbeddingGallery._from_codes(
+            self.student_ids[rows],
+            self.names[rows],
+            self.student_classes[rows],
+            self.codes[rows],
+            self.scales[rows],
+            self.dtype
+        )
+
+
+def quantize_gallery(gallery: EmbeddingGallery, dtype: str) -> EmbeddingGallery:
+    """Galeriyi istenen türe çevirir; float32 için galeri aynen döner"""
+    if dtype == "float32" or isinstance(gallery, QuantizedEmbeddingGallery):
+        return gallery
+    return QuantizedEmbeddingGallery(gallery, dtype)
+
+
+def quantization_report(gallery: EmbeddingGallery, queries: Optional[np.ndarray] = None,
+                        thresholds: Sequence[float] = (0.55, 0.25),
+                        query_count: int = 500, seed: int = 0,
+                        exclude_rows: Optional[Sequence[int]] = None,
+                        near_margin: float = 0.05) -> Dict[str, Dict]:
+    """
+    Her nicemleme türünü float32 galeriyle karşılaştırır
+    queries verilmezse galerideki gerçek embedding'ler leave-one-out sorgu olarak kullanılır:
+    birden fazla fotoğrafı olan öğrencilerden birer fotoğraf seçilir ve sorgunun kendi satırı
+    skorlarda maskelenir (sorgu aynı öğrencinin diğer fotoğraflarıyla eşleşmek zorundadır).
+    exclude_rows: queries ile aynı uzunlukta, her sorguda maskelenecek galeri satırı (-1 = yok)
+    near_margin: Eşiğe bu kadar yakın en iyi skorlu sorgular ayrıca raporlanır
+    Returns: tür başına bellek, yükleme süresi, benzerlik hatası ve eşik kararı değişim oranı
+    """
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        _, inverse, counts = np.unique(gallery.student_ids, return_inverse=True, return_counts=True)
+        candidates = np.flatnonzero(counts[inverse] > 1)
+        if len(candidates) == 0:
+            candidates = np.arange(len(gallery))
+        picked = rng.choice(candidates, size=min(query_count, len(candidates)), replace=False)
+        queries = gallery.matrix[picked]
+        exclude_rows = picked
+
+    rows = np.arange(len(queries))
+    masked = np.asarray(exclude_rows if exclude_rows is not None else np.full(len(queries), -1), dtype=np.int64)
+    mask_rows, mask_cols = rows[masked >= 0], masked[masked >= 0]
+
+    reference_scores = gallery.similarities_batch(queries)
+    reference_scores[mask_rows, mask_cols] = -np.inf
+    reference_best = np.argmax(reference_scores, axis=1)
+    reference_best_scores = reference_scores[rows, reference_best]
+    finite = np.isfinite(reference_scores)
+    report = {}
+
+    for dtype in GALLERY_DTYPES:
+        start = time.perf_counter()
+        candidate = quantize_gallery(gallery, dtype)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        scores = candidate.similarities_batch(queries)
+        search_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+        scores[mask_rows, mask_cols] = -np.inf
+
+        error = np.abs(scores - reference_scores)[finite]
+        best = np.argmax(scores, axis=1)
+
+        decision_changes = {}
+        near_threshold = {}
+        for threshold in thresholds:
+            reference_decision = np.where(reference_best_scores > threshold,
+                                          gallery.student_ids[reference_best], -1)
+            decision = np.where(scores[rows, best] > threshold, candidate.student_ids[best], -1)
+            changed = reference_decision != decision
+            decision_changes[threshold] = float(np.mean(changed)) if len(changed) else 0.0
+
+            # Kararı nicemlemenin değiştirebileceği sorgular eşiğin yakınındakilerdir
+            near = np.abs(reference_best_scores - threshold) <= near_margin
+            near_threshold[threshold] = {
+                'margin': near_margin,
+                'query_count': int(near.sum()),
+                'decision_change_rate': float(np.mean(changed[near])) if near.any() else 0.0
+            }
+
+        report[dtype] = {
+            'memory_mb': candidate.nbytes / (1024 * 1024),
+            'memory_ratio': gallery.nbytes / max(candidate.nbytes, 1),
+            'build_ms': build_ms,
+            'search_ms_per_query': search_ms,
+            'max_similarity_error': float(error.max()) if error.size else 0.0,
+            'mean_similarity_error': float(error.mean()) if error.size else 0.0,
+            'decision_change_rate': decision_changes,
+            'near_threshold': near_threshold
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    # Veritabanındaki galeri üzerinde float32 / float16 / int8 doğruluk raporu
+    from database import DatabaseManager
+
+    db_manager = DatabaseManager()
+    records = db_manager.get_all_embeddings()
+    gallery = EmbeddingGallery.from_records(records)
+
+    print("🧮 EMBEDDING NİCEMLEME RAPORU")
+    print("=" * 50)
+    if len(gallery) == 0:
+        print("Veritabanında embedding yok")
+    else:
+        print(f"Galeri: {len(gallery)} embedding, {gallery.dimension} boyut")
+        for dtype, stats in quantization_report(gallery).items():
+            changes = ", ".join(f"eşik {t:.2f}: %{rate * 100:.2f}" for t, rate in stats['decision_change_rate'].items())
+            print(f"\n📦 {dtype}")
+            print(f"   Bellek: {stats['memory_mb']:.2f} MB ({stats['memory_ratio']:.1f}x küçük)")
+            print(f"   Arama: {stats['search_ms_per_query']:.3f} ms/sorgu")
+            print(f"   Benzerlik hatası: maks {stats['max_similarity_error']:.5f}, ort {stats['mean_similarity_error']:.5f}")
+            print(f"   Karar değişimi: {changes}")
+            near = ", ".join(f"eşik {t:.2f}±{n['margin']:.2f}: %{n['decision_change_rate'] * 100:.2f} ({n['query_count']} sorgu)"
+                             for t, n in stats['near_threshold'].items())
+            print(f"   Eşik yakınında karar değişimi: {near}")
+    db_manager.close()
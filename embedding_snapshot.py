@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Disk Üzerinde Embedding Galerisi Anlık Görüntüsü
+Galeri matrisi .npy olarak cache dizinine yazılır ve açılışta
+np.load(mmap_mode='r') ile bellek eşlemeli açılır; ardından yalnızca
+filigrandan (face_embeddings.id) sonra eklenen satırlar veritabanından çekilir.
+"""
+
+import os
+import json
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+from embedding_gallery import EmbeddingGallery
+
+# Config import
+try:
+    from config import get_system_config
+    system_config = get_system_config()
+except ImportError:
+    class DefaultSystemConfig:
+        cache_directory = "cache"
+    system_config = DefaultSystemConfig()
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_PREFIX = "gallery_snapshot"
+SNAPSHOT_ARRAYS = ("matrix", "student_ids", "names", "student_classes")
+
+
+def default_snapshot_directory() -> str:
+    """Anlık görüntünün yazıldığı SystemConfig.cache_directory dizini"""
+    return system_config.cache_directory
+
+
+def _snapshot_paths(directory: str):
+    arrays = {name: os.path.join(directory, f"{SNAPSHOT_PREFIX}.{name}.npy") for name in SNAPSHOT_ARRAYS}
+    return arrays, os.path.join(directory, f"{SNAPSHOT_PREFIX}.meta.json")
+
+
+def save_snapshot(gallery: EmbeddingGallery, watermark: int, directory: Optional[str] = None) -> str:
+    """
+    Galeriyi filigranıyla birlikte diske yazar
+    Meta dosyası en son yazılır; yarım kalan bir yazım meta olmadan geçersiz sayılır.
+    Returns: meta dosyasının yolu
+    """
+    directory = directory or default_snapshot_directory()
+    os.makedirs(directory, exist_ok=True)
+    array_paths, meta_path = _snapshot_paths(directory)
+
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    arrays = {
+        'matrix': np.ascontiguousarray(gallery.matrix, dtype=np.float32),
+        'student_ids': np.asarray(gallery.student_ids, dtype=np.int64),
+        'names': np.asarray([str(name) for name in gallery.names.tolist()], dtype=str),
+        'student_classes': np.asarray([c or '' for c in gallery.student_classes.tolist()], dtype=str)
+    }
+    for name, array in arrays.items():
+        temp_path = array_paths[name] + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(temp_path, array_paths[name])
+
+    meta = {
+        'version': SNAPSHOT_FORMAT_VERSION,
+        'watermark': int(watermark),
+        'rows': len(gallery),
+        'dimension': gallery.dimension,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+    temp_meta = meta_path + ".tmp"
+    with open(temp_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(temp_meta, meta_path)
+    return meta_path
+
+
+def load_snapshot(directory: Optional[str] = None) -> Optional[Tuple[EmbeddingGallery, int]]:
+    """
+    Anlık görüntüyü açar; matris kopyalanmadan bellek eşlemeli (salt okunur) kullanılır
+    Returns: (galeri, filigran) veya dosya yoksa / uyumsuzsa None
+    """
+    directory = directory or default_snapshot_directory()
+    array_paths, meta_path = _snapshot_paths(directory)
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != SNAPSHOT_FORMAT_VERSION:
+            return None
+
+        matrix = np.load(array_paths['matrix'], mmap_mode='r', allow_pickle=False)
+        student_ids = np.load(array_paths['student_ids'], allow_pickle=False)
+        names = np.load(array_paths['names'], allow_pickle=False).astype(object)
+        student_classes = np.load(array_paths['student_classes'], allow_pickle=False).astype(object)
+    except (OSError, ValueError) as e:
+        print(f"Galeri anlık görüntüsü okunamadı: {e}")
+        return None
+
+    rows = meta.get('rows')
+    if matrix.ndim != 2 or not (matrix.shape[0] == len(student_ids) == len(names) == len(student_classes) == rows):
+        return None
+
+    student_classes[student_classes == ''] = None
+    gallery = EmbeddingGallery._from_arrays(student_ids, names, matrix, student_classes)
+    return gallery, int(meta['watermark'])
+
+
+def remove_snapshot(directory: Optional[str] = None):
+    """Anlık görüntü dosyalarını siler"""
+    directory = directory or default_snapshot_directory()
+    array_paths, meta_path = _snapshot_paths(directory)
+    for path in [meta_path] + list(array_paths.values()):
+        if os.path.exists(path):
+            os.remove(path)
@@ -3,11 +3,15 @@ import numpy as np
 import insightface
 from insightface.app import FaceAnalysis
 from insightface.model_zoo import get_model
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Union, Iterable, Iterator, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
 import os
 import time
 import math
 
+from embedding_gallery import EmbeddingGallery, solve_assignment
+from image_frame import ImageFrame, load_image_frame
+
 # Duygu analizi için DeepFace import
 try:
     from deepface import DeepFace
@@ -18,8 +22,10 @@ except ImportError:
 
 # Config import
 try:
-    from config import get_emotion_config
+    from config import get_emotion_config, get_ai_config, get_photo_config
     emotion_config = get_emotion_config()
+    ai_config = get_ai_config()
+    photo_config = get_photo_config()
     CONFIG_AVAILABLE = True
 except ImportError:
     CONFIG_AVAILABLE = False
@@ -40,14 +46,53 @@ except ImportError:
             "neutral": "Nötr"
         }
     emotion_config = DefaultEmotionConfig()
+    class DefaultAIConfig:
+        student_shortlist_k = 0
+        face_assignment_method = "none"
+        face_recognition_threshold = 0.55
+        group_photo_face_count = 5
+        group_recognition_threshold = 0.25
+        face_analysis_modules = ["detection", "recognition", "landmark_2d_106"]
+    ai_config = DefaultAIConfig()
+    class DefaultPhotoConfig:
+        decode_prefetch_workers = 2
+    photo_config = DefaultPhotoConfig()
+
+# Tespit ve embedding her zaman gerekir; landmark_2d_106 olmadan kalite kontrolü basit moda düşer
+REQUIRED_FACE_MODULES = ("detection", "recognition")
+
+
+def face_analysis_modules(modules: Optional[List[str]] = None) -> Optional[List[str]]:
+    """FaceAnalysis allowed_modules değeri (None = paketteki tüm modüller)"""
+    if modules is None:
+        modules = getattr(ai_config, 'face_analysis_modules', None)
+    if not modules:
+        return None
+    return list(REQUIRED_FACE_MODULES) + [m for m in modules if m not in REQUIRED_FACE_MODULES]
+
+
+class DetectionResult(NamedTuple):
+    """detect_faces_batch çıktısı (hata varsa frame/faces None olabilir)"""
+    path: str
+    frame: Optional[ImageFrame]
+    faces: Optional[List[dict]]
+    error: Optional[Exception]
+
 
 class FaceProcessor:
-    def __init__(self):
-        """Yüz işleme modülünü başlatır"""
+    def __init__(self, onnx_threads: int = 0, load_models: bool = True):
+        """
+        Yüz işleme modülünü başlatır
+        onnx_threads: ONNX oturumu başına iş parçacığı sınırı (0 = onnxruntime varsayılanı, tüm çekirdekler)
+        load_models: False ise modeller yüklenmez; yalnızca eşleştirme (find_best_matches*) kullanılır
+        """
+        self.onnx_threads = onnx_threads
         self.face_app = None
         self.face_quality_model = None
         self.emotion_analysis_enabled = DEEPFACE_AVAILABLE and emotion_config.enabled
-        self.init_models()
+        self.face_assignment_enabled = getattr(ai_config, 'face_assignment_method', 'none') != "none"
+        if load_models:
+            self.init_models()
     
     def init_models(self):
         """Tüm modelleri yükler"""
@@ -60,7 +105,13 @@ class FaceProcessor:
             print("İlk çalıştırmada modeller internet üzerinden indirilir")
             print("Bu işlem internet hızınıza bağlı olarak 1-5 dakika sürebilir")
             
-            self.face_app = FaceAnalysis(providers=['CPUExecutionProvider'])
+            # Kullanılmayan modüller (genderage, landmark_3d_68) yüklenmez ve her yüzde çalışmaz
+            if self.onnx_threads > 0:
+                self.face_app = self._create_thread_limited_face_app(self.onnx_threads)
+            else:
+                self.face_app = FaceAnalysis(providers=['CPUExecutionProvider'],
+                                             allowed_modules=face_analysis_modules())
+            print(f"FaceAnalysis modülleri: {', '.join(self.face_app.models)}")
             print("FaceAnalysis modeli hazırlanıyor...")
             self.face_app.prepare(ctx_id=0, det_size=(640, 640))
             
@@ -100,73 +151,63 @@ class FaceProcessor:
             
             raise
     
-    def detect_faces(self, image_path: str) -> List[dict]:
+    def _create_thread_limited_face_app(self, num_threads: int, name: str = "buffalo_l") -> FaceAnalysis:
+        """
+        FaceAnalysis'i oturumları baştan iş parçacığı sınırıyla açılmış modellerle oluşturur
+        FaceAnalysis ve model_zoo.get_model SessionOptions'ı oturuma iletmez; model dosyaları
+        FaceAnalysis ile aynı sırayla ModelRouter'a sınırlı SessionOptions ile verilir, böylece
+        her model bir kez yüklenir (çok süreçli çalışmada aşırı abonelik olmasın diye).
+        """
+        import glob
+        import onnxruntime
+        from insightface.model_zoo.model_zoo import ModelRouter
+        from insightface.utils import ensure_available
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        allowed_modules = face_analysis_modules()
+        
+        face_app = FaceAnalysis.__new__(FaceAnalysis)
+        face_app.models = {}
+        face_app.model_dir = ensure_available('models', name, root='~/.insightface')
+        for onnx_file in sorted(glob.glob(os.path.join(face_app.model_dir, '*.onnx'))):
+            model = ModelRouter(onnx_file).get_model(sess_options=options, providers=['CPUExecutionProvider'])
+            if model is None or model.taskname in face_app.models:
+                continue
+            if allowed_modules is None or model.taskname in allowed_modules:
+                face_app.models[model.taskname] = model
+        
+        if 'detection' not in face_app.models:
+            raise RuntimeError(f"Tespit modeli bulunamadı: {face_app.model_dir}")
+        face_app.det_model = face_app.models['detection']
+        print(f"ONNX oturumları {num_threads} iş parçacığıyla açıldı")
+        return face_app
+    
+    def detect_faces(self, image: Union[str, ImageFrame]) -> List[dict]:
         """
         Görüntüde yüz tespiti yapar
+        image: Dosya yolu veya load_image_frame ile bir kez çözülmüş ImageFrame
         Returns: List of face dictionaries containing bbox, landmarks, embedding
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Görüntü dosyası bulunamadı: {image_path}")
+        frame = load_image_frame(image)
+        print(f"Dosya bilgileri: {frame.describe()}")
         
-        file_size = os.path.getsize(image_path)
-        file_extension = os.path.splitext(image_path)[1].lower()
-        
-        print(f"Dosya bilgileri: {os.path.basename(image_path)} | Boyut: {file_size/1024:.1f}KB | Format: {file_extension}")
-        
-        supported_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
-        if file_extension not in supported_formats:
-            raise ValueError(f"Desteklenmeyen dosya formatı: {file_extension}\n"
-                           f"Desteklenen formatlar: {', '.join(supported_formats)}")
-        
-        # Dosya boyutu kontrolü (50MB limiti)
-        max_size = 50 * 1024 * 1024  # 50MB
-        if file_size > max_size:
-            raise ValueError(f"Dosya çok büyük: {file_size/1024/1024:.1f}MB\n"
-                           f"Maksimum boyut: {max_size/1024/1024}MB")
-        
-        if file_size == 0:
-            raise ValueError(f"Boş dosya: {image_path}")
-        
-        image = cv2.imread(image_path)
-        if image is None:
-            try:
-                from PIL import Image as PILImage
-                import numpy as np
-                
-                print("cv2 başarısız, PIL ile deneniyor...")
-                pil_image = PILImage.open(image_path)
-                image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                print("PIL ile başarıyla yüklendi")
-            except Exception as pil_error:
-                error_message = (
-                    f"GÖRÜNTÜ OKUMA HATASI\n"
-                    f"Dosya: {os.path.basename(image_path)}\n"
-                    f"Boyut: {file_size/1024:.1f}KB\n"
-                    f"Format: {file_extension}\n\n"
-                    f"SORUN NEDENLERI:\n"
-                    f"• Dosya bozuk olabilir\n"
-                    f"• Dosya yolunda özel karakterler var\n"
-                    f"• Dosya şifrelenmişse çözülemiyor\n"
-                    f"• Format desteklenmiyor olabilir\n\n"
-                    f"ÇÖZÜM ÖNERİLERİ:\n"
-                    f"• Başka bir fotoğraf deneyin\n"
-                    f"• Fotoğrafı JPG/PNG formatında kaydedin\n"
-                    f"• Dosya adında Türkçe karakter olmasın\n"
-                    f"• Fotoğrafı başka programda açıp tekrar kaydedin\n\n"
-                    f"Teknik Detay:\n"
-                    f"cv2 hatası: Görüntü formatı okunamadı\n"
-                    f"PIL hatası: {str(pil_error)}"
-                )
-                raise ValueError(error_message)
+        # Büyük fotoğraflar max_photo_dimension'a küçültülerek taranır
+        detection_image, scale = frame.detection_view()
+        if scale != 1.0:
+            print(f"Tespit için küçültüldü: {detection_image.shape[1]}x{detection_image.shape[0]}")
         
         # Yüz tespiti yap
-        faces = self.face_app.get(image)
+        faces = self.face_app.get(detection_image)
         
         face_data = []
         for face in faces:
+            # Koordinatlar orijinal görüntüye döndürülür (kırpmalar tam çözünürlükten yapılır)
+            landmark = face.landmark_2d_106
             face_info = {
-                'bbox': face.bbox,
-                'landmark': face.landmark_2d_106,
+                'bbox': face.bbox / scale,
+                'landmark': landmark / scale if landmark is not None else None,
                 'embedding': face.embedding,
                 'det_score': face.det_score
             }
@@ -174,7 +215,54 @@ class FaceProcessor:
         
         return face_data
     
-    def check_face_quality(self, image_path: str, face_bbox: np.ndarray, landmarks: np.ndarray = None) -> Dict:
+    def detect_faces_batch(self, image_paths: Iterable[str], prefetch: Optional[int] = None) -> Iterator[DetectionResult]:
+        """
+        Fotoğraflarda sırayla yüz tespiti yapar, sonuçları giriş sırasıyla üretir (generator)
+        Küçük bir iş parçacığı havuzu sonraki fotoğrafları okuyup çözerken (cv2 GIL'i bırakır)
+        mevcut fotoğraf ONNX çıkarımındadır. Hatalı fotoğraf döngüyü durdurmaz; hata
+        DetectionResult.error alanında döner.
+        prefetch: Önceden çözülecek fotoğraf sayısı (None = PhotoConfig.decode_prefetch_workers, 0 = sıralı)
+        """
+        if prefetch is None:
+            prefetch = getattr(photo_config, 'decode_prefetch_workers', 2)
+        
+        paths = iter(image_paths)
+        if prefetch <= 0:
+            for path in paths:
+                yield self._detect_prefetched(path, lambda: load_image_frame(path))
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="decode")
+        try:
+            # Çıkarımdaki fotoğrafın yanında `prefetch` kadar fotoğraf çözülmeyi bekler
+            pending = []
+            for path in paths:
+                pending.append((path, executor.submit(load_image_frame, path)))
+                if len(pending) > prefetch:
+                    break
+            
+            while pending:
+                path, future = pending.pop(0)
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(load_image_frame, next_path)))
+                yield self._detect_prefetched(path, future.result)
+        finally:
+            # Generator erken kapatılırsa bekleyen çözme işleri iptal edilir
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _detect_prefetched(self, path: str, get_frame) -> DetectionResult:
+        """Çözülmüş çerçeveyi alıp tespit yapar, hatayı sonuca yazar"""
+        try:
+            frame = get_frame()
+        except Exception as e:
+            return DetectionResult(path, None, None, e)
+        try:
+            return DetectionResult(path, frame, self.detect_faces(frame), None)
+        except Exception as e:
+            return DetectionResult(path, frame, None, e)
+    
+    def check_face_quality(self, image: Union[str, ImageFrame], face_bbox: np.ndarray, landmarks: np.ndarray = None) -> Dict:
         """
         Detaylı yüz kalitesi analizi yapar
         Returns: dict with comprehensive quality scores and checks
@@ -188,9 +276,10 @@ class FaceProcessor:
             print(f"face_bbox geçersiz format: {type(face_bbox)}, uzunluk: {len(face_bbox) if hasattr(face_bbox, '__len__') else 'N/A'}")
             return self._create_empty_quality_result()
         
-        image = cv2.imread(image_path)
-        if image is None:
-            print(f"Görüntü yüklenemedi: {image_path}")
+        try:
+            image = load_image_frame(image).image
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Görüntü yüklenemedi: {e}")
             return self._create_empty_quality_result()
         
         # Yüz bölgesini kırp
@@ -707,61 +796,243 @@ class FaceProcessor:
         similarity = dot_product / (norm1 * norm2)
         return float(similarity)
     
+    @staticmethod
+    def is_group_photo(face_count: int) -> bool:
+        """En az group_photo_face_count yüz içeren fotoğraf grup fotoğrafıdır"""
+        return face_count >= ai_config.group_photo_face_count
+    
+    @classmethod
+    def recognition_threshold(cls, face_count: int) -> float:
+        """
+        Fotoğraftaki yüz sayısına göre tanıma eşiği (GUI ve toplu tanıma aynı kuralı kullanır)
+        Grup fotoğraflarında group_recognition_threshold, diğerlerinde face_recognition_threshold
+        """
+        if cls.is_group_photo(face_count):
+            return ai_config.group_recognition_threshold
+        return ai_config.face_recognition_threshold
+    
     def find_best_match(self, target_embedding: np.ndarray, 
-                       database_embeddings: List[Tuple[int, str, np.ndarray]], 
+                       database_embeddings: Union[EmbeddingGallery, List[Tuple[int, str, np.ndarray]]], 
                        threshold: float = 0.55,
-                       face_count: int = 1) -> Optional[Tuple[int, str, float]]:
+                       face_count: int = 1,
+                       shortlist_k: Optional[int] = None) -> Optional[Tuple[int, str, float]]:
         """
         Hedef embedding ile veritabanındaki embedding'leri karşılaştırır
         %90+ doğruluk için çoklu eşleşme doğrulama sistemi kullanır
+        database_embeddings bir EmbeddingGallery ya da get_all_embeddings() listesi olabilir
+        shortlist_k > 0 ise yalnızca prototipi en yakın K öğrencinin fotoğrafları skorlanır
+        (None: AIModelConfig.student_shortlist_k kullanılır)
         Returns: (student_id, name, similarity_score) or None
         """
-        # Önce standart eşleşme yap
-        best_match = None
-        best_score = threshold
-        candidate_matches = []
+        gallery = self._as_gallery(database_embeddings)
+        if len(gallery) == 0:
+            return None
+        
+        shortlist_k = self._shortlist_k(shortlist_k)
+        if shortlist_k > 0:
+            scores = gallery.shortlist_similarities(target_embedding, shortlist_k)
+        else:
+            # Tüm galeri tek bir matris-vektör çarpımıyla skorlanır
+            scores = gallery.similarities(target_embedding)
+        return self._resolve_match(gallery, scores, threshold, face_count)
+    
+    def find_best_matches(self, target_embeddings: List[np.ndarray],
+                          database_embeddings: Union[EmbeddingGallery, List[Tuple[int, str, np.ndarray]]],
+                          threshold: float = 0.55,
+                          face_count: Optional[int] = None,
+                          shortlist_k: Optional[int] = None) -> List[Optional[Tuple[int, str, float]]]:
+        """
+        Bir fotoğraftaki tüm yüzleri galeriyle tek bir yüz×galeri matris çarpımında karşılaştırır
+        Her yüz için find_best_match ile birebir aynı eşik ve çoklu doğrulama mantığı uygulanır
+        Returns: Her yüz için (student_id, name, similarity_score) or None
+        """
+        if len(target_embeddings) == 0:
+            return []
+        
+        if face_count is None:
+            face_count = len(target_embeddings)
+        
+        gallery = self._as_gallery(database_embeddings)
+        if len(gallery) == 0:
+            return [None] * len(target_embeddings)
+        
+        score_matrix = self._score_matrix(gallery, target_embeddings, shortlist_k)
+        return [self._resolve_match(gallery, scores, threshold, face_count) for scores in score_matrix]
+    
+    def find_top_k(self, target_embedding: np.ndarray,
+                   database_embeddings: Union[EmbeddingGallery, List[Tuple[int, str, np.ndarray]]],
+                   k: int = 5,
+                   shortlist_k: Optional[int] = None) -> List[Tuple[int, str, float, float]]:
+        """
+        Hedef yüze en çok benzeyen K öğrenciyi eşik uygulamadan sıralı döndürür
+        Manuel inceleme için öneri listesidir; find_best_match ile aynı skor satırını kullanır.
+        Returns: [(student_id, name, best_score, avg_score), ...]
+        """
+        return self.find_top_k_batch([target_embedding], database_embeddings, k=k, shortlist_k=shortlist_k)[0]
+    
+    def find_top_k_batch(self, target_embeddings: List[np.ndarray],
+                         database_embeddings: Union[EmbeddingGallery, List[Tuple[int, str, np.ndarray]]],
+                         k: int = 5,
+                         shortlist_k: Optional[int] = None) -> List[List[Tuple[int, str, float, float]]]:
+        """
+        Birden fazla yüz için find_top_k; tüm yüzler tek bir matris çarpımında skorlanır
+        Returns: Her yüz için [(student_id, name, best_score, avg_score), ...]
+        """
+        if len(target_embeddings) == 0:
+            return []
+        
+        gallery = self._as_gallery(database_embeddings)
+        if len(gallery) == 0:
+            return [[] for _ in target_embeddings]
         
-        for student_id, name, db_embedding in database_embeddings:
-            similarity = self.compare_embeddings(target_embedding, db_embedding)
+        score_matrix = self._score_matrix(gallery, target_embeddings, shortlist_k)
+        return gallery.top_k_students(score_matrix, k)
+    
+    def assign_faces(self, target_embeddings: List[np.ndarray],
+                     database_embeddings: Union[EmbeddingGallery, List[Tuple[int, str, np.ndarray]]],
+                     threshold: float = 0.55,
+                     face_count: Optional[int] = None,
+                     method: Optional[str] = None,
+                     shortlist_k: Optional[int] = None) -> List[Optional[Tuple[int, str, float]]]:
+        """
+        Grup fotoğrafındaki yüzleri öğrencilere birebir (bir öğrenci en fazla bir yüz) atar
+        Yüz×öğrenci skor matrisi bir kez oluşturulur, atama tek geçişte çözülür;
+        atanan her çift için find_best_match'teki çoklu doğrulama uygulanır.
+        method: "hungarian" veya "greedy" (None: AIModelConfig.face_assignment_method; o da "none"
+        ise doğrudan çağrılan atama "hungarian" ile çözülür)
+        Returns: Her yüz için (student_id, name, similarity_score) or None
+        """
+        if len(target_embeddings) == 0:
+            return []
+        
+        if face_count is None:
+            face_count = len(target_embeddings)
+        
+        gallery = self._as_gallery(database_embeddings)
+        if len(gallery) == 0:
+            return [None] * len(target_embeddings)
+        
+        method = method or getattr(ai_config, 'face_assignment_method', 'none')
+        if method == "none":
+            method = "hungarian"
+        score_matrix = self._score_matrix(gallery, target_embeddings, shortlist_k)
+        student_score_matrix = gallery.student_score_matrix(score_matrix)
+        _, order, starts, counts, _ = gallery.student_groups()
+        
+        results = [None] * len(target_embeddings)
+        for face_index, column in solve_assignment(student_score_matrix, threshold, method):
+            rows = order[starts[column]:starts[column] + counts[column]]
+            scores = score_matrix[face_index]
+            best_index = int(rows[np.argmax(scores[rows])])
+            best_match = (int(gallery.student_ids[best_index]), gallery.names[best_index], float(scores[best_index]))
             
-            if similarity > threshold:
-                candidate_matches.append((student_id, name, similarity))
-                
-            if similarity > best_score:
-                best_score = similarity
-                best_match = (student_id, name, similarity)
+            same_student_scores = gallery.student_scores(scores, best_match[0], threshold)
+            results[face_index] = self._verify_multi_match(best_match, same_student_scores, face_count)
+        
+        return results
+    
+    def find_best_matches_ranked(self, target_embeddings: List[np.ndarray],
+                                 galleries: List[EmbeddingGallery],
+                                 threshold: float = 0.55,
+                                 face_count: Optional[int] = None,
+                                 one_to_one: bool = False) -> List[Optional[Tuple[int, str, float]]]:
+        """
+        Galeri bölümlerinde (ör. sınıflar) sırayla arama yapar
+        İlk bölümde eşleşmeyen yüzler bir sonraki bölümde denenir.
+        one_to_one: Her bölümde assign_faces kullanılır ve atanmış öğrenciler sonraki bölümlerden çıkarılır
+        Returns: Her yüz için (student_id, name, similarity_score) or None
+        """
+        if face_count is None:
+            face_count = len(target_embeddings)
+        
+        results = [None] * len(target_embeddings)
+        pending = list(range(len(target_embeddings)))
+        
+        for gallery in galleries:
+            if not pending:
+                break
+            if one_to_one:
+                gallery = gallery.without_students([match[0] for match in results if match])
+            if len(gallery) == 0:
+                continue
+            
+            pending_embeddings = [target_embeddings[i] for i in pending]
+            if one_to_one:
+                matches = self.assign_faces(pending_embeddings, gallery, threshold=threshold, face_count=face_count)
+            else:
+                matches = self.find_best_matches(pending_embeddings, gallery, threshold=threshold, face_count=face_count)
+            
+            for face_index, match in zip(pending, matches):
+                results[face_index] = match
+            pending = [face_index for face_index in pending if results[face_index] is None]
+        
+        return results
+    
+    def _score_matrix(self, gallery: EmbeddingGallery, target_embeddings: List[np.ndarray],
+                      shortlist_k: Optional[int]) -> np.ndarray:
+        """Tüm yüzlerin galeri skorlarını tek seferde hesaplar (F, N)"""
+        queries = np.stack([np.asarray(e).ravel() for e in target_embeddings])
+        shortlist_k = self._shortlist_k(shortlist_k)
+        if shortlist_k > 0:
+            return gallery.shortlist_similarities_batch(queries, shortlist_k)
+        return gallery.similarities_batch(queries)
+    
+    def _shortlist_k(self, shortlist_k: Optional[int]) -> int:
+        """Öğrenci ön eleme (shortlist) boyutunu çözer; 0 tam arama demektir"""
+        if shortlist_k is None:
+            shortlist_k = getattr(ai_config, 'student_shortlist_k', 0)
+        return max(0, int(shortlist_k or 0))
+    
+    def _as_gallery(self, database_embeddings) -> EmbeddingGallery:
+        """Liste formatındaki embedding'leri galeriye çevirir"""
+        if isinstance(database_embeddings, EmbeddingGallery):
+            return database_embeddings
+        return EmbeddingGallery.from_records(database_embeddings)
+    
+    def _resolve_match(self, gallery: EmbeddingGallery, scores: np.ndarray,
+                       threshold: float, face_count: int) -> Optional[Tuple[int, str, float]]:
+        """Bir yüzün skor satırından en iyi eşleşmeyi ve çoklu doğrulamayı uygular"""
+        # argmax eşit skorlarda ilk satırı seçer (eski döngüdeki '>' davranışı)
+        best_index = int(np.argmax(scores))
+        best_score = float(scores[best_index])
+        if best_score <= threshold:
+            return None
+        
+        best_match = (int(gallery.student_ids[best_index]), gallery.names[best_index], best_score)
         
         # Çoklu doğrulama: En iyi eşleşme için aynı kişinin diğer fotoğraflarıyla da kontrol et
-        if best_match and len(candidate_matches) > 0:
-            best_student_id = best_match[0]
-            best_student_name = best_match[1]
+        same_student_scores = gallery.student_scores(scores, best_match[0], threshold)
+        return self._verify_multi_match(best_match, same_student_scores, face_count)
+    
+    def _verify_multi_match(self, best_match: Tuple[int, str, float],
+                            same_student_scores: np.ndarray,
+                            face_count: int) -> Optional[Tuple[int, str, float]]:
+        """Aynı öğrencinin eşiği geçen fotoğraf skorlarıyla ortalama/minimum doğrulaması yapar"""
+        best_student_id, best_student_name, _ = best_match
+        
+        if len(same_student_scores) >= 2:  # En az 2 fotoğrafla eşleşme varsa
+            same_student_scores = np.asarray(same_student_scores, dtype=np.float64)
+            avg_score = float(same_student_scores.mean())
+            min_score = float(same_student_scores.min())
             
-            # Aynı öğrencinin tüm embedding'lerini bul
-            same_student_scores = [score for sid, name, score in candidate_matches 
-                                 if sid == best_student_id]
+            # ADAPTIVE Çoklu doğrulama kriterleri (grup fotoğrafları için optimize edilmiş)
+            if face_count >= 5:  # Grup fotoğrafı
+                multi_avg_threshold = 0.30  # %30
+                multi_min_threshold = 0.20  # %20
+                print(f"GRUP FOTOĞRAFI → Multi-match thresholds: avg %30, min %20")
+            else:  # Normal fotoğraf
+                multi_avg_threshold = 0.58  # %58 
+                multi_min_threshold = 0.52  # %52
+                print(f"NORMAL FOTOĞRAF → Multi-match thresholds: avg %58, min %52")
             
-            if len(same_student_scores) >= 2:  # En az 2 fotoğrafla eşleşme varsa
-                avg_score = sum(same_student_scores) / len(same_student_scores)
-                min_score = min(same_student_scores)
-                
-                # ADAPTIVE Çoklu doğrulama kriterleri (grup fotoğrafları için optimize edilmiş)
-                if face_count >= 5:  # Grup fotoğrafı
-                    multi_avg_threshold = 0.30  # %30
-                    multi_min_threshold = 0.20  # %20
-                    print(f"GRUP FOTOĞRAFI → Multi-match thresholds: avg %30, min %20")
-                else:  # Normal fotoğraf
-                    multi_avg_threshold = 0.58  # %58 
-                    multi_min_threshold = 0.52  # %52
-                    print(f"NORMAL FOTOĞRAF → Multi-match thresholds: avg %58, min %52")
-                
-                if avg_score >= multi_avg_threshold and min_score >= multi_min_threshold:
-                    print(f"Çoklu doğrulama başarılı: {len(same_student_scores)} eşleşme, "
-                          f"ortalama: {avg_score:.2%}, minimum: {min_score:.2%}")
-                    return (best_student_id, best_student_name, avg_score)
-                else:
-                    print(f"Çoklu doğrulama başarısız: ortalama {avg_score:.2%} < {multi_avg_threshold:.0%} "
-                          f"veya minimum {min_score:.2%} < {multi_min_threshold:.0%}")
-                    return None
+            if avg_score >= multi_avg_threshold and min_score >= multi_min_threshold:
+                print(f"Çoklu doğrulama başarılı: {len(same_student_scores)} eşleşme, "
+                      f"ortalama: {avg_score:.2%}, minimum: {min_score:.2%}")
+                return (best_student_id, best_student_name, avg_score)
+            else:
+                print(f"Çoklu doğrulama başarısız: ortalama {avg_score:.2%} < {multi_avg_threshold:.0%} "
+                      f"veya minimum {min_score:.2%} < {multi_min_threshold:.0%}")
+                return None
         
         return best_match
     
@@ -771,12 +1042,14 @@ class FaceProcessor:
         """
         processed_faces = []
         
-        for i, image_path in enumerate(image_paths, 1):
+        # Sonraki fotoğraflar tespit sırasında arka planda çözülür; kalite analizi aynı çerçeveyi kullanır
+        for i, result in enumerate(self.detect_faces_batch(image_paths), 1):
+            image_path, frame, faces = result.path, result.frame, result.faces
             try:
                 print(f"\n📸 Fotoğraf {i}/{len(image_paths)} işleniyor: {os.path.basename(image_path)}")
                 
-                # Yüz tespiti
-                faces = self.detect_faces(image_path)
+                if result.error is not None:
+                    raise result.error
                 
                 if not faces:
                     print(f"Yüz bulunamadı")
@@ -785,12 +1058,12 @@ class FaceProcessor:
                 # En büyük yüzü seç (det_score'a göre)
                 best_face = max(faces, key=lambda x: x['det_score'])
                 
-                quality = self.check_face_quality(image_path, best_face['bbox'], best_face.get('landmark'))
+                quality = self.check_face_quality(frame, best_face['bbox'], best_face.get('landmark'))
                 
                 self._print_quality_report(quality, i)
                 
                 # Kalite eşiğini kontrol et (dengeli yaklaşım: 3/5 kriter, tanıma aşaması katı)
-                if quality['summary']['total_passed'] >= 3 and quality['overall_quality'] >= 0.60:
+                if self.passes_registration_quality(quality):
                     processed_faces.append({
                         'image_path': image_path,
                         'face_data': best_face,
@@ -808,6 +1081,11 @@ class FaceProcessor:
         print(f"\nSonuç: {len(processed_faces)}/{len(image_paths)} fotoğraf kabul edildi")
         return processed_faces
     
+    @staticmethod
+    def passes_registration_quality(quality: Dict) -> bool:
+        """Kayıt için kalite şartı: en az 3/5 kriter ve genel skor ≥ 0.60"""
+        return quality['summary']['total_passed'] >= 3 and quality['overall_quality'] >= 0.60
+    
     def _print_quality_report(self, quality: Dict, photo_num: int):
         """Kalite raporu yazdırır"""
         print(f"    Kalite Analizi:")
@@ -831,11 +1109,11 @@ class FaceProcessor:
     
     # =================== DUYGU ANALİZİ ÖZELLİKLERİ ===================
     
-    def analyze_emotion(self, image_path: str, face_bbox: Optional[Tuple] = None) -> Dict:
+    def analyze_emotion(self, image: Union[str, ImageFrame], face_bbox: Optional[Tuple] = None) -> Dict:
         """
         Verilen görüntüde duygu analizi yapar
         Args:
-            image_path: Görüntü dosya yolu
+            image: Görüntü dosya yolu veya ImageFrame
             face_bbox: Yüz koordinatları (x1, y1, x2, y2), None ise otomatik tespit
         Returns: {"success": bool, "emotions": dict, "dominant_emotion": str, "message": str}
         """
@@ -848,17 +1126,20 @@ class FaceProcessor:
             }
         
         try:
+            try:
+                frame = load_image_frame(image)
+            except (FileNotFoundError, ValueError):
+                return {
+                    "success": False,
+                    "emotions": {},
+                    "dominant_emotion": None,
+                    "message": "Görüntü okunamadı"
+                }
+            
             # Face region'ı belirle
             if face_bbox is not None:
                 # Bbox verilmişse yüzü kırp
-                image = cv2.imread(image_path)
-                if image is None:
-                    return {
-                        "success": False,
-                        "emotions": {},
-                        "dominant_emotion": None,
-                        "message": "Görüntü okunamadı"
-                    }
+                image = frame.image
                 
                 x1, y1, x2, y2 = face_bbox
                 x1, y1, x2, y2 = max(0, int(x1)), max(0, int(y1)), int(x2), int(y2)
@@ -873,25 +1154,17 @@ class FaceProcessor:
                         "message": "Geçersiz yüz bölgesi"
                     }
                 
-                import tempfile
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-                    cv2.imwrite(tmp_file.name, face_region)
-                    temp_path = tmp_file.name
-                
-                try:
-                    # DeepFace ile analiz
-                    result = DeepFace.analyze(
-                        img_path=temp_path,
-                        actions=['emotion'],
-                        detector_backend=emotion_config.backend,
-                        enforce_detection=emotion_config.enforce_detection,
-                        silent=True
-                    )
-                finally:
-                    os.unlink(temp_path)
+                # DeepFace BGR diziyi doğrudan kabul eder (geçici JPEG yazılıp yeniden çözülmez)
+                result = DeepFace.analyze(
+                    img_path=face_region,
+                    actions=['emotion'],
+                    detector_backend=emotion_config.backend,
+                    enforce_detection=emotion_config.enforce_detection,
+                    silent=True
+                )
             else:
                 result = DeepFace.analyze(
-                    img_path=image_path,
+                    img_path=frame.image,
                     actions=['emotion'],
                     detector_backend=emotion_config.backend,
                     enforce_detection=emotion_config.enforce_detection,
@@ -962,20 +1235,25 @@ class FaceProcessor:
                     "message": f"Duygu analizi hatası: {error_msg}"
                 }
     
-    def analyze_multiple_faces_emotions(self, image_path: str, faces: List[Dict]) -> List[Dict]:
+    def analyze_multiple_faces_emotions(self, image: Union[str, ImageFrame], faces: List[Dict]) -> List[Dict]:
         """
         Birden fazla yüz için duygu analizi yapar
         Args:
-            image_path: Görüntü dosya yolu
+            image: Görüntü dosya yolu veya ImageFrame (tüm yüzler için bir kez çözülür)
             faces: Yüz listesi (detect_faces çıktısı)
         Returns: List[{"face_index": int, "emotion_analysis": dict}]
         """
         emotions_results = []
         
+        try:
+            image = load_image_frame(image)
+        except (FileNotFoundError, ValueError):
+            pass  # analyze_emotion her yüz için "Görüntü okunamadı" döndürür
+        
         for i, face in enumerate(faces):
             bbox = face.get('bbox')
             if bbox is not None:
-                emotion_result = self.analyze_emotion(image_path, tuple(bbox))
+                emotion_result = self.analyze_emotion(image, tuple(bbox))
                 emotions_results.append({
                     "face_index": i,
                     "emotion_analysis": emotion_result
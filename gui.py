@@ -10,6 +10,7 @@ from io import StringIO
 from typing import List
 from database import DatabaseManager
 from face_processor import FaceProcessor
+from image_frame import load_image_frame
 
 class FaceRecognitionGUI:
     def __init__(self):
@@ -40,6 +41,12 @@ class FaceRecognitionGUI:
         self.detected_faces = []  
         self.manual_face_buttons_frame = None  
         
+        # Öğrenci listesi sayfalama
+        self.student_page_size = 100
+        self.student_page_key = None
+        self.student_page_loading = False
+        self.student_loaded_count = 0
+        
         self.console_output = StringIO()
         
         self.setup_gui()
@@ -513,8 +520,9 @@ class FaceRecognitionGUI:
             photo_num = len(self.captured_photos) + 1
             filename = os.path.basename(photo_path)
             
-            # Yüz tespiti
-            faces = self.face_processor.detect_faces(photo_path)
+            # Yüz tespiti (fotoğraf bir kez çözülür, kalite analizi aynı çerçeveyi kullanır)
+            frame = load_image_frame(photo_path)
+            faces = self.face_processor.detect_faces(frame)
             
             if not faces:
                 # Başarısız kayıt - yüz bulunamadı
@@ -557,7 +565,7 @@ class FaceRecognitionGUI:
             
             try:
                 quality = self.face_processor.check_face_quality(
-                    photo_path, best_face['bbox'], best_face.get('landmark')
+                    frame, best_face['bbox'], best_face.get('landmark')
                 )
                 
                 if quality is None:
@@ -1193,9 +1201,8 @@ class FaceRecognitionGUI:
                 messagebox.showerror("Hata", "Kaliteli fotoğraf bulunamadı!")
                 return
             
-            # Veritabanına kaydet
-            student_pk = self.db_manager.add_student(self.current_student_name, self.current_student_id, self.current_student_class)
-            
+            # Veritabanına kaydet (öğrenci + tüm fotoğraflar tek işlemde)
+            photos = []
             for photo_data in quality_photos:
                 embedding = photo_data['face_data']['embedding']
                 quality_score = photo_data['quality']['overall_quality']
@@ -1205,7 +1212,10 @@ class FaceRecognitionGUI:
                 # Formatlanmış kalite raporu oluştur
                 quality_report = self.db_manager.generate_formatted_quality_report(photo_path, quality_details)
                 
-                self.db_manager.add_face_embedding(student_pk, embedding, photo_path, quality_score, quality_details, quality_report)
+                photos.append((embedding, photo_path, quality_score, quality_details, quality_report))
+            
+            self.db_manager.register_student_bulk(self.current_student_name, self.current_student_id,
+                                                  self.current_student_class, photos)
             
             # Doğruluk hesaplama
             if len(quality_photos) > 1:
@@ -1354,7 +1364,27 @@ class FaceRecognitionGUI:
             cursor='hand2',
             pady=20
         )
-        upload_btn.pack(pady=30)
+        upload_btn.pack(pady=(30, 10))
+        
+        # Sınıf filtresi: boş = tüm öğrenciler, "9-A, 9-B" = sırayla denenecek sınıflar
+        class_filter_frame = tk.Frame(upload_frame, bg='white')
+        class_filter_frame.pack(pady=(0, 20))
+        
+        tk.Label(
+            class_filter_frame,
+            text="🏫 Sınıf (opsiyonel, virgülle sıralı):",
+            font=('Arial', 10),
+            bg='white'
+        ).pack(side='left', padx=(0, 5))
+        
+        self.recognition_class_var = tk.StringVar(value="")
+        self.recognition_class_combo = ttk.Combobox(
+            class_filter_frame,
+            textvariable=self.recognition_class_var,
+            values=[""] + self.db_manager.get_student_classes(),
+            width=25
+        )
+        self.recognition_class_combo.pack(side='left')
         
         # FOTOĞRAF GÖSTERIM ALANI
         photo_display_frame = tk.Frame(self.scrollable_frame, bg='white', relief='solid', bd=1)
@@ -1461,6 +1491,35 @@ class FaceRecognitionGUI:
         )
         title.pack(pady=(0, 20))
         
+        # Arama ve sınıf filtresi (sunucu tarafında uygulanır)
+        filter_frame = tk.Frame(self.main_frame, bg='#f0f0f0')
+        filter_frame.pack(pady=(0, 5), padx=20, fill='x')
+        
+        tk.Label(filter_frame, text="🔍 Ad:", font=('Arial', 10), bg='#f0f0f0').pack(side='left')
+        self.student_search_var = tk.StringVar()
+        search_entry = tk.Entry(filter_frame, textvariable=self.student_search_var, font=('Arial', 10), width=25)
+        search_entry.pack(side='left', padx=(5, 15))
+        
+        tk.Label(filter_frame, text="🏫 Sınıf:", font=('Arial', 10), bg='#f0f0f0').pack(side='left')
+        self.student_class_var = tk.StringVar(value="Tümü")
+        class_combo = ttk.Combobox(
+            filter_frame,
+            textvariable=self.student_class_var,
+            values=["Tümü"] + self.db_manager.get_student_classes(),
+            state='readonly',
+            width=12
+        )
+        class_combo.pack(side='left', padx=5)
+        
+        # Yazarken her tuşta değil, kısa bir bekleme sonrası aranır
+        self.student_search_job = None
+        def _schedule_search(*args):
+            if self.student_search_job:
+                self.root.after_cancel(self.student_search_job)
+            self.student_search_job = self.root.after(300, self.load_student_list)
+        self.student_search_var.trace_add('write', _schedule_search)
+        class_combo.bind('<<ComboboxSelected>>', lambda e: self.load_student_list())
+        
         # Tablo frame
         table_frame = tk.Frame(self.main_frame, bg='white')
         table_frame.pack(pady=10, padx=20, fill='both', expand=True)
@@ -1482,9 +1541,14 @@ class FaceRecognitionGUI:
         self.student_tree.heading('Fotoğraf Sayısı', text='Fotoğraf Sayısı')
         self.student_tree.column('Fotoğraf Sayısı', width=150)
         
-        # Scrollbar
+        # Scrollbar - listenin sonuna yaklaşınca sonraki sayfa yüklenir
         scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.student_tree.yview)
-        self.student_tree.configure(yscrollcommand=scrollbar.set)
+        def _on_tree_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= 0.95 and self.student_page_key and not self.student_page_loading:
+                self.student_page_loading = True
+                self.root.after_idle(self._load_next_student_page)
+        self.student_tree.configure(yscrollcommand=_on_tree_scroll)
         
         self.student_tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
@@ -1571,12 +1635,15 @@ class FaceRecognitionGUI:
         try:
             photo_analyses = []
             
-            for i, photo_path in enumerate(self.selected_photos, 1):
+            # Sonraki fotoğraflar tespit sırasında arka planda çözülür
+            results = self.face_processor.detect_faces_batch(self.selected_photos)
+            for i, result in enumerate(results, 1):
+                photo_path, frame, faces = result.path, result.frame, result.faces
                 self.root.after(0, lambda i=i: self.update_status(f"🔄 Fotoğraf {i}/{len(self.selected_photos)} analiz ediliyor..."))
                 
                 try:
-                    # Yüz tespiti
-                    faces = self.face_processor.detect_faces(photo_path)
+                    if result.error is not None:
+                        raise result.error
                     
                     if not faces:
                         photo_analyses.append({
@@ -1592,7 +1659,7 @@ class FaceRecognitionGUI:
                     
                     # Kalite kontrolü
                     quality = self.face_processor.check_face_quality(
-                        photo_path, 
+                        frame, 
                         best_face['bbox'], 
                         best_face.get('landmark')
                     )
@@ -1906,9 +1973,8 @@ class FaceRecognitionGUI:
     def _complete_student_registration(self, name, student_id, student_class, processed_faces):
         """Öğrenci kayıt işlemini tamamlar (thread-safe)"""
         try:
-            # Veritabanına kaydet
-            student_pk = self.db_manager.add_student(name, student_id, student_class)
-            
+            # Veritabanına kaydet (öğrenci + tüm fotoğraflar tek işlemde)
+            photos = []
             for face_data in processed_faces:
                 embedding = face_data['face_data']['embedding']
                 quality_score = face_data['quality']['overall_quality']
@@ -1918,7 +1984,9 @@ class FaceRecognitionGUI:
                 # Formatlanmış kalite raporu oluştur
                 quality_report = self.db_manager.generate_formatted_quality_report(photo_path, quality_details)
                 
-                self.db_manager.add_face_embedding(student_pk, embedding, photo_path, quality_score, quality_details, quality_report)
+                photos.append((embedding, photo_path, quality_score, quality_details, quality_report))
+            
+            self.db_manager.register_student_bulk(name, student_id, student_class, photos)
             
             # UI güncellemelerini main thread'de yap
             avg_quality = sum(f['quality']['overall_quality'] for f in processed_faces) / len(processed_faces)
@@ -2022,7 +2090,8 @@ class FaceRecognitionGUI:
             self.root.after(0, lambda: self.display_initial_photo(file_path))
             
             self.update_status("🔄 Yüzler tespit ediliyor...")
-            threading.Thread(target=self._process_face_recognition, args=(file_path,), daemon=True).start()
+            class_filters = self._get_recognition_class_filters()
+            threading.Thread(target=self._process_face_recognition, args=(file_path, class_filters), daemon=True).start()
             
         except Exception as e:
             messagebox.showerror(
@@ -2031,6 +2100,13 @@ class FaceRecognitionGUI:
                 " Başka bir fotoğraf deneyin."
             )
     
+    def _get_recognition_class_filters(self):
+        """Tanıma ekranındaki sınıf filtresini sıralı listeye çevirir (boşsa None)"""
+        if not hasattr(self, 'recognition_class_var'):
+            return None
+        classes = [c.strip() for c in self.recognition_class_var.get().split(',') if c.strip()]
+        return classes or None
+    
     def display_initial_photo(self, image_path):
         """İlk yükleme sırasında fotoğrafı gösterir (yüz işaretlemesi olmadan)"""
         try:
@@ -2068,11 +2144,15 @@ class FaceRecognitionGUI:
                 fg='#e74c3c'
             )
     
-    def _process_face_recognition(self, image_path):
-        """ÇOKLU YÜZ + İSİM ETİKETLEME DESTEKLİ tanıma işlemi"""
+    def _process_face_recognition(self, image_path, class_filters=None):
+        """
+        ÇOKLU YÜZ + İSİM ETİKETLEME DESTEKLİ tanıma işlemi
+        class_filters: Sırayla aranacak sınıflar; None ise tüm galeride arama yapılır
+        """
         try:
-            # Yüz tespit et
-            faces = self.face_processor.detect_faces(image_path)
+            # Yüz tespit et (duygu analizi de aynı çözülmüş çerçeveyi kullanır)
+            frame = load_image_frame(image_path)
+            faces = self.face_processor.detect_faces(frame)
             
             # Tespit edilen yüzleri kaydet
             self.detected_faces = faces
@@ -2086,13 +2166,20 @@ class FaceRecognitionGUI:
             face_count = len(faces)
             print(f" {face_count} yüz tespit edildi - tümü test ediliyor...")
             
-            # Veritabanındaki yüzlerle karşılaştır
-            db_embeddings = self.db_manager.get_all_embeddings()
+            # Veritabanındaki yüzlerle karşılaştır (önbellekten; değişiklik yoksa DB'ye gidilmez)
+            if class_filters:
+                galleries = [self.db_manager.get_gallery([student_class]) for student_class in class_filters]
+                gallery = self.db_manager.get_gallery(class_filters)
+                print(f"🏫 Sınıf filtresi: {', '.join(class_filters)} ({len(gallery)} embedding)")
+            else:
+                gallery = self.db_manager.get_gallery()
+                galleries = [gallery]
             
-            if not db_embeddings:
+            if len(gallery) == 0:
                 # Veritabanı boşsa sadece yüzleri göster (isim olmadan)
                 self.root.after(0, lambda: self.display_photo_with_faces(image_path, faces))
-                self.root.after(0, lambda: self._show_recognition_result("ℹ️ Veritabanında kayıtlı öğrenci yok", None, None))
+                empty_message = "ℹ️ Seçilen sınıflarda kayıtlı öğrenci yok" if class_filters else "ℹ️ Veritabanında kayıtlı öğrenci yok"
+                self.root.after(0, lambda: self._show_recognition_result(empty_message, None, None))
                 return
             
             # TÜM YÜZLERİ TEST ET VE İSİM ETİKETLERİNİ HAZIRLA
@@ -2101,28 +2188,43 @@ class FaceRecognitionGUI:
             face_matches = []
             
             # Veritabanı bilgisi
-            unique_names = list(set([name for _, name, _ in db_embeddings]))
+            unique_names = gallery.unique_names()
             status_msg = f"Tanıma için hazır: {len(unique_names)} kişi kayıtlı"
             print(status_msg)
             self.update_status(status_msg)
             
-            for i, face in enumerate(faces, 1):
-                embedding = face['embedding']
+            # AKILLI THRESHOLD SİSTEMİ - Grup fotoğrafları için özel threshold
+            # Çoklu yüz tespit edildiğinde daha toleranslı threshold kullan (toplu tanıma ile aynı kural)
+            adaptive_threshold = self.face_processor.recognition_threshold(face_count)
+            if self.face_processor.is_group_photo(face_count):  # Grup fotoğrafı tespit edildi
+                print(f"🎭 GRUP FOTOĞRAFI TESPİT EDİLDİ ({face_count} yüz) → Threshold: %{adaptive_threshold * 100:.0f}")
+            else:
+                print(f"👤 TEK/AZ YÜZ TESPİT EDİLDİ ({face_count} yüz) → Threshold: %{adaptive_threshold * 100:.0f}")
+            
+            # Tüm yüzler galeriyle tek bir yüz×galeri matris çarpımında karşılaştırılır
+            # Çoklu yüzde birebir atama: iki yüz aynı öğrenciye etiketlenemez
+            # Sınıf filtresi varsa sınıflar sırayla denenir
+            face_embeddings = [face['embedding'] for face in faces]
+            matches = self.face_processor.find_best_matches_ranked(
+                face_embeddings, galleries,
+                threshold=adaptive_threshold, face_count=face_count,
+                one_to_one=face_count > 1 and self.face_processor.face_assignment_enabled
+            )
+            
+            # Tanınmayan yüzler için manuel incelemede gösterilecek olası öğrenciler
+            unmatched_indices = [index for index, match in enumerate(matches) if match is None]
+            self.face_suggestions = {}
+            if unmatched_indices:
+                suggestions = self.face_processor.find_top_k_batch(
+                    [face_embeddings[index] for index in unmatched_indices], gallery, k=3
+                )
+                self.face_suggestions = {index + 1: s for index, s in zip(unmatched_indices, suggestions)}
+            
+            for i, (face, match) in enumerate(zip(faces, matches), 1):
                 det_score = face['det_score']
                 
                 print(f" Yüz {i}/{face_count} analiz ediliyor...")
                 
-                # AKILLI THRESHOLD SİSTEMİ - Grup fotoğrafları için özel threshold
-                # Çoklu yüz tespit edildiğinde daha toleranslı threshold kullan
-                if face_count >= 5:  # Grup fotoğrafı tespit edildi
-                    adaptive_threshold = 0.25  # %25 - Grup fotoğrafları için
-                    print(f"🎭 GRUP FOTOĞRAFI TESPİT EDİLDİ ({face_count} yüz) → Threshold: %25")
-                else:
-                    adaptive_threshold = 0.55  # %55 - Normal threshold
-                    print(f"👤 TEK/AZ YÜZ TESPİT EDİLDİ ({face_count} yüz) → Threshold: %55")
-                
-                match = self.face_processor.find_best_match(embedding, db_embeddings, threshold=adaptive_threshold, face_count=face_count)
-                
                 if match:
                     student_id, name, similarity = match
                     print(f" Tanındı: {name} (%{similarity:.1%})")
@@ -2138,7 +2240,7 @@ class FaceRecognitionGUI:
                     # Duygu analizi ekle (eğer etkinse)
                     if self.face_processor.emotion_analysis_enabled:
                         try:
-                            emotion_result = self.face_processor.analyze_emotion(image_path, tuple(face["bbox"]))
+                            emotion_result = self.face_processor.analyze_emotion(frame, tuple(face["bbox"]))
                             match_data['emotion_analysis'] = emotion_result
                             if emotion_result['success']:
                                 print(f" Duygu: {emotion_result['dominant_emotion']} (%{emotion_result['dominant_score']:.1f})")
@@ -2459,31 +2561,58 @@ class FaceRecognitionGUI:
             self.update_status(" Silme işleminde sistem hatası")
     
     def load_student_list(self):
-        """Öğrenci listesini yükler"""
+        """Öğrenci listesini baştan yükler (yalnızca ilk sayfa; devamı kaydırdıkça gelir)"""
         try:
+            self.student_search_job = None
+            
             # Mevcut verileri temizle
             for item in self.student_tree.get_children():
                 self.student_tree.delete(item)
             
-            # Yeni verileri ekle
-            students = self.db_manager.get_all_students()
+            self.student_page_key = None
+            self.student_page_loading = True
+            self.student_loaded_count = 0
+            self._load_next_student_page(first_page=True)
+            
+        except Exception as e:
+            messagebox.showerror("Hata", f"Öğrenci listesi yüklenirken hata oluştu: {e}")
+            self.update_status(" Öğrenci listesi yüklenemedi")
+    
+    def _load_next_student_page(self, first_page: bool = False):
+        """Sonraki öğrenci sayfasını keyset sayfalama ile çekip tabloya ekler"""
+        try:
+            if not first_page and not self.student_page_key:
+                return
+            
+            class_filter = self.student_class_var.get()
+            students, self.student_page_key = self.db_manager.get_students_page(
+                after_key=self.student_page_key,
+                limit=self.student_page_size,
+                class_filter=None if class_filter == "Tümü" else class_filter,
+                name_prefix=self.student_search_var.get().strip() or None
+            )
             
-            if not students:
+            if first_page and not students:
                 # Hiç öğrenci yoksa bilgi göster
-                self.student_tree.insert('', 'end', values=("", "📝 Henüz kayıtlı öğrenci yok", "", "0"))
-            else:
-                for student_id, name, student_class, photo_count in students:
-                    # Sınıf bilgisi boşsa "-" göster
-                    display_class = student_class if student_class else "-"
-                    self.student_tree.insert('', 'end', values=(student_id, name, display_class, photo_count))
+                message = "🔍 Aramaya uyan öğrenci yok" if self.student_search_var.get().strip() or class_filter != "Tümü" \
+                    else "📝 Henüz kayıtlı öğrenci yok"
+                self.student_tree.insert('', 'end', values=("", message, "", "0"))
+            
+            for student_id, name, student_class, photo_count in students:
+                # Sınıf bilgisi boşsa "-" göster
+                display_class = student_class if student_class else "-"
+                self.student_tree.insert('', 'end', values=(student_id, name, display_class, photo_count))
             
             # Durum güncelle
-            student_count = len(students)
-            self.update_status(f" {student_count} kayıtlı öğrenci listelendi")
+            self.student_loaded_count += len(students)
+            more = " (devamı için kaydırın)" if self.student_page_key else ""
+            self.update_status(f" {self.student_loaded_count} öğrenci listelendi{more}")
             
         except Exception as e:
             messagebox.showerror("Hata", f"Öğrenci listesi yüklenirken hata oluştu: {e}")
             self.update_status(" Öğrenci listesi yüklenemedi")
+        finally:
+            self.student_page_loading = False
     
     def show_quality_report(self):
         """Kalite raporunu gösterir"""
@@ -2626,6 +2755,38 @@ class FaceRecognitionGUI:
 • Mükemmel kalite oranı: %{stats['quality_distribution']['excellent']:.1f}
 • Sistem kalite başarısı: {'🟢 YÜKSEK' if stats['quality_distribution']['excellent'] > 70 else '🟡 ORTA' if stats['quality_distribution']['excellent'] > 50 else '🔴 DÜŞÜK'}
 • Önerilen iyileştirme: {'Fotoğraf kalitesini artırın' if stats['average_quality'] < 0.7 else 'Mevcut kalite standardı uygun'}
+"""
+            
+            # Sınıf ve gün bazında dağılım (quality_statistics tablosundan, fotoğraf sayısından bağımsız)
+            class_stats = self.db_manager.get_quality_statistics_breakdown("student_class")
+            if class_stats:
+                general_info += f"""
+🏫 SINIF BAZINDA KALİTE
+{'='*50}
+"""
+                for row in class_stats:
+                    general_info += (f"• {row['student_class'] or 'Sınıfsız'}: {row['total_photos']} fotoğraf, "
+                                     f"ort. {row['average_quality']:.3f}, mükemmel %{row['quality_distribution']['excellent']}\n")
+            
+            daily_stats = self.db_manager.get_quality_statistics_breakdown("stat_date")[-7:]
+            if daily_stats:
+                general_info += f"""
+📅 SON GÜNLER
+{'='*50}
+"""
+                for row in daily_stats:
+                    general_info += f"• {row['stat_date']}: {row['total_photos']} fotoğraf, ort. {row['average_quality']:.3f}\n"
+            
+            # Veritabanı bağlantı havuzu metrikleri
+            pool_stats = self.db_manager.get_pool_stats()
+            general_info += f"""
+🔌 VERİTABANI BAĞLANTI HAVUZU
+{'='*50}
+• Havuz boyutu: {pool_stats['pool_size']} (+{pool_stats['max_overflow']} taşma)
+• Kullanımda: {pool_stats['checked_out']} (en yüksek: {pool_stats['peak_checked_out']})
+• Toplam bağlantı alımı: {pool_stats['checkouts']}
+• Bekleme: ort. {pool_stats['avg_wait_ms']:.1f} ms, en fazla {pool_stats['max_wait_ms']:.1f} ms
+• Yavaş alım / zaman aşımı: {pool_stats['slow_checkouts']} / {pool_stats['timeouts']}
 """
             
             text_area = scrolledtext.ScrolledText(
@@ -3170,6 +3331,21 @@ class FaceRecognitionGUI:
                     pady=8
                 )
                 btn.pack(pady=5, padx=10, anchor='center')
+                
+                # En benzer öğrenciler (eşik altında kalsalar da) öneri olarak gösterilir
+                suggestions = getattr(self, 'face_suggestions', {}).get(face_num_int, [])
+                if suggestions:
+                    suggestion_text = ", ".join(
+                        f"{name} (%{best_score * 100:.1f})" for _, name, best_score, _ in suggestions
+                    )
+                    suggestion_label = tk.Label(
+                        self.manual_face_buttons_frame,
+                        text=f"💡 Olası öğrenciler: {suggestion_text}",
+                        font=('Arial', 9),
+                        bg='#f0f0f0',
+                        fg='#7f8c8d'
+                    )
+                    suggestion_label.pack(pady=(0, 5), padx=10, anchor='center')
             
 
             
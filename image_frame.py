@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Bir Kez Çözülen Görüntü Çerçevesi
+Bir fotoğraf tek sefer diskten okunup çözülür (decode); yüz tespiti, kalite analizi ve
+duygu analizi aynı BGR dizisini paylaşır. Son çözülen görüntüler yol + değiştirilme
+zamanı + boyut anahtarıyla küçük bir LRU önbellekte tutulur, böylece yalnızca dosya
+yolu verilen çağrılar da aynı fotoğrafı yeniden çözmez.
+
+Yüz tespiti, uzun kenarı PhotoConfig.max_photo_dimension'ı aşan fotoğraflarda INTER_AREA
+ile küçültülmüş bir kopya üzerinde çalışır; kalite ve duygu kırpmaları tam çözünürlüklü
+görüntüden yapılır.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+# Config import
+try:
+    from config import get_photo_config
+    photo_config = get_photo_config()
+except ImportError:
+    class DefaultPhotoConfig:
+        max_photo_dimension = 1920
+        decoded_image_cache_size = 4
+    photo_config = DefaultPhotoConfig()
+
+SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
+MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+
+
+class ImageFrame:
+    """
+    Çözülmüş bir görüntü ve kaynak bilgileri
+    image paylaşılan bir dizidir; aşamalar yalnızca okur (çizim için kopya alınmalıdır).
+    """
+
+    def __init__(self, image: np.ndarray, path: Optional[str] = None,
+                 file_size: int = 0, mtime: float = 0.0):
+        self.image = image
+        self.path = path
+        self.file_size = file_size
+        self.mtime = mtime
+        self._detection_view = None
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path) if self.path else "<bellek>"
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.path)[1].lower() if self.path else ""
+
+    def describe(self) -> str:
+        return f"{self.name} | Boyut: {self.file_size/1024:.1f}KB | Format: {self.extension} | {self.width}x{self.height}"
+
+    def detection_view(self, max_dimension: Optional[int] = None) -> Tuple[np.ndarray, float]:
+        """
+        Yüz tespiti için (görüntü, ölçek) döndürür
+        Uzun kenar max_dimension'ı aşıyorsa görüntü INTER_AREA ile küçültülür ve çerçevede saklanır.
+        ölçek = küçük görüntü / orijinal; tespit koordinatları ölçeğe bölünerek orijinale döner.
+        """
+        if max_dimension is None:
+            max_dimension = getattr(photo_config, 'max_photo_dimension', 0)
+
+        long_side = max(self.height, self.width)
+        if not max_dimension or long_side <= max_dimension:
+            return self.image, 1.0
+
+        if self._detection_view is None or self._detection_view[0] != max_dimension:
+            scale = max_dimension / long_side
+            size = (max(1, round(self.width * scale)), max(1, round(self.height * scale)))
+            resized = cv2.resize(self.image, size, interpolation=cv2.INTER_AREA)
+            self._detection_view = (max_dimension, resized, scale)
+        return self._detection_view[1], self._detection_view[2]
+
+
+_cache: "OrderedDict[Tuple[str, int, int], ImageFrame]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_image_frame(image: Union[str, ImageFrame]) -> ImageFrame:
+    """
+    Dosya yolundan ImageFrame döndürür (ImageFrame verilirse olduğu gibi döner)
+    Aynı yol, değiştirilme zamanı ve boyut için önbellekteki çerçeve kullanılır.
+    Raises: FileNotFoundError, ValueError (desteklenmeyen/bozuk/boş/çok büyük dosya)
+    """
+    if isinstance(image, ImageFrame):
+        return image
+
+    image_path = image
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Görüntü dosyası bulunamadı: {image_path}")
+
+    stat = os.stat(image_path)
+    key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        frame = _cache.get(key)
+        if frame is not None:
+            _cache.move_to_end(key)
+            return frame
+
+    _validate_image_file(image_path, stat.st_size)
+    frame = ImageFrame(_decode_image(image_path, stat.st_size), image_path, stat.st_size, stat.st_mtime)
+
+    cache_size = getattr(photo_config, 'decoded_image_cache_size', 4)
+    if cache_size > 0:
+        with _cache_lock:
+            _cache[key] = frame
+            _cache.move_to_end(key)
+            while len(_cache) > cache_size:
+                _cache.popitem(last=False)
+    return frame
+
+
+def clear_image_cache():
+    """Çözülmüş görüntü önbelleğini boşaltır"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _validate_image_file(image_path: str, file_size: int):
+    file_extension = os.path.splitext(image_path)[1].lower()
+    if file_extension not in SUPPORTED_FORMATS:
+        raise ValueError(f"Desteklenmeyen dosya formatı: {file_extension}\n"
+                         f"Desteklenen formatlar: {', '.join(SUPPORTED_FORMATS)}")
+
+    # Dosya boyutu kontrolü (50MB limiti)
+    if file_size > MAX_FILE_SIZE:
+        raise ValueError(f"Dosya çok büyük: {file_size/1024/1024:.1f}MB\n"
+                         f"Maksimum boyut: {MAX_FILE_SIZE/1024/1024}MB")
+
+    if file_size == 0:
+        raise ValueError(f"Boş dosya: {image_path}")
+
+
+def _decode_image(image_path: str, file_size: int) -> np.ndarray:
+    image = cv2.imread(image_path)
+    if image is not None:
+        return image
+
+    try:
+        from PIL import Image as PILImage
+
+        print("cv2 başarısız, PIL ile deneniyor...")
+        pil_image = PILImage.open(image_path).convert("RGB")
+        image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        print("PIL ile başarıyla yüklendi")
+        return image
+    except Exception as pil_error:
+        error_message = (
+            f"GÖRÜNTÜ OKUMA HATASI\n"
+            f"Dosya: {os.path.basename(image_path)}\n"
+            f"Boyut: {file_size/1024:.1f}KB\n"
+            f"Format: {os.path.splitext(image_path)[1].lower()}\n\n"
+            f"SORUN NEDENLERI:\n"
+            f"• Dosya bozuk olabilir\n"
+            f"• Dosya yolunda özel karakterler var\n"
+            f"• Dosya şifrelenmişse çözülemiyor\n"
+            f"• Format desteklenmiyor olabilir\n\n"
+            f"ÇÖZÜM ÖNERİLERİ:\n"
+            f"• Başka bir fotoğraf deneyin\n"
+            f"• Fotoğrafı JPG/PNG formatında kaydedin\n"
+            f"• Dosya adında Türkçe karakter olmasın\n"
+            f"• Fotoğrafı başka programda açıp tekrar kaydedin\n\n"
+            f"Teknik Detay:\n"
+            f"cv2 hatası: Görüntü formatı okunamadı\n"
+            f"PIL hatası: {str(pil_error)}"
+        )
+        raise ValueError(error_message)
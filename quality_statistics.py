@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Artımlı Kalite İstatistikleri
+quality_statistics tablosu (sınıf, gün) başına fotoğraf sayısı, kalite toplamı,
+en düşük/en yüksek kalite ve kalite dilimi sayılarını tutar. Tablo her embedding
+ekleme ve silme işlemiyle aynı veritabanı işleminde güncellenir; istatistik penceresi
+face_embeddings'i taramak yerine bu küçük tabloyu okur.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+
+# Kalite dilimleri (get_quality_statistics ile aynı eşikler)
+EXCELLENT_THRESHOLD = 0.80
+GOOD_THRESHOLD = 0.60
+
+# (student_class, stat_date, photo_count, quality_sum, min_quality, max_quality, excellent, good, poor)
+QualityBucket = Tuple
+
+
+def grouped_quality_sql(dialect, where_sql: str = "1 = 1") -> str:
+    """Verilen face_embeddings satırlarını (sınıf, gün) dilimlerine göre toplayan sorgu"""
+    day = dialect.date_sql("f.created_at")
+    return f'''
+        SELECT COALESCE(s.student_class, ''), {day},
+               COUNT(*), SUM(f.quality_score), MIN(f.quality_score), MAX(f.quality_score),
+               SUM(CASE WHEN f.quality_score >= {EXCELLENT_THRESHOLD} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN f.quality_score >= {GOOD_THRESHOLD} AND f.quality_score < {EXCELLENT_THRESHOLD} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN f.quality_score < {GOOD_THRESHOLD} THEN 1 ELSE 0 END)
+        FROM face_embeddings f
+        INNER JOIN students s ON s.id = f.student_id
+        WHERE f.quality_score IS NOT NULL AND {where_sql}
+        GROUP BY COALESCE(s.student_class, ''), {day}
+    '''
+
+
+def collect_quality_buckets(conn, dialect, where_sql: str, params: Dict) -> List[QualityBucket]:
+    """Eklenen veya silinecek satırların dilim katkılarını döndürür"""
+    return [tuple(row) for row in conn.execute(text(grouped_quality_sql(dialect, where_sql)), params)]
+
+
+def quality_buckets_from_scores(student_class: Optional[str], stat_date,
+                                scores: Iterable[Optional[float]]) -> List[QualityBucket]:
+    """
+    Aynı (sınıf, gün) dilimine eklenen satırların katkısını bellekteki kalite skorlarından hesaplar
+    grouped_quality_sql ile aynı sonucu verir; eklenen satırları geri okumak için sorgu gerekmez.
+    """
+    scores = [float(score) for score in scores if score is not None]
+    if not scores:
+        return []
+    excellent = sum(1 for score in scores if score >= EXCELLENT_THRESHOLD)
+    good = sum(1 for score in scores if GOOD_THRESHOLD <= score < EXCELLENT_THRESHOLD)
+    return [(student_class or '', stat_date, len(scores), sum(scores), min(scores), max(scores),
+             excellent, good, len(scores) - excellent - good)]
+
+
+def add_quality_buckets(conn, dialect, buckets: List[QualityBucket]):
+    """
+    Eklenen satırların katkısını aggregate tabloya ekler
+    Dilim başına tek atomik upsert (MSSQL: MERGE WITH (HOLDLOCK), SQLite: ON CONFLICT DO UPDATE);
+    aynı yeni dilimi eşzamanlı açan iki kayıt birbirinin işlemini geri aldırmaz.
+    """
+    upsert_sql = text(dialect.quality_statistics_upsert_sql())
+    for student_class, stat_date, count, total, min_q, max_q, excellent, good, poor in buckets:
+        conn.execute(upsert_sql, {
+            'student_class': student_class, 'stat_date': stat_date, 'count': count, 'total': total,
+            'min_q': min_q, 'max_q': max_q, 'excellent': excellent, 'good': good, 'poor': poor
+        })
+
+
+def remove_quality_buckets(conn, dialect, buckets: List[QualityBucket]):
+    """
+    Silinen satırların katkısını aggregate tablodan çıkarır (satırlar silindikten sonra çağrılır)
+    Sayaçlar tek bir UPDATE içinde göreli olarak azaltılır; eşzamanlı bir ekleme araya girse de
+    güncelleme kaybolmaz. En düşük/en yüksek değer silindiyse yalnızca o dilimin sınırı aynı
+    ifadede kalan satırlardan yeniden hesaplanır. Satır kilidi işlem sonuna kadar tutulur.
+    """
+    bound_sql = f'''
+        SELECT {{}}(f.quality_score)
+        FROM face_embeddings f
+        INNER JOIN students s ON s.id = f.student_id
+        WHERE f.quality_score IS NOT NULL
+          AND COALESCE(s.student_class, '') = :student_class
+          AND {dialect.date_sql("f.created_at")} = :stat_date
+    '''
+    update_sql = text(f'''
+        UPDATE quality_statistics {dialect.update_lock_hint()}
+        SET photo_count = photo_count - :count,
+            quality_sum = quality_sum - :total,
+            min_quality = CASE WHEN :min_q <= min_quality THEN ({bound_sql.format("MIN")}) ELSE min_quality END,
+            max_quality = CASE WHEN :max_q >= max_quality THEN ({bound_sql.format("MAX")}) ELSE max_quality END,
+            excellent_count = excellent_count - :excellent,
+            good_count = good_count - :good,
+            poor_count = poor_count - :poor
+        WHERE student_class = :student_class AND stat_date = :stat_date
+    ''')
+    delete_sql = text('''
+        DELETE FROM quality_statistics
+        WHERE student_class = :student_class AND stat_date = :stat_date AND photo_count <= 0
+    ''')
+    for student_class, stat_date, count, total, min_q, max_q, excellent, good, poor in buckets:
+        key = {'student_class': student_class, 'stat_date': stat_date}
+        conn.execute(update_sql, {**key, 'count': count, 'total': total, 'min_q': min_q, 'max_q': max_q,
+                                  'excellent': excellent, 'good': good, 'poor': poor})
+        conn.execute(delete_sql, key)
+
+
+def rebuild_quality_statistics(conn, dialect):
+    """Aggregate tabloyu face_embeddings'ten baştan oluşturur (göç ve onarım için)"""
+    conn.execute(text("DELETE FROM quality_statistics"))
+    add_quality_buckets(conn, dialect, collect_quality_buckets(conn, dialect, "1 = 1", {}))
+
+
+def format_quality_statistics(total: int, quality_sum: Optional[float], min_q: Optional[float],
+                              max_q: Optional[float], excellent: int, good: int, poor: int) -> Dict:
+    """Toplamlardan get_quality_statistics sözlüğünü oluşturur"""
+    total, excellent, good, poor = int(total or 0), int(excellent or 0), int(good or 0), int(poor or 0)
+    if total == 0:
+        return {
+            'total_photos': 0,
+            'average_quality': 0,
+            'min_quality': 0,
+            'max_quality': 0,
+            'excellent_photos': 0,
+            'good_photos': 0,
+            'poor_photos': 0,
+            'quality_distribution': {'excellent': 0, 'good': 0, 'poor': 0}
+        }
+
+    return {
+        'total_photos': total,
+        'average_quality': round(float(quality_sum) / total, 3) if quality_sum else 0,
+        'min_quality': round(float(min_q), 3) if min_q else 0,
+        'max_quality': round(float(max_q), 3) if max_q else 0,
+        'excellent_photos': excellent,
+        'good_photos': good,
+        'poor_photos': poor,
+        'quality_distribution': {
+            'excellent': round((excellent / total) * 100, 1),
+            'good': round((good / total) * 100, 1),
+            'poor': round((poor / total) * 100, 1)
+        }
+    }
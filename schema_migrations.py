@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Sürümlü Şema Göçleri
+Veritabanı şeması schema_version tablosunda tutulan sürüme göre sıralı göçlerle kurulur.
+Her göç bir kez, kendi işleminde çalışır; açılışta yalnızca sürüm kontrolü yapılır.
+
+Yeni bir şema değişikliği için MIGRATIONS listesinin sonuna bir sonraki sürüm
+numarasıyla yeni bir Migration eklenir (mevcut göçler değiştirilmez).
+"""
+
+import logging
+from typing import Callable, List, NamedTuple
+from sqlalchemy import text
+
+from quality_statistics import rebuild_quality_statistics
+
+
+class Migration(NamedTuple):
+    """Tek bir şema göçü"""
+    version: int
+    description: str
+    apply: Callable  # apply(conn, dialect)
+
+
+def _create_base_tables(conn, dialect):
+    # Tablolar IF NOT EXISTS ile oluşturulur: sürüm tablosundan önceki veritabanları da bu göçten geçer
+    for statement in dialect.create_table_statements():
+        conn.execute(text(statement))
+
+    # Eski sürümlerde sonradan eklenen alanlar (kalite JSON'u ve raporu göç 3'ten beri yan tabloda)
+    for table, column, column_type in [
+        ('students', 'student_class', 'short_text')
+    ]:
+        if not dialect.column_exists(conn, table, column):
+            conn.execute(text(dialect.add_column_sql(table, column, column_type)))
+
+
+def _create_lookup_indexes(conn, dialect):
+    # Öğrenci başına sorgular, cascade silme ve değişiklik akışı tablo taraması yerine index seek yapar
+    for name, table, columns, include in [
+        ('ix_face_embeddings_student_id', 'face_embeddings', ['student_id'], ['quality_score', 'created_at']),
+        ('ix_students_class_name', 'students', ['student_class', 'name'], ['student_id', 'photo_count']),
+        ('ix_failed_registrations_student_created', 'failed_registrations', ['student_id', 'created_at'], [])
+    ]:
+        conn.execute(text(dialect.create_index_sql(name, table, columns, include)))
+
+
+def _move_quality_to_side_table(conn, dialect):
+    # Kalite JSON'u ve raporu galeri taramasının okuduğu sayfaları şişirmesin diye yan tabloya taşınır
+    conn.execute(text(dialect.quality_table_statement()))
+    # Yeni veritabanlarında kolonlar hiç oluşturulmaz: taşınacak veri ve geri kazanılacak alan yoktur
+    if not dialect.column_exists(conn, 'face_embeddings', 'quality_details'):
+        return
+
+    conn.execute(text('''
+        INSERT INTO face_embedding_quality (embedding_id, quality_details, quality_report)
+        SELECT id, quality_details, quality_report
+        FROM face_embeddings
+        WHERE quality_details IS NOT NULL OR quality_report IS NOT NULL
+    '''))
+    for column in ('quality_details', 'quality_report'):
+        conn.execute(text(dialect.drop_column_sql('face_embeddings', column)))
+
+    reclaim_sql = dialect.reclaim_space_sql('face_embeddings')
+    if reclaim_sql:
+        conn.execute(text(reclaim_sql))
+
+
+def _create_quality_statistics(conn, dialect):
+    # Mevcut fotoğraflar bir kez taranır; sonrasında tablo ekleme/silme işlemleriyle güncellenir
+    conn.execute(text(dialect.quality_statistics_statement()))
+    rebuild_quality_statistics(conn, dialect)
+
+
+def _create_student_listing_index(conn, dialect):
+    # Öğrenci listesi (name, student_id) sırasıyla sayfalanır; sınıf filtresi ix_students_class_name'i kullanır
+    conn.execute(text(dialect.create_index_sql(
+        'ix_students_name_student_id', 'students', ['name', 'student_id'], ['student_class', 'photo_count']
+    )))
+
+
+def _add_change_versions(conn, dialect):
+    # Değişiklik akışı commit edilmemiş id'lerin üzerinden atlamasın diye satır sürümü tutulur (MSSQL)
+    for table in ('face_embeddings', 'embedding_tombstones'):
+        statement = dialect.change_version_column_sql(table)
+        if statement and not dialect.column_exists(conn, table, 'row_version'):
+            conn.execute(text(statement))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Temel tablolar ve eksik alanlar", _create_base_tables),
+    Migration(2, "face_embeddings, students ve failed_registrations indeksleri", _create_lookup_indexes),
+    Migration(3, "Kalite detayları face_embedding_quality yan tablosuna", _move_quality_to_side_table),
+    Migration(4, "Artımlı kalite istatistikleri (quality_statistics)", _create_quality_statistics),
+    Migration(5, "Öğrenci listesi sayfalama indeksi", _create_student_listing_index),
+    Migration(6, "Değişiklik akışı için satır sürümleri (row_version)", _add_change_versions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn, dialect) -> int:
+    """Uygulanmış en yüksek göç sürümü (schema_version tablosu yoksa 0)"""
+    if not dialect.table_exists(conn, 'schema_version'):
+        return 0
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def migrate(conn, dialect, logger: logging.Logger = None) -> int:
+    """
+    Bekleyen göçleri sırayla uygular ve güncel şema sürümünü döndürür
+    Şema güncelse yalnızca sürüm sorgusu çalışır. Her göç ayrı işlemde uygulanır;
+    başarısız olan göç geri alınır ve hata yükseltilir (sonraki açılışta yeniden denenir).
+    """
+    logger = logger or logging.getLogger(__name__)
+    current_version = get_schema_version(conn, dialect)
+    if current_version >= LATEST_VERSION:
+        conn.commit()
+        return current_version
+
+    if current_version == 0:
+        conn.execute(text(dialect.schema_version_statement()))
+        conn.commit()
+
+    for migration in MIGRATIONS:
+        if migration.version <= current_version:
+            continue
+        try:
+            migration.apply(conn, dialect)
+            conn.execute(text(
+                "INSERT INTO schema_version (version, description) VALUES (:version, :description)"
+            ), {'version': migration.version, 'description': migration.description})
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Şema göçü {migration.version} başarısız: {e}")
+            raise
+        logger.info(f"Şema göçü uygulandı: {migration.version} - {migration.description}")
+        current_version = migration.version
+
+    return current_version
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+Embedding Galerisi Test Scripti
+Vektörel eşleşmenin eski döngü tabanlı find_best_match ile aynı sonucu verdiğini doğrular
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Ana dizini path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_gallery import ChangeToken, EmbeddingChanges, EmbeddingGallery, EmbeddingRows
+from embedding_cache import EmbeddingCache
+import pickle
+from embedding_codec import encode_embedding, decode_embedding, decode_embedding_into, detect_blob_format
+from embedding_migration import migrate_embedding_blobs
+from embedding_quantization import QuantizedEmbeddingGallery, quantization_report
+import ann_index
+from ann_index import IVFFlatIndex, recall_report
+from face_processor import FaceProcessor
+
+
+def _legacy_find_best_match(target_embedding, database_embeddings, threshold, face_count):
+    """Eski Python döngüsü ile referans eşleşme"""
+    best_match = None
+    best_score = threshold
+    candidate_matches = []
+
+    for student_id, name, db_embedding in database_embeddings:
+        norm1 = np.linalg.norm(target_embedding)
+        norm2 = np.linalg.norm(db_embedding)
+        similarity = 0.0 if norm1 == 0 or norm2 == 0 else float(np.dot(target_embedding, db_embedding) / (norm1 * norm2))
+
+        if similarity > threshold:
+            candidate_matches.append((student_id, name, similarity))
+        if similarity > best_score:
+            best_score = similarity
+            best_match = (student_id, name, similarity)
+
+    if best_match and candidate_matches:
+        same_student_scores = [score for sid, _, score in candidate_matches if sid == best_match[0]]
+        if len(same_student_scores) >= 2:
+            avg_score = sum(same_student_scores) / len(same_student_scores)
+            min_score = min(same_student_scores)
+            avg_limit, min_limit = (0.30, 0.20) if face_count >= 5 else (0.58, 0.52)
+            if avg_score >= avg_limit and min_score >= min_limit:
+                return (best_match[0], best_match[1], avg_score)
+            return None
+
+    return best_match
+
+
+def create_test_records(student_count=40, photos_per_student=4, dimension=512, seed=7):
+    """Her öğrenci için prototip etrafında gürültülü embedding'ler üretir"""
+    rng = np.random.default_rng(seed)
+    records = []
+    for student_pk in range(1, student_count + 1):
+        prototype = rng.normal(size=dimension).astype(np.float32)
+        for _ in range(photos_per_student):
+            noise = rng.normal(scale=0.8, size=dimension).astype(np.float32)
+            records.append((student_pk, f"Öğrenci {student_pk}", prototype + noise))
+    return records
+
+
+def test_gallery_normalization():
+    """Galeri satırları birim normda, sıfır vektörler sıfır kalmalı"""
+    records = create_test_records(student_count=3, photos_per_student=2)
+    records.append((99, "Boş", np.zeros(512, dtype=np.float32)))
+    gallery = EmbeddingGallery.from_records(records)
+
+    norms = np.linalg.norm(gallery.matrix, axis=1)
+    assert gallery.matrix.dtype == np.float32
+    assert gallery.matrix.flags['C_CONTIGUOUS']
+    assert np.allclose(norms[:-1], 1.0, atol=1e-5)
+    assert norms[-1] == 0.0
+    return True
+
+
+def test_gallery_append_in_place():
+    """append yeni satırları tamponun boş kapasitesine yazmalı, eski galeriler değişmemeli"""
+    records = create_test_records(student_count=4, photos_per_student=2)
+    base = EmbeddingGallery.from_records(records)
+    rng = np.random.default_rng(11)
+    new_rows = rng.normal(size=(3, 512)).astype(np.float32)
+
+    first = base.append([50], ["Yeni 1"], new_rows[:1])
+    second = first.append([51], ["Yeni 2"], new_rows[1:2])
+    assert second.matrix.base is first.matrix.base is not None
+    assert second.matrix.flags['C_CONTIGUOUS']
+    assert len(first) == len(base) + 1 and len(second) == len(base) + 2
+    assert np.allclose(second.matrix[-1], EmbeddingGallery.normalize(new_rows[1]), atol=1e-6)
+
+    # Aynı galeriden ikinci dal, önceki dalın satırlarının üzerine yazmamalı
+    branch = first.append([52], ["Yeni 3"], new_rows[2:3])
+    assert not np.shares_memory(branch.matrix, second.matrix)
+    assert np.allclose(second.matrix[-1], EmbeddingGallery.normalize(new_rows[1]), atol=1e-6)
+    assert np.allclose(branch.matrix[-1], EmbeddingGallery.normalize(new_rows[2]), atol=1e-6)
+    assert list(branch.student_ids[-2:]) == [50, 52] and len(base) == len(records)
+    return True
+
+
+def test_find_best_match_equivalence():
+    """Vektörel find_best_match, eski döngüyle aynı kararları vermeli"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(11)
+
+    for query_index in range(60):
+        _, _, base = records[rng.integers(len(records))]
+        target = base + rng.normal(scale=0.6, size=base.shape).astype(np.float32)
+
+        for threshold, face_count in [(0.55, 1), (0.25, 6), (0.10, 1)]:
+            expected = _legacy_find_best_match(target, records, threshold, face_count)
+            actual = processor.find_best_match(target, gallery, threshold=threshold, face_count=face_count)
+
+            if expected is None or actual is None:
+                assert expected == actual, f"Sorgu {query_index}: {expected} != {actual}"
+            else:
+                assert expected[:2] == actual[:2]
+                assert abs(expected[2] - actual[2]) < 1e-5
+    return True
+
+
+def test_find_best_matches_batch():
+    """Toplu eşleşme, her yüz için ayrı find_best_match ile aynı sonucu vermeli"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(23)
+
+    targets = [records[rng.integers(len(records))][2] + rng.normal(scale=0.6, size=512).astype(np.float32)
+               for _ in range(35)]
+
+    for threshold in (0.25, 0.55):
+        batch_results = processor.find_best_matches(targets, gallery, threshold=threshold)
+        single_results = [processor.find_best_match(t, gallery, threshold=threshold, face_count=len(targets))
+                          for t in targets]
+
+        assert len(batch_results) == len(targets)
+        for batch, single in zip(batch_results, single_results):
+            if batch is None or single is None:
+                assert batch == single
+            else:
+                assert batch[:2] == single[:2]
+                assert abs(batch[2] - single[2]) < 1e-5
+    return True
+
+
+def test_student_shortlist():
+    """Prototip ön elemesi, tüm öğrenciler listelendiğinde tam aramayla aynı olmalı"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(31)
+
+    unique_ids, _, _, counts, prototypes = gallery.student_groups()
+    assert len(unique_ids) == 40 and counts.sum() == len(gallery)
+    assert np.allclose(np.linalg.norm(prototypes, axis=1), 1.0, atol=1e-5)
+
+    agreements = 0
+    for _ in range(40):
+        target = records[rng.integers(len(records))][2] + rng.normal(scale=0.6, size=512).astype(np.float32)
+        exact = processor.find_best_match(target, gallery, threshold=0.25, shortlist_k=0)
+        full = processor.find_best_match(target, gallery, threshold=0.25, shortlist_k=len(unique_ids))
+        short = processor.find_best_match(target, gallery, threshold=0.25, shortlist_k=5)
+
+        assert (exact is None) == (full is None)
+        if exact is not None:
+            assert exact[:2] == full[:2] and abs(exact[2] - full[2]) < 1e-5
+        agreements += int((exact or (None,))[0] == (short or (None,))[0])
+
+    assert agreements >= 38, f"Ön eleme uyumu düşük: {agreements}/40"
+    return True
+
+
+def test_find_top_k():
+    """Top-K önerileri tam sıralamayla aynı olmalı ve ilk öneri en iyi eşleşme olmalı"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(47)
+    targets = [records[rng.integers(len(records))][2] + rng.normal(scale=0.6, size=512).astype(np.float32)
+               for _ in range(20)]
+
+    batch = processor.find_top_k_batch(targets, gallery, k=5)
+    for target, suggestions in zip(targets, batch):
+        assert len(suggestions) == 5
+        single = processor.find_top_k(target, gallery, k=5)
+        assert [s[0] for s in suggestions] == [s[0] for s in single]
+
+        scores = gallery.similarities(target)
+        per_student = {}
+        for sid, score in zip(gallery.student_ids.tolist(), scores.tolist()):
+            per_student.setdefault(sid, []).append(score)
+        expected = sorted(per_student, key=lambda sid: -max(per_student[sid]))[:5]
+        assert [s[0] for s in suggestions] == expected
+        for sid, _, best_score, avg_score in suggestions:
+            assert abs(best_score - max(per_student[sid])) < 1e-5
+            assert abs(avg_score - np.mean(per_student[sid])) < 1e-5
+
+        best = processor.find_best_match(target, gallery, threshold=0.10)
+        if best is not None:
+            assert best[0] == suggestions[0][0]
+
+    assert len(processor.find_top_k(targets[0], gallery, k=100)) == 40
+    return True
+
+
+def test_group_photo_assignment():
+    """Grup fotoğrafında bir öğrenci en fazla bir yüze atanmalı"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(41)
+
+    # 10 farklı öğrenci + öğrenci 1'e çok benzeyen ikinci bir yüz
+    targets = [records[(sid - 1) * 4][2] + rng.normal(scale=0.5, size=512).astype(np.float32)
+               for sid in range(1, 11)]
+    targets.append(records[1][2] + rng.normal(scale=0.9, size=512).astype(np.float32))
+
+    independent = processor.find_best_matches(targets, gallery, threshold=0.25)
+    assigned_ids = [m[0] for m in independent if m]
+    assert len(assigned_ids) != len(set(assigned_ids)), "Test kurgusu çakışma üretmeli"
+
+    for method in ("hungarian", "greedy"):
+        assigned = processor.assign_faces(targets, gallery, threshold=0.25, method=method)
+        student_ids = [m[0] for m in assigned if m]
+        assert len(student_ids) == len(set(student_ids)), f"{method}: aynı öğrenci iki yüze atandı"
+        for face_index in range(10):
+            assert assigned[face_index] is not None and assigned[face_index][0] == face_index + 1
+    return True
+
+
+def test_quantized_gallery():
+    """float16 / int8 galeri, float32 ile neredeyse aynı skorları ve kararları vermeli"""
+    records = create_test_records()
+    gallery = EmbeddingGallery.from_records(records)
+    processor = FaceProcessor.__new__(FaceProcessor)
+    rng = np.random.default_rng(53)
+    targets = [records[rng.integers(len(records))][2] + rng.normal(scale=0.6, size=512).astype(np.float32)
+               for _ in range(30)]
+
+    for dtype, tolerance in (("float16", 1e-3), ("int8", 2e-2)):
+        quantized = QuantizedEmbeddingGallery(gallery, dtype)
+        quantized.chunk_size = 64
+        assert quantized.nbytes < gallery.nbytes
+        assert np.abs(quantized.similarities_batch(targets) - gallery.similarities_batch(targets)).max() < tolerance
+
+        expected = processor.find_best_matches(targets, gallery, threshold=0.25)
+        actual = processor.find_best_matches(targets, quantized, threshold=0.25)
+        assert [m and m[0] for m in expected] == [m and m[0] for m in actual]
+
+        grown = quantized.append([99], ["Yeni"], np.ones((1, 512), dtype=np.float32))
+        assert len(grown) == len(gallery) + 1 and grown.codes.dtype == quantized.codes.dtype
+        assert len(grown.without_students([99])) == len(gallery)
+
+    report = quantization_report(gallery, query_count=50)
+    assert report["float32"]["max_similarity_error"] == 0.0
+    assert report["int8"]["memory_ratio"] > 3.5
+    # Sorgular leave-one-out: kendi satırı maskelendiği için en iyi skorlar eşiğe yakın olabilir
+    assert report["float32"]["near_threshold"][0.55]["query_count"] > 0
+    assert report["float32"]["near_threshold"][0.55]["decision_change_rate"] == 0.0
+
+    # Blob formatları ve eski pickle blob'ları çözülebilmeli
+    embedding = records[0][2]
+    for blob_format, tolerance in (("pickle", 0), ("float32", 0), ("float16", 1e-2), ("int8", 5e-2)):
+        decoded = decode_embedding(encode_embedding(embedding, blob_format))
+        assert decoded.shape == embedding.shape
+        assert np.abs(decoded - embedding).max() <= tolerance * np.abs(embedding).max()
+    return True
+
+
+def test_ann_recall_report():
+    """recall_report sorgunun kendi satırını dışarıda bırakmalı (kendini 1.0 ile bulmamalı)"""
+    gallery = EmbeddingGallery.from_records(create_test_records(student_count=150))
+    index = IVFFlatIndex.build(gallery, n_lists=32, n_probe=1)
+
+    narrow = recall_report(index, query_count=100)
+    assert narrow['query_count'] == 100
+    assert narrow['recall_at_1'] < 1.0
+
+    index.n_probe = index.n_lists
+    full = recall_report(index, query_count=100)
+    assert full['recall_at_1'] == 1.0 and full['decision_agreement'] == 1.0
+
+    # Dışarıdan verilen sorgularda maskelenecek satır açıkça belirtilir
+    explicit = recall_report(index, queries=index.matrix[:5], exclude_rows=np.arange(5))
+    assert explicit['recall_at_1'] == 1.0
+    return True
+
+
+def test_ann_incremental_append():
+    """IVF indeksine ekleme sıralı bölümü kopyalamadan kuyruğa yazmalı, skorlar tam aramayla aynı kalmalı"""
+    records = create_test_records(student_count=100)
+    gallery = EmbeddingGallery.from_records(records)
+    index = IVFFlatIndex.build(gallery, n_lists=16, n_probe=16)
+    rng = np.random.default_rng(5)
+    new_rows = rng.normal(size=(4, 512)).astype(np.float32)
+
+    grown = index.append([500], ["Yeni"], new_rows[:1])
+    assert grown.base_rows == index.base_rows and grown.tail_rows == 1
+    assert np.shares_memory(grown.matrix, index.matrix), "Sıralı bölüm kopyalanmamalı"
+    assert np.array_equal(grown.centroids, index.centroids)
+    assert grown.student_ids[int(np.argmax(grown.similarities(new_rows[0])))] == 500
+
+    exact = grown._as_plain_gallery()
+    queries = np.vstack([new_rows, gallery.matrix[:3]])
+    assert np.allclose(grown.similarities_batch(queries), exact.similarities_batch(queries), atol=1e-5)
+
+    # Kuyruk sınırı aşılınca satırlar mevcut merkezlerle yeniden sıralanır
+    many = rng.normal(size=(int(len(index) * 0.05) + 1, 512)).astype(np.float32)
+    compacted = grown.append(np.arange(600, 600 + len(many)), ["Toplu"] * len(many), many)
+    assert compacted.tail_rows == 0 and len(compacted) == len(grown) + len(many)
+    assert np.array_equal(compacted.centroids, index.centroids)
+    assert not np.shares_memory(compacted.matrix, grown.matrix)
+
+    narrow = grown.without_students([500])
+    narrow.n_probe = 2
+    assert narrow.tail_rows == 0 and len(narrow) == len(index)
+
+    # Toplu skorlama: her sorgu yalnızca en yakın n_probe kümesini (kuyruk dahil) görmeli
+    grown.n_probe = 3
+    batch = grown.similarities_batch(queries)
+    exact_scores = exact.similarities_batch(queries)
+    for query, row_scores, exact_row in zip(queries, batch, exact_scores):
+        nearest = np.argsort(-(grown.centroids @ EmbeddingGallery.normalize(query)))[:3]
+        visible = np.isin(grown.assignments, nearest)
+        assert np.allclose(row_scores[visible], exact_row[visible], atol=1e-5)
+        assert np.all(np.isneginf(row_scores[~visible]))
+    assert np.allclose(grown.similarities(queries[0]), batch[0])
+    return True
+
+
+class _FakeDatabase:
+    """get_embedding_changes çağrılarını sayan sahte veritabanı"""
+
+    def __init__(self, records):
+        self.rows = [(row_id, sid, name, f"{sid % 3 + 9}-A", emb)
+                     for row_id, (sid, name, emb) in enumerate(records, 1)]
+        self.tombstones = []
+        self.calls = 0
+
+    def delete_student(self, student_pk):
+        self.tombstones += [(row[0], row[1]) for row in self.rows if row[1] == student_pk]
+        self.rows = [row for row in self.rows if row[1] != student_pk]
+
+    def get_embedding_changes(self, since_token=None):
+        self.calls += 1
+        token = ChangeToken.parse(since_token)
+        deleted = self.tombstones[token.tombstone_id:] if token.tombstone_id is not None else []
+        inserted = EmbeddingRows.from_records([row for row in self.rows if row[0] > token.embedding_id])
+        embedding_id = max([token.embedding_id] + inserted.row_ids.tolist())
+        return EmbeddingChanges(inserted, np.array([d[0] for d in deleted], dtype=np.int64),
+                                np.array([d[1] for d in deleted], dtype=np.int64),
+                                ChangeToken(embedding_id, len(self.tombstones)))
+
+    def count_embeddings_until(self, last_id):
+        return sum(1 for row in self.rows if row[0] <= last_id)
+
+
+def test_embedding_cache_incremental():
+    """Önbellek bir kez yüklenmeli, yalnızca değişiklikten sonra artımlı yenilenmeli"""
+    records = create_test_records(student_count=5, photos_per_student=2)
+    fake_db = _FakeDatabase(records)
+    cache = EmbeddingCache(fake_db, use_snapshot=False)
+
+    assert len(cache.get_gallery()) == 10
+    cache.get_gallery()
+    assert fake_db.calls == 1, "Değişiklik yokken DB'ye gidilmemeli"
+
+    fake_db.rows.append((11, 6, "Öğrenci 6", "9-A", np.ones(512, dtype=np.float32)))
+    cache.mark_stale()
+    assert len(cache.get_gallery()) == 11
+    assert cache.watermark == 11 and fake_db.calls == 2
+
+    cache.remove_students([1, 6])
+    gallery = cache.get_gallery()
+    assert len(gallery) == 8 and 1 not in gallery.student_ids
+    assert fake_db.calls == 2, "Silme işlemi DB'ye gitmeden uygulanmalı"
+
+    partition = cache.get_gallery(["9-A"])
+    assert len(partition) > 0 and set(partition.student_classes) == {"9-A"}
+    assert cache.get_gallery(["9-A"]) is partition, "Sınıf bölümü önbellekten dönmeli"
+    assert fake_db.calls == 2
+    return True
+
+
+def test_embedding_change_feed():
+    """Başka süreçteki kayıt ve silmeler değişiklik akışıyla önbelleğe yansımalı"""
+    records = create_test_records(student_count=4, photos_per_student=2)
+    fake_db = _FakeDatabase(records)
+    cache = EmbeddingCache(fake_db, use_snapshot=False)
+    assert len(cache.get_gallery()) == 8
+
+    # Diğer süreç: bir öğrenciyi siler, yeni bir öğrenci kaydeder
+    fake_db.delete_student(2)
+    fake_db.rows.append((9, 5, "Öğrenci 5", "9-A", np.ones(512, dtype=np.float32)))
+    gallery = cache.refresh()
+    assert len(gallery) == 7 and 2 not in gallery.student_ids and 5 in gallery.student_ids
+    assert cache.change_token == ChangeToken(9, 2)
+
+    # Değişiklik yoksa galeri aynı kalır; token metin olarak taşınabilir
+    assert cache.refresh() is gallery
+    assert ChangeToken.parse(str(cache.change_token)) == cache.change_token
+    assert ChangeToken.parse("12:") == ChangeToken(12, None)
+    return True
+
+
+def test_gallery_snapshot_warm_start():
+    """Anlık görüntüden açılışta yalnızca filigrandan sonraki satırlar çekilmeli"""
+    records = create_test_records(student_count=6, photos_per_student=3)
+    fake_db = _FakeDatabase(records)
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        first = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+        expected = first.get_gallery()
+        assert len(expected) == 18 and fake_db.calls == 1
+
+        fake_db.rows.append((19, 7, "Öğrenci 7", "9-A", np.ones(512, dtype=np.float32)))
+        second = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+        gallery = second.get_gallery()
+        assert len(gallery) == 19 and second.watermark == 19
+        assert np.allclose(gallery.matrix[:18], expected.matrix)
+        assert gallery.student_classes[0] == expected.student_classes[0]
+        assert fake_db.calls == 2
+
+        # Açılışta mmap galerisi değişmeden kullanılır
+        assert second.save_snapshot()
+        third = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+        assert isinstance(third.get_gallery().matrix, np.memmap)
+        assert not third.save_snapshot(), "Değişiklik yoksa anlık görüntü yeniden yazılmamalı"
+
+        # Anlık görüntüden sonra silinen satırlar varsa tam yüklemeye dönülür
+        fake_db.rows = [row for row in fake_db.rows if row[1] != 1]
+        fourth = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+        assert len(fourth.get_gallery()) == 16 and 1 not in fourth.get_gallery().student_ids
+        del gallery, third, fourth
+    return True
+
+
+def test_ann_index_warm_start():
+    """ANN açıkken kaydedilmiş indeks açılışta yüklenmeli, yeni satırlar kuyruğa eklenmeli"""
+    records = create_test_records(student_count=20, photos_per_student=3)
+    fake_db = _FakeDatabase(records)
+    saved = {name: getattr(ann_index.ai_config, name) for name in ('ann_enabled', 'ann_min_gallery_size')}
+    ann_index.ai_config.ann_enabled = True
+    ann_index.ai_config.ann_min_gallery_size = 10
+    try:
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            first = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+            built = first.get_gallery()
+            assert isinstance(built, IVFFlatIndex)
+            assert os.path.exists(os.path.join(snapshot_dir, ann_index.DEFAULT_INDEX_FILENAME))
+
+            # Çalıştırmalar arasında yapılan kayıt yeniden kümeleme gerektirmemeli
+            fake_db.rows.append((61, 21, "Öğrenci 21", "9-A", np.ones(512, dtype=np.float32)))
+            second = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+            gallery = second.get_gallery()
+            assert isinstance(gallery, IVFFlatIndex) and len(gallery) == 61 and gallery.tail_rows == 1
+            assert np.array_equal(gallery.centroids, built.centroids) and second.watermark == 61
+
+            # Kuyruk save_snapshot ile indeksle birlikte kalıcı olur
+            assert second.save_snapshot()
+            third = EmbeddingCache(fake_db, snapshot_directory=snapshot_dir, use_snapshot=True)
+            reopened = third.get_gallery()
+            assert reopened.tail_rows == 1 and reopened.watermark == 61 and fake_db.calls == 3
+            assert np.array_equal(reopened.student_ids, gallery.student_ids)
+    finally:
+        for name, value in saved.items():
+            setattr(ann_index.ai_config, name, value)
+    return True
+
+
+class _FakeBlobDatabase:
+    """face_embeddings blob'larını bellekte tutan, istenirse yazımda hata veren sahte veritabanı"""
+
+    def __init__(self, blobs):
+        self.blobs = dict(blobs)
+        self.fail_after_batches = None
+
+    def get_embedding_blobs_after(self, last_id, limit):
+        return sorted((row_id, blob) for row_id, blob in self.blobs.items() if row_id > last_id)[:limit]
+
+    def update_embedding_blobs(self, blobs):
+        if self.fail_after_batches is not None:
+            if self.fail_after_batches == 0:
+                raise RuntimeError("Bağlantı koptu")
+            self.fail_after_batches -= 1
+        self.blobs.update(blobs)
+
+
+def test_embedding_blob_migration():
+    """Ham float32 blob kopyasız çözülmeli; pickle göçü kayıpsız ve kaldığı yerden devam etmeli"""
+    records = create_test_records(student_count=5, photos_per_student=5)
+    embeddings = {row_id: emb for row_id, (_, _, emb) in enumerate(records, 1)}
+
+    blob = encode_embedding(embeddings[1])
+    decoded = decode_embedding(blob)
+    assert detect_blob_format(blob) == "float32" and len(blob) == 12 + 512 * 4
+    assert np.array_equal(decoded, embeddings[1]) and not decoded.flags['OWNDATA']
+
+    matrix = np.empty((2, 512), dtype=np.float32)
+    decode_embedding_into(blob, matrix[0])
+    decode_embedding_into(pickle.dumps(embeddings[2]), matrix[1])
+    assert np.array_equal(matrix[0], embeddings[1]) and np.array_equal(matrix[1], embeddings[2])
+
+    # Eski blob'lar yalnızca numpy dizisi kurabilir; göçten sonra tamamen reddedilebilir
+    for protocol in (2, 4, 5):
+        assert np.array_equal(decode_embedding(pickle.dumps(embeddings[2], protocol=protocol)), embeddings[2])
+    for blob in (pickle.dumps({'embedding': embeddings[2]}), pickle.dumps(os.getcwd), pickle.dumps("metin")):
+        try:
+            decode_embedding(blob)
+            assert False, "Numpy dizisi olmayan eski blob reddedilmeli"
+        except (ValueError, pickle.UnpicklingError):
+            pass
+    try:
+        decode_embedding_into(pickle.dumps(embeddings[2]), matrix[1], allow_pickle=False)
+        assert False, "allow_pickle=False başlıksız blob'u reddetmeli"
+    except ValueError:
+        pass
+
+    fake_db = _FakeBlobDatabase({row_id: pickle.dumps(emb) for row_id, emb in embeddings.items()})
+    fake_db.blobs[3] = encode_embedding(embeddings[3])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        checkpoint_path = os.path.join(temp_dir, "migration.json")
+
+        fake_db.fail_after_batches = 2
+        try:
+            migrate_embedding_blobs(fake_db, batch_size=4, checkpoint_path=checkpoint_path)
+            assert False, "Yarıda kesilmeliydi"
+        except RuntimeError:
+            pass
+        assert sum(detect_blob_format(b) == "float32" for b in fake_db.blobs.values()) == 8
+
+        fake_db.fail_after_batches = None
+        result = migrate_embedding_blobs(fake_db, batch_size=4, checkpoint_path=checkpoint_path)
+        assert result['last_id'] == 25 and result['converted'] == 24 and result['skipped'] == 1
+
+    for row_id, stored in fake_db.blobs.items():
+        assert detect_blob_format(stored) == "float32"
+        assert np.array_equal(decode_embedding(stored), embeddings[row_id])
+    return True
+
+
+def main():
+    """Ana test fonksiyonu"""
+    tests = [
+        ("Galeri normalizasyonu", test_gallery_normalization),
+        ("Galeriye yerinde ekleme", test_gallery_append_in_place),
+        ("find_best_match eşdeğerliği", test_find_best_match_equivalence),
+        ("Toplu yüz eşleşmesi", test_find_best_matches_batch),
+        ("Artımlı embedding önbelleği", test_embedding_cache_incremental),
+        ("Embedding değişiklik akışı", test_embedding_change_feed),
+        ("Öğrenci prototip ön elemesi", test_student_shortlist),
+        ("Grup fotoğrafı birebir atama", test_group_photo_assignment),
+        ("Top-K öğrenci önerileri", test_find_top_k),
+        ("Nicemlenmiş galeri (float16 / int8)", test_quantized_gallery),
+        ("ANN recall raporu (leave-one-out)", test_ann_recall_report),
+        ("ANN indeksine artımlı ekleme", test_ann_incremental_append),
+        ("Galeri anlık görüntüsü ile hızlı açılış", test_gallery_snapshot_warm_start),
+        ("ANN indeksi ile hızlı açılış", test_ann_index_warm_start),
+        ("Ham embedding blob'u ve pickle göçü", test_embedding_blob_migration),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+                print(f"✅ {test_name} - BAŞARILI")
+            else:
+                print(f"❌ {test_name} - BAŞARISIZ")
+        except Exception as e:
+            print(f"💥 {test_name} - HATA: {e}")
+
+    print(f"\n📊 TEST SONUÇLARI: {passed}/{len(tests)} test başarılı")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
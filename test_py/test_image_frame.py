@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Görüntü Çerçevesi Test Scripti
+Bir fotoğrafın bir kez çözülüp tespit, kalite ve duygu aşamalarınca paylaşıldığını doğrular
+"""
+
+import sys
+import os
+import importlib
+import tempfile
+import numpy as np
+
+# Ana dizini path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import image_frame
+from image_frame import ImageFrame, load_image_frame, clear_image_cache
+from face_processor import FaceProcessor
+
+
+def write_photo(path, value=0):
+    image = np.full((48, 64, 3), value, dtype=np.uint8)
+    assert cv2.imwrite(path, image)
+    return image
+
+
+def test_frame_is_decoded_once():
+    """Aynı dosya yolu önbellekteki çerçeveyi, ImageFrame ise kendisini döndürür"""
+    clear_image_cache()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'foto.png')
+        write_photo(path)
+
+        frame = load_image_frame(path)
+        assert (frame.height, frame.width) == (48, 64)
+        assert frame.name == 'foto.png' and frame.extension == '.png'
+        assert load_image_frame(path) is frame
+        assert load_image_frame(frame) is frame
+    return True
+
+
+def test_frame_cache_invalidated_on_change():
+    """Dosya değişince (mtime/boyut) görüntü yeniden çözülür"""
+    clear_image_cache()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'foto.png')
+        write_photo(path, 0)
+        first = load_image_frame(path)
+
+        write_photo(path, 255)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = load_image_frame(path)
+        assert second is not first
+        assert int(second.image[0, 0, 0]) == 255
+    return True
+
+
+def test_frame_cache_is_bounded():
+    """Önbellek decoded_image_cache_size kadar çerçeve tutar"""
+    clear_image_cache()
+    cache_size = getattr(image_frame.photo_config, 'decoded_image_cache_size', 4)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f'foto_{i}.png') for i in range(cache_size + 2)]
+        for path in paths:
+            write_photo(path)
+            load_image_frame(path)
+        assert len(image_frame._cache) == cache_size
+    return True
+
+
+def test_detection_view_downscales_large_frames():
+    """Uzun kenarı sınırı aşan görüntü tespit için küçültülür, küçükler olduğu gibi kalır"""
+    large = ImageFrame(np.zeros((3000, 4000, 3), dtype=np.uint8), 'buyuk.jpg')
+    view, scale = large.detection_view(1920)
+    assert view.shape[:2] == (1440, 1920)
+    assert abs(scale - 0.48) < 1e-9
+    assert large.detection_view(1920)[0] is view
+
+    # Tespit koordinatları ölçeğe bölünerek orijinal görüntüye döner
+    bbox = np.array([480.0, 240.0, 960.0, 720.0]) / scale
+    assert np.allclose(bbox, [1000.0, 500.0, 2000.0, 1500.0])
+
+    small = ImageFrame(np.zeros((480, 640, 3), dtype=np.uint8), 'kucuk.jpg')
+    view, scale = small.detection_view(1920)
+    assert view is small.image and scale == 1.0
+    return True
+
+
+class _FakeFaceApp:
+    """Tespit edilen her görüntüyü kaydeden sahte InsightFace uygulaması"""
+
+    def __init__(self):
+        self.images = []
+
+    def get(self, image):
+        self.images.append(image)
+        return []
+
+
+def test_detect_faces_batch_order_and_errors():
+    """Toplu tespit sonuçları giriş sırasıyla üretir, hatalı dosya döngüyü durdurmaz"""
+    clear_image_cache()
+    processor = FaceProcessor.__new__(FaceProcessor)
+    processor.face_app = _FakeFaceApp()
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(6):
+            path = os.path.join(directory, f'foto_{i}.png')
+            write_photo(path, i)
+            paths.append(path)
+        paths.insert(3, os.path.join(directory, 'yok.png'))
+
+        for prefetch in (0, 2):
+            results = list(processor.detect_faces_batch(paths, prefetch=prefetch))
+            assert [r.path for r in results] == paths
+            assert isinstance(results[3].error, FileNotFoundError) and results[3].frame is None
+            assert all(r.error is None and r.faces == [] for i, r in enumerate(results) if i != 3)
+            assert [int(r.frame.image[0, 0, 0]) for r in results if r.frame is not None] == list(range(6))
+
+        # Generator erken kapatılabilir
+        batch = processor.detect_faces_batch(paths, prefetch=2)
+        assert next(batch).path == paths[0]
+        batch.close()
+    return True
+
+
+def test_face_processor_config_fallback():
+    """config içe aktarılamazsa face_processor varsayılan ayarlarla çalışmalı"""
+    saved = {name: sys.modules.pop(name) for name in ('config', 'face_processor') if name in sys.modules}
+    sys.modules['config'] = None
+    try:
+        fallback = importlib.import_module('face_processor')
+        assert not fallback.CONFIG_AVAILABLE
+        assert fallback.photo_config.decode_prefetch_workers == 2
+        assert fallback.face_analysis_modules() == ["detection", "recognition", "landmark_2d_106"]
+
+        clear_image_cache()
+        processor = fallback.FaceProcessor.__new__(fallback.FaceProcessor)
+        processor.face_app = _FakeFaceApp()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'foto.png')
+            write_photo(path)
+            results = list(processor.detect_faces_batch([path]))
+            assert len(results) == 1 and results[0].error is None
+    finally:
+        sys.modules.pop('config', None)
+        sys.modules.pop('face_processor', None)
+        sys.modules.update(saved)
+    return True
+
+
+def test_invalid_files_rejected():
+    """Eksik, boş ve desteklenmeyen dosyalar ön kontrolde reddedilir"""
+    clear_image_cache()
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            load_image_frame(os.path.join(directory, 'yok.jpg'))
+            return False
+        except FileNotFoundError:
+            pass
+
+        for name, content in [('bos.jpg', b''), ('belge.txt', b'metin')]:
+            path = os.path.join(directory, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            try:
+                load_image_frame(path)
+                return False
+            except ValueError:
+                pass
+    return True
+
+
+def main():
+    """Ana test fonksiyonu"""
+    tests = [
+        ("Fotoğraf bir kez çözülür", test_frame_is_decoded_once),
+        ("Değişen dosya yeniden çözülür", test_frame_cache_invalidated_on_change),
+        ("Önbellek boyutu sınırlı", test_frame_cache_is_bounded),
+        ("Büyük fotoğraflar tespit için küçültülür", test_detection_view_downscales_large_frames),
+        ("Geçersiz dosyalar reddedilir", test_invalid_files_rejected),
+        ("Toplu tespit sırası ve hataları", test_detect_faces_batch_order_and_errors),
+        ("Config olmadan varsayılan ayarlar", test_face_processor_config_fallback),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+                print(f"✅ {test_name} - BAŞARILI")
+            else:
+                print(f"❌ {test_name} - BAŞARISIZ")
+        except Exception as e:
+            print(f"💥 {test_name} - HATA: {e}")
+
+    print(f"\n📊 TEST SONUÇLARI: {passed}/{len(tests)} test başarılı")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
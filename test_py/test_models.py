@@ -4,10 +4,14 @@ Model Test Dosyası
 Bu dosya ile modellerin doğru yüklenip yüklenmediğini test edebilirsiniz.
 """
 
+import os
 import time
 import sys
 import traceback
 
+# Ana dizini path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 def test_model_loading():
     """Model yükleme sürecini test eder"""
     print("🧪 Model yükleme testi başlatılıyor...")
@@ -72,6 +76,68 @@ def test_model_loading():
         
         return False
 
+def _load_face_analysis(allowed_modules):
+    """FaceAnalysis'i verilen modüllerle yükler; (uygulama, yükleme süresi) döndürür"""
+    import insightface
+    
+    start_time = time.time()
+    face_app = insightface.app.FaceAnalysis(providers=['CPUExecutionProvider'], allowed_modules=allowed_modules)
+    face_app.prepare(ctx_id=0, det_size=(640, 640))
+    return face_app, time.time() - start_time
+
+
+def test_module_comparison(image_path=None, repeats=10):
+    """
+    Tüm buffalo_l paketi ile AIModelConfig.face_analysis_modules'u karşılaştırır
+    Yükleme süresi, model dosyası boyutu (bellekteki ağırlıkların yaklaşığı) ve
+    image_path verilirse fotoğraf başına / yüz başına çıkarım süresi yazdırılır.
+    """
+    print("\n🧪 InsightFace modül karşılaştırması")
+    print("=" * 50)
+    
+    try:
+        import cv2
+        import numpy as np
+        from face_processor import face_analysis_modules
+        
+        image = cv2.imread(image_path) if image_path else None
+        if image_path and image is None:
+            print(f"   ⚠️  Fotoğraf okunamadı: {image_path}")
+        if image is None:
+            image = np.zeros((640, 640, 3), dtype=np.uint8)
+            print("   ℹ️  Fotoğraf verilmedi; yüz başına süre ölçülemez (python test_models.py <foto>)")
+        
+        results = []
+        for label, modules in [("Tüm paket", None), ("Seçili modüller", face_analysis_modules())]:
+            face_app, load_time = _load_face_analysis(modules)
+            weights_mb = sum(os.path.getsize(m.model_file) for m in face_app.models.values()) / 1024 / 1024
+            
+            face_app.get(image)  # Isınma
+            start_time = time.time()
+            for _ in range(repeats):
+                faces = face_app.get(image)
+            per_photo_ms = (time.time() - start_time) / repeats * 1000
+            results.append((label, list(face_app.models), load_time, weights_mb, per_photo_ms, len(faces)))
+            del face_app
+        
+        for label, models, load_time, weights_mb, per_photo_ms, face_count in results:
+            print(f"\n   {label}: {', '.join(models)}")
+            print(f"   ⏱️  Yükleme: {load_time:.2f}s | Model ağırlıkları: {weights_mb:.0f}MB")
+            line = f"   ⚡ Fotoğraf başına: {per_photo_ms:.1f}ms"
+            if face_count:
+                line += f" | Yüz başına: {per_photo_ms / face_count:.1f}ms ({face_count} yüz)"
+            print(line)
+        
+        (_, _, full_load, full_mb, full_ms, _), (_, _, load, mb, ms, _) = results
+        print(f"\n   📉 Kazanç: yükleme %{(1 - load / full_load) * 100:.0f}, "
+              f"ağırlık %{(1 - mb / full_mb) * 100:.0f}, çıkarım %{(1 - ms / full_ms) * 100:.0f}")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Karşılaştırma başarısız: {e}")
+        traceback.print_exc()
+        return False
+
 def main():
     """Ana test fonksiyonu"""
     print("🎓 Yüz Tanıma Sistemi - Model Test")
@@ -81,6 +147,7 @@ def main():
     success = test_model_loading()
     
     if success:
+        test_module_comparison(sys.argv[1] if len(sys.argv) > 1 else None)
         print("\n✅ Test başarılı! Ana uygulamayı çalıştırabilirsiniz:")
         print("   python main.py")
     else:
@@ -91,14 +91,18 @@ class RecognitionPerformanceTester:
                 print(f"⚠️  Test fotoğrafı bulunamadı: {person_name}")
                 continue
             
-            # Her test fotoğrafı için
-            for test_photo in test_photos:
+            # Her test fotoğrafı için (sonraki fotoğraflar tespit sırasında önceden çözülür)
+            for result in self.face_processor.detect_faces_batch(test_photos):
+                test_photo = result.path
                 total_tests += 1
                 print(f"\n🔍 Test fotoğrafı: {os.path.basename(test_photo)}")
                 
                 try:
+                    if result.error is not None:
+                        raise result.error
+                    
                     # Test fotoğrafından embedding çıkar
-                    test_faces = self.face_processor.detect_faces(test_photo)
+                    test_faces = result.faces
                     if not test_faces:
                         print("❌ Yüz bulunamadı")
                         continue
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+SQLite Veritabanı Test Scripti
+DatabaseManager'ın SQL Server olmadan (db_type = "sqlite", WAL) aynı public metotlarla çalıştığını doğrular
+"""
+
+import sys
+import os
+import pickle
+import sqlite3
+import tempfile
+import numpy as np
+
+# Ana dizini path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from database import DatabaseManager
+from schema_migrations import LATEST_VERSION
+from quality_statistics import add_quality_buckets, collect_quality_buckets, remove_quality_buckets
+
+
+def create_sqlite_manager(directory):
+    """Geçici dizinde SQLite DatabaseManager oluşturur"""
+    os.environ['DB_TYPE'] = 'sqlite'
+    os.environ['DB_PATH'] = os.path.join(directory, 'test.db')
+    try:
+        db_manager = DatabaseManager()
+    finally:
+        del os.environ['DB_TYPE']
+        del os.environ['DB_PATH']
+    db_manager.connection_params['backup_directory'] = os.path.join(directory, 'backups')
+    db_manager.embedding_cache.use_snapshot = False
+    return db_manager
+
+
+def create_photos(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(rng.normal(size=512).astype(np.float32), f"foto_{i}.jpg", 0.85, {'overall_quality': 0.85}, "rapor")
+            for i in range(count)]
+
+
+def test_sqlite_registration_and_gallery():
+    """Toplu kayıt, galeri, sınıflar ve silme SQLite üzerinde çalışmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            with db_manager.get_connection() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+
+            photos = create_photos(4)
+            student_pk = db_manager.register_student_bulk("Ayşe", "S100", "10-B", photos)
+            other_pk = db_manager.add_student("Mehmet", "S200", "9-A")
+            db_manager.add_face_embedding(other_pk, np.ones(512, dtype=np.float32), "m.jpg", 0.7)
+
+            assert db_manager.get_all_students() == [("S100", "Ayşe", "10-B", 4), ("S200", "Mehmet", "9-A", 1)]
+            assert db_manager.get_student_classes() == ["10-B", "9-A"]
+
+            gallery = db_manager.get_gallery()
+            assert len(gallery) == 5 and gallery.student_ids.tolist().count(student_pk) == 4
+            assert np.allclose(gallery.matrix[0], photos[0][0] / np.linalg.norm(photos[0][0]), atol=1e-6)
+            assert len(db_manager.get_gallery(["9-A"])) == 1
+
+            try:
+                db_manager.register_student_bulk("Ayşe", "S100", "10-B", create_photos(2))
+                assert False, "Aynı öğrenci ID'si reddedilmeliydi"
+            except ValueError:
+                pass
+            assert db_manager.get_student_photo_count("S100") == 4
+
+            assert db_manager.delete_student("S200")
+            assert len(db_manager.get_gallery()) == 4
+            assert db_manager.backup_database()
+            assert len(os.listdir(os.path.join(temp_dir, 'backups'))) == 1
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_sqlite_bulk_insert_returns_ids():
+    """Toplu kayıtta kalite satırları doğru fotoğrafa bağlanır; kalite dilimi taramayla aynıdır"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            db_manager.register_student_bulk("A", "S1", "9-A", create_photos(1))
+            photos = [(embedding, path, 0.5 + 0.1 * i, details, f"rapor {path}")
+                      for i, (embedding, path, _, details, _) in enumerate(create_photos(5, seed=3))]
+            # Yinelenen fotoğraf yolları tek tek eklemeye düşer
+            duplicate_photos = [photo[:1] + ("ayni.jpg",) + photo[2:] for photo in photos[:3]]
+            for student_id, student_photos in (("S2", photos), ("S3", duplicate_photos)):
+                student_pk = db_manager.register_student_bulk("B", student_id, "9-A", student_photos)
+                with db_manager.get_connection() as conn:
+                    linked = conn.execute(text('''
+                        SELECT f.photo_path, f.quality_score, q.quality_report
+                        FROM face_embeddings f
+                        INNER JOIN face_embedding_quality q ON q.embedding_id = f.id
+                        WHERE f.student_id = :student_id
+                        ORDER BY f.id
+                    '''), {'student_id': student_pk}).fetchall()
+                assert [tuple(row) for row in linked] == [photo[1:3] + photo[4:] for photo in student_photos]
+                assert db_manager.get_student_photo_count(student_id) == len(student_photos)
+
+            with db_manager.get_connection() as conn:
+                stored = conn.execute(text('''
+                    SELECT student_class, stat_date, photo_count, quality_sum, min_quality, max_quality,
+                           excellent_count, good_count, poor_count
+                    FROM quality_statistics
+                ''')).fetchall()
+                scanned = collect_quality_buckets(conn, db_manager.dialect, "1 = 1", {})
+            assert len(stored) == len(scanned) == 1
+            assert stored[0][:3] == scanned[0][:3] and stored[0][6:] == scanned[0][6:]
+            assert np.allclose(stored[0][3:6], scanned[0][3:6])
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_sqlite_embedding_ids_not_reused():
+    """Silinen en son embedding'in id'si yeniden kullanılmamalı (önbellek filigranı)"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            db_manager.register_student_bulk("A", "S1", "9-A", create_photos(2))
+            db_manager.register_student_bulk("B", "S2", "9-A", create_photos(2, seed=1))
+            db_manager.get_gallery()
+            watermark = db_manager.embedding_cache.watermark
+
+            db_manager.delete_student("S2")
+            db_manager.register_student_bulk("C", "S3", "9-A", create_photos(1, seed=2))
+            blobs = db_manager.get_embedding_blobs_after(watermark, 10)
+            assert len(blobs) == 1 and blobs[0][0] > watermark
+            assert len(db_manager.get_gallery()) == 3
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_sqlite_streaming_embeddings():
+    """Parça parça okunan embedding'ler tek seferlik okumayla aynı olmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            photos = create_photos(5)
+            db_manager.register_student_bulk("A", "S1", "9-A", photos[:3])
+            db_manager.register_student_bulk("B", "S2", None, photos[3:])
+
+            chunks = list(db_manager.iter_embedding_chunks(chunk_size=2))
+            assert [len(chunk.row_ids) for chunk in chunks] == [2, 2, 1]
+
+            rows = db_manager.get_embedding_arrays_since(0, chunk_size=2)
+            assert rows.matrix.shape == (5, 512) and rows.matrix.flags['C_CONTIGUOUS']
+            assert np.array_equal(rows.matrix, np.vstack([chunk.matrix for chunk in chunks]))
+            assert np.array_equal(rows.matrix, np.vstack([photo[0] for photo in photos]))
+            assert rows.student_classes.tolist() == ["9-A"] * 3 + [None] * 2
+
+            records = db_manager.get_embeddings_since(int(rows.row_ids[1]))
+            assert [record[0] for record in records] == rows.row_ids[2:].tolist()
+            assert len(db_manager.get_embedding_arrays_since(int(rows.row_ids.max())).row_ids) == 0
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_sqlite_embedding_change_feed():
+    """Bir yöneticideki kayıt/silme, aynı dosyayı kullanan diğerine değişiklik akışıyla yansımalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = create_sqlite_manager(temp_dir)
+        reader = create_sqlite_manager(temp_dir)
+        try:
+            writer.register_student_bulk("A", "S1", "9-A", create_photos(2))
+            writer.register_student_bulk("B", "S2", "9-A", create_photos(3, seed=1))
+            assert len(reader.get_gallery()) == 5
+            token = reader.embedding_cache.change_token
+
+            assert writer.delete_student("S1")
+            student_pk = writer.register_student_bulk("C", "S3", "9-B", create_photos(1, seed=2))
+
+            changes = reader.get_embedding_changes(str(token))
+            assert len(changes.deleted_ids) == 2 and set(changes.deleted_student_ids) == {1}
+            assert changes.inserted.student_ids.tolist() == [student_pk]
+
+            gallery = reader.embedding_cache.refresh()
+            assert len(gallery) == 4 and 1 not in gallery.student_ids
+            assert reader.embedding_cache.change_token == changes.token
+
+            empty = reader.get_embedding_changes(changes.token)
+            assert len(empty.inserted.row_ids) == 0 and len(empty.deleted_ids) == 0
+
+            # Commit'i bekleyen bir id varmış gibi sınır verilirse filigran onun altında kalır
+            writer.register_student_bulk("D", "S4", "9-B", create_photos(3, seed=3))
+            first_new = changes.token.embedding_id + 1
+            reader.dialect.change_feed_bound_sql = lambda table: "SELECT :last_id + 2"
+            bounded = reader.get_embedding_changes(changes.token)
+            assert bounded.inserted.row_ids.tolist() == [first_new] and bounded.token.embedding_id == first_new
+            del reader.dialect.change_feed_bound_sql
+            rest = reader.get_embedding_changes(bounded.token)
+            assert rest.inserted.row_ids.tolist() == [first_new + 1, first_new + 2]
+        finally:
+            writer.close()
+            reader.close()
+    return True
+
+
+def test_sqlite_tombstone_pruning():
+    """Eski silme kayıtları temizlenmeli; temizlenen aralığı kaçıran okuyucu önbelleği baştan kurmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = create_sqlite_manager(temp_dir)
+        reader = create_sqlite_manager(temp_dir)
+        try:
+            for index in range(4):
+                writer.register_student_bulk(f"Ö{index}", f"S{index}", "9-A", create_photos(1, seed=index))
+            assert len(reader.get_gallery()) == 4
+            stale_token = reader.embedding_cache.change_token
+
+            assert writer.delete_student("S0") and writer.delete_student("S1")
+            with writer.get_connection() as conn:
+                conn.execute(text("UPDATE embedding_tombstones SET deleted_at = '2000-01-01 00:00:00'"))
+                conn.commit()
+            # En yeni kayıt her zaman tutulur
+            assert writer.prune_embedding_tombstones(retention_days=30) == 1
+            assert writer.prune_embedding_tombstones(retention_days=30) == 0
+
+            changes = reader.get_embedding_changes(stale_token)
+            assert changes.reset and len(changes.inserted.row_ids) == 2
+            gallery = reader.embedding_cache.refresh()
+            assert sorted(set(gallery.student_ids.tolist())) == [3, 4]
+            assert not reader.get_embedding_changes(reader.embedding_cache.change_token).reset
+        finally:
+            writer.close()
+            reader.close()
+    return True
+
+
+def test_sqlite_schema_migrations():
+    """Göçler bir kez uygulanmalı, eski şemalar yükseltilmeli ve öğrenci sorguları index kullanmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Sürüm tablosundan önceki bir veritabanı (student_class alanı da yok)
+        legacy = sqlite3.connect(os.path.join(temp_dir, 'test.db'))
+        legacy.execute("CREATE TABLE students (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                       "student_id TEXT UNIQUE NOT NULL, photo_count INTEGER DEFAULT 0)")
+        legacy.execute("INSERT INTO students (name, student_id) VALUES ('Eski', 'S0')")
+        legacy.commit()
+        legacy.close()
+
+        db_manager = create_sqlite_manager(temp_dir)
+        second = create_sqlite_manager(temp_dir)
+        try:
+            assert db_manager.schema_version == LATEST_VERSION == second.schema_version
+            with db_manager.get_connection() as conn:
+                versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_version ORDER BY version"))]
+                assert versions == list(range(1, LATEST_VERSION + 1)), "Göçler yalnızca bir kez uygulanmalı"
+
+                plan = conn.execute(text(
+                    "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM face_embeddings WHERE student_id = 1"
+                )).fetchall()
+                assert any('ix_face_embeddings_student_id' in str(row) for row in plan)
+
+                # Kalite kolonları temel şemada yok; göç 3 taşınacak veri olmadan atlanır
+                assert not db_manager.dialect.column_exists(conn, 'face_embeddings', 'quality_details')
+                assert not db_manager.dialect.column_exists(conn, 'face_embeddings', 'quality_report')
+
+            assert db_manager.get_all_students() == [("S0", "Eski", None, 0)]
+            db_manager.add_student("Yeni", "S1", "9-A")
+            assert db_manager.get_student_classes() == ["9-A"]
+        finally:
+            db_manager.close()
+            second.close()
+    return True
+
+
+def test_sqlite_quality_side_table():
+    """Kalite JSON'u yan tabloda tutulmalı, eski satırlar taşınmalı ve raporda okunmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Kalite alanları face_embeddings içinde olan eski bir veritabanı
+        legacy = sqlite3.connect(os.path.join(temp_dir, 'test.db'))
+        legacy.execute("CREATE TABLE students (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                       "student_id TEXT UNIQUE NOT NULL, student_class TEXT, photo_count INTEGER DEFAULT 0)")
+        legacy.execute("CREATE TABLE face_embeddings (id INTEGER PRIMARY KEY AUTOINCREMENT, student_id INTEGER, "
+                       "embedding BLOB NOT NULL, photo_path TEXT, quality_score REAL, quality_details TEXT, "
+                       "quality_report TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP)")
+        legacy.execute("INSERT INTO students (name, student_id, photo_count) VALUES ('Eski', 'S0', 1)")
+        legacy.execute("INSERT INTO face_embeddings (student_id, embedding, photo_path, quality_score, "
+                       "quality_details, quality_report) VALUES (1, ?, 'eski.jpg', 0.7, ?, 'eski rapor')",
+                       (pickle.dumps(create_photos(1)[0][0]), '{\n  "overall_quality": 0.7\n}'))
+        legacy.commit()
+        legacy.close()
+
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            with db_manager.get_connection() as conn:
+                columns = [row[1] for row in conn.execute(text("PRAGMA table_info(face_embeddings)"))]
+                assert 'quality_details' not in columns and 'quality_report' not in columns
+
+            report = db_manager.get_student_quality_report("S0")
+            assert report[0]['quality_details'] == {'overall_quality': 0.7}
+            assert report[0]['quality_report'] == "eski rapor"
+            assert len(db_manager.get_gallery()) == 1
+            assert db_manager.get_quality_statistics()['average_quality'] == 0.7, "Göç istatistikleri doldurmalı"
+            # Blob göçünden sonra başlıksız (pickle) blob'lar yapılandırmayla reddedilir
+            db_manager.connection_params['allow_legacy_pickle_blobs'] = False
+            try:
+                db_manager.get_embedding_arrays_since(0)
+                assert False, "Eski pickle blob'u reddedilmeli"
+            except ValueError:
+                pass
+            db_manager.connection_params['allow_legacy_pickle_blobs'] = True
+
+            db_manager.register_student_bulk("Ayşe", "S1", "9-A", create_photos(2))
+            db_manager.add_face_embedding(db_manager.get_student_by_id("S1")[0], np.ones(512, dtype=np.float32),
+                                          "tek.jpg", 0.9, {'overall_quality': 0.9}, "tek rapor")
+            reports = db_manager.get_student_quality_report("S1")
+            assert len(reports) == 3
+            assert sorted(r['quality_report'] for r in reports) == ["rapor", "rapor", "tek rapor"]
+            assert all(r['quality_details']['overall_quality'] in (0.85, 0.9) for r in reports)
+
+            assert db_manager.delete_student("S1")
+            with db_manager.get_connection() as conn:
+                assert conn.execute(text("SELECT COUNT(*) FROM face_embedding_quality")).scalar() == 1
+        finally:
+            db_manager.close()
+    return True
+
+
+def _scan_quality_statistics(db_manager):
+    """Karşılaştırma için istatistikleri face_embeddings'i tarayarak hesaplar"""
+    with db_manager.get_connection() as conn:
+        scores = [row[0] for row in conn.execute(text(
+            "SELECT quality_score FROM face_embeddings WHERE quality_score IS NOT NULL"
+        ))]
+    return (len(scores), round(sum(scores) / len(scores), 3), round(min(scores), 3), round(max(scores), 3),
+            sum(q >= 0.80 for q in scores), sum(0.60 <= q < 0.80 for q in scores), sum(q < 0.60 for q in scores))
+
+
+def test_sqlite_quality_statistics():
+    """Aggregate kalite istatistikleri her ekleme/silmede tam taramayla aynı kalmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            def photos(scores, seed):
+                return [(p[0], p[1], score, None, None) for p, score in zip(create_photos(len(scores), seed), scores)]
+
+            db_manager.register_student_bulk("A", "S1", "9-A", photos([0.95, 0.55], 0))
+            db_manager.register_student_bulk("B", "S2", "9-A", photos([0.70, 0.82], 1))
+            db_manager.register_student_bulk("C", "S3", None, photos([0.40, 0.65, 0.90], 2))
+            db_manager.add_face_embedding(db_manager.get_student_by_id("S2")[0], np.ones(512, dtype=np.float32),
+                                          "ek.jpg", 0.61)
+
+            for deleted in (None, "S1", "S3"):
+                if deleted:
+                    # S1 en yüksek, S3 en düşük kaliteyi taşır: dilim sınırları yeniden hesaplanmalı
+                    assert db_manager.delete_student(deleted)
+                stats = db_manager.get_quality_statistics()
+                assert (stats['total_photos'], stats['average_quality'], stats['min_quality'], stats['max_quality'],
+                        stats['excellent_photos'], stats['good_photos'], stats['poor_photos']) == \
+                    _scan_quality_statistics(db_manager)
+
+            by_class = db_manager.get_quality_statistics_breakdown("student_class")
+            assert [(row['student_class'], row['total_photos']) for row in by_class] == [("9-A", 3)]
+            by_day = db_manager.get_quality_statistics_breakdown("stat_date")
+            assert len(by_day) == 1 and by_day[0]['total_photos'] == 3
+            assert db_manager.get_quality_statistics("9-B")['total_photos'] == 0
+
+            assert db_manager.delete_student("S2")
+            assert db_manager.get_quality_statistics()['total_photos'] == 0
+            assert db_manager.get_quality_statistics_breakdown() == []
+
+            # Aynı yeni dilime iki katkı: ikincisi INSERT hatası yerine tek upsert ile birleşir
+            with db_manager.get_connection() as conn:
+                add_quality_buckets(conn, db_manager.dialect, [("10-C", "2026-09-01", 2, 1.5, 0.70, 0.80, 1, 1, 0)])
+                add_quality_buckets(conn, db_manager.dialect, [("10-C", "2026-09-01", 1, 0.5, 0.50, 0.50, 0, 0, 1)])
+                conn.commit()
+            stats = db_manager.get_quality_statistics("10-C")
+            assert (stats['total_photos'], stats['min_quality'], stats['max_quality'],
+                    stats['excellent_photos'], stats['good_photos'], stats['poor_photos']) == (3, 0.5, 0.8, 1, 1, 1)
+
+            # Çıkarma göreli yapılır: sınır değer silinmediyse min/max korunur, sayaçlar azalır
+            with db_manager.get_connection() as conn:
+                remove_quality_buckets(conn, db_manager.dialect, [("10-C", "2026-09-01", 1, 0.75, 0.75, 0.75, 0, 1, 0)])
+                conn.commit()
+            stats = db_manager.get_quality_statistics("10-C")
+            assert (stats['total_photos'], stats['average_quality'], stats['min_quality'], stats['max_quality'],
+                    stats['excellent_photos'], stats['good_photos'], stats['poor_photos']) == (2, 0.625, 0.5, 0.8, 1, 0, 1)
+            with db_manager.get_connection() as conn:
+                remove_quality_buckets(conn, db_manager.dialect, [("10-C", "2026-09-01", 2, 1.25, 0.50, 0.80, 1, 0, 1)])
+                conn.commit()
+            assert db_manager.get_quality_statistics_breakdown() == []
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_sqlite_students_page():
+    """Keyset sayfalama tüm öğrencileri tekrar/atlama olmadan, filtrelerle birlikte döndürmeli"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            names = ["Ali", "Ali", "Ayşe", "Burak", "Can", "Cem", "Deniz", "Ece", "%Yüzde", "Ali_Veli"]
+            for i, name in enumerate(names):
+                db_manager.add_student(name, f"S{i:02d}", "9-A" if i % 2 else "10-B")
+
+            pages, key = [], None
+            while True:
+                students, key = db_manager.get_students_page(after_key=key, limit=3)
+                pages.append(students)
+                if key is None:
+                    break
+            listed = [student for page in pages for student in page]
+            assert sorted(listed) == sorted(db_manager.get_all_students())
+            assert [s[1] for s in listed] == sorted(names) and len({s[0] for s in listed}) == len(names)
+            assert all(len(page) == 3 for page in pages[:-1])
+
+            students, key = db_manager.get_students_page(limit=10, class_filter="9-A")
+            assert key is None and {s[2] for s in students} == {"9-A"} and len(students) == 5
+
+            students, _ = db_manager.get_students_page(limit=10, name_prefix="Ali")
+            assert [s[1] for s in students] == ["Ali", "Ali", "Ali_Veli"]
+            students, _ = db_manager.get_students_page(limit=10, name_prefix="Ali_")
+            assert [s[1] for s in students] == ["Ali_Veli"], "LIKE jokerleri kaçışlanmalı"
+            students, _ = db_manager.get_students_page(limit=10, name_prefix="%")
+            assert [s[1] for s in students] == ["%Yüzde"]
+
+            with db_manager.get_connection() as conn:
+                plan = conn.execute(text(
+                    "EXPLAIN QUERY PLAN SELECT student_id, name, student_class, photo_count FROM students "
+                    "WHERE (name > 'C' OR (name = 'C' AND student_id > 'S00')) ORDER BY name, student_id LIMIT 3"
+                )).fetchall()
+                assert any('ix_students_name_student_id' in str(row) for row in plan)
+        finally:
+            db_manager.close()
+    return True
+
+
+def main():
+    """Ana test fonksiyonu"""
+    tests = [
+        ("SQLite kayıt ve galeri", test_sqlite_registration_and_gallery),
+        ("SQLite toplu kayıtta embedding id'leri", test_sqlite_bulk_insert_returns_ids),
+        ("SQLite embedding id'leri yeniden kullanılmaz", test_sqlite_embedding_ids_not_reused),
+        ("SQLite parça parça embedding okuma", test_sqlite_streaming_embeddings),
+        ("SQLite embedding değişiklik akışı", test_sqlite_embedding_change_feed),
+        ("SQLite silme kayıtlarının temizlenmesi", test_sqlite_tombstone_pruning),
+        ("SQLite şema göçleri ve indeksler", test_sqlite_schema_migrations),
+        ("SQLite kalite yan tablosu", test_sqlite_quality_side_table),
+        ("SQLite artımlı kalite istatistikleri", test_sqlite_quality_statistics),
+        ("SQLite öğrenci listesi sayfalama", test_sqlite_students_page),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+                print(f"✅ {test_name} - BAŞARILI")
+            else:
+                print(f"❌ {test_name} - BAŞARISIZ")
+        except Exception as e:
+            print(f"💥 {test_name} - HATA: {e}")
+
+    print(f"\n📊 TEST SONUÇLARI: {passed}/{len(tests)} test başarılı")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Toplu Kayıt Test Scripti
+enroll_students'ın süreç sonuçlarını öğrencilere doğru dağıttığını ve kalite şartını uyguladığını doğrular
+(modeller yüklenmez; süreç havuzu yerine sahte işleyici kullanılır)
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Ana dizini path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_gallery import EmbeddingGallery
+from face_processor import FaceProcessor
+import worker_farm
+from worker_farm import (DetectionResult, FaceWorkerFarm, PhotoResult, enroll_students, find_student_folders,
+                         recognize_photos)
+from test_sqlite_backend import create_sqlite_manager
+
+
+class _FakeFarm:
+    """Yolu "kotu" içeren fotoğrafları reddeden, sonuçları giriş sırasıyla üreten işleyici"""
+
+    def __init__(self):
+        self.paths = []
+
+    def process(self, image_paths):
+        for path in image_paths:
+            self.paths.append(path)
+            embedding = np.random.default_rng(len(self.paths)).normal(size=512).astype(np.float32)
+            accepted = "kotu" not in path
+            quality = {'overall_quality': 0.9 if accepted else 0.4, 'summary': {}}
+            yield PhotoResult(path, {'embedding': embedding, 'det_score': 0.9}, quality, accepted, None)
+
+
+class _FakeDetectFarm:
+    """Her fotoğraf için önceden verilen yüz embedding'lerini döndüren tanıma işleyicisi"""
+
+    def __init__(self, faces_by_path):
+        self.faces_by_path = faces_by_path
+
+    def detect(self, image_paths):
+        for path in image_paths:
+            if path not in self.faces_by_path:
+                yield DetectionResult(path, [], "Görüntü dosyası bulunamadı")
+                continue
+            yield DetectionResult(path, [{'bbox': np.zeros(4), 'embedding': e, 'det_score': 0.9}
+                                         for e in self.faces_by_path[path]], None)
+
+
+def test_enroll_students_groups_results():
+    """Sonuçlar öğrencilere sırayla dağıtılır; sorunlu fotoğrafı olan öğrenci kaydedilmez"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = create_sqlite_manager(temp_dir)
+        try:
+            students = [
+                ("Ayşe", "S1", "9-A", ["s1_a.jpg", "s1_b.jpg"]),
+                ("Boş", "S0", "9-A", []),
+                ("Can", "S2", "9-A", ["s2_a.jpg", "s2_kotu.jpg", "s2_c.jpg"]),
+                ("Deniz", "S3", "9-B", ["s3_a.jpg"]),
+            ]
+            farm = _FakeFarm()
+            summary = enroll_students(db_manager, students, farm)
+
+            assert farm.paths == ["s1_a.jpg", "s1_b.jpg", "s2_a.jpg", "s2_kotu.jpg", "s2_c.jpg", "s3_a.jpg"]
+            assert summary['registered'] == ["S1", "S3"]
+            assert list(summary['rejected']) == ["S2"] and "s2_kotu.jpg" in summary['rejected']["S2"][0]
+            assert summary['photos'] == 6
+            assert db_manager.get_all_students() == [("S1", "Ayşe", "9-A", 2), ("S3", "Deniz", "9-B", 1)]
+        finally:
+            db_manager.close()
+    return True
+
+
+def test_recognize_photos():
+    """Süreçlerden gelen tüm yüzler ana süreçte galeriyle eşleştirilir"""
+    rng = np.random.default_rng(3)
+    prototypes = rng.normal(size=(3, 512)).astype(np.float32)
+    records = [(pk + 1, f"Öğrenci {pk + 1}", prototypes[pk] + rng.normal(scale=0.1, size=512).astype(np.float32))
+               for pk in range(3) for _ in range(2)]
+    gallery = EmbeddingGallery.from_records(records)
+    matcher = FaceProcessor(load_models=False)
+    assert matcher.face_app is None
+    # GUI ile aynı uyarlanabilir eşik: 5+ yüzlü grup fotoğraflarında daha toleranslı
+    assert matcher.recognition_threshold(5) == 0.25 and matcher.recognition_threshold(3) == 0.55
+
+    farm = _FakeDetectFarm({
+        "tek.jpg": [prototypes[1]],
+        "grup.jpg": [prototypes[2], rng.normal(size=512).astype(np.float32), prototypes[0]],
+        "bos.jpg": [],
+    })
+    results = list(recognize_photos(farm, ["tek.jpg", "grup.jpg", "bos.jpg", "yok.jpg"], gallery, matcher))
+
+    assert [r.path for r in results] == ["tek.jpg", "grup.jpg", "bos.jpg", "yok.jpg"]
+    assert [m and m[0] for m in results[0].matches] == [2]
+    assert [m and m[0] for m in results[1].matches] == [3, None, 1]
+    assert results[2].matches == [] and results[2].error is None
+    assert results[3].error is not None
+    return True
+
+
+def test_find_student_folders():
+    """Alt klasör adları öğrenci no ve ada ayrılır, yalnızca fotoğraflar alınır"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for folder, files in [("102_Ali_Veli", ["2.jpg", "1.PNG", "not.txt"]), ("etiketsiz", ["x.jpg"])]:
+            os.makedirs(os.path.join(temp_dir, folder))
+            for name in files:
+                open(os.path.join(temp_dir, folder, name), 'wb').close()
+
+        students = find_student_folders(temp_dir, "10-C")
+        assert len(students) == 1
+        name, student_id, student_class, paths = students[0]
+        assert (name, student_id, student_class) == ("Ali Veli", "102", "10-C")
+        assert [os.path.basename(p) for p in paths] == ["1.PNG", "2.jpg"]
+    return True
+
+
+def test_worker_count():
+    """İşçi sayısı verilmezse çekirdek sayısı süreç başına iş parçacığına bölünür"""
+    assert FaceWorkerFarm(workers=3, onnx_threads=2).workers == 3
+    cores = os.cpu_count() or 1
+    assert FaceWorkerFarm(workers=0, onnx_threads=2).workers == max(1, cores // 2)
+    assert FaceWorkerFarm(workers=0, onnx_threads=cores * 2).workers == 1
+    return True
+
+
+class _FakeContext:
+    """Havuz oluşturulduğu andaki iş parçacığı ortam değişkenlerini kaydeder"""
+
+    def __init__(self):
+        self.environment = None
+
+    def Pool(self, workers, initializer=None, initargs=()):
+        self.environment = {v: os.environ.get(v) for v in worker_farm.THREAD_LIMIT_VARIABLES}
+        return self
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def test_thread_limits_set_before_spawn():
+    """Sınırlar süreçler başlamadan ortama yazılır ve havuz kapanınca geri alınır"""
+    context = _FakeContext()
+    original_get_context = worker_farm.multiprocessing.get_context
+    before = {v: os.environ.get(v) for v in worker_farm.THREAD_LIMIT_VARIABLES}
+    worker_farm.multiprocessing.get_context = lambda method: context
+    try:
+        with FaceWorkerFarm(workers=2, onnx_threads=3):
+            pass
+    finally:
+        worker_farm.multiprocessing.get_context = original_get_context
+
+    assert context.environment == {v: "3" for v in worker_farm.THREAD_LIMIT_VARIABLES}
+    assert {v: os.environ.get(v) for v in worker_farm.THREAD_LIMIT_VARIABLES} == before
+    return True
+
+
+def main():
+    """Ana test fonksiyonu"""
+    tests = [
+        ("Toplu kayıt sonuç dağıtımı", test_enroll_students_groups_results),
+        ("Toplu tanıma eşleştirmesi", test_recognize_photos),
+        ("Öğrenci klasörleri", test_find_student_folders),
+        ("İşçi süreç sayısı", test_worker_count),
+        ("İş parçacığı sınırları süreçlerden önce", test_thread_limits_set_before_spawn),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+                print(f"✅ {test_name} - BAŞARILI")
+            else:
+                print(f"❌ {test_name} - BAŞARISIZ")
+        except Exception as e:
+            print(f"💥 {test_name} - HATA: {e}")
+
+    print(f"\n📊 TEST SONUÇLARI: {passed}/{len(tests)} test başarılı")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
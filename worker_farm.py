@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+OKULDAN Yüz Tanıma Sistemi - Çok Süreçli Toplu İşleme
+Toplu kayıtta (ör. yıl başı tüm okul) fotoğraflar bir süreç havuzuna dağıtılır. Her süreç
+FaceAnalysis modellerini bir kez yükler, kuyruktan fotoğraf alır (tespit + kalite analizi)
+ve sonucu ana sürece gönderir. Veritabanı yazmaları yalnızca ana süreçte yapılır.
+
+Toplu tanımada süreçler her fotoğraftaki tüm yüzlerin bbox ve embedding'ini döndürür;
+galeriyle eşleştirme (find_best_matches_ranked) ana süreçte yapılır.
+
+Süreç başına ONNX iş parçacığı sınırlanır; varsayılan olarak çekirdek başına bir süreç
+çalışır, böylece verim çekirdek sayısıyla ölçeklenir.
+
+Kullanım:
+    python worker_farm.py <klasör> [--class 9-A] [--workers 0] [--onnx-threads 1]
+    Klasördeki her alt klasör bir öğrencidir: "<öğrenci_no>_<Ad Soyad>/foto1.jpg ..."
+    python worker_farm.py <klasör> --recognize
+    Klasördeki her fotoğraf kayıtlı öğrencilerle eşleştirilir
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from image_frame import load_image_frame
+
+# Config import
+try:
+    from config import get_ai_config
+    ai_config = get_ai_config()
+except ImportError:
+    class DefaultAIConfig:
+        worker_processes = 0
+        worker_onnx_threads = 1
+    ai_config = DefaultAIConfig()
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
+
+# BLAS/OpenMP bu değişkenleri kütüphane yüklenirken okur; spawn edilen süreçler ortamı ana süreçten alır
+THREAD_LIMIT_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+class PhotoResult(NamedTuple):
+    """Bir fotoğrafın süreçte işlenmiş sonucu"""
+    path: str
+    face_data: Optional[Dict]  # En iyi yüz (bbox, landmark, embedding, det_score)
+    quality: Optional[Dict]
+    accepted: bool
+    error: Optional[str]
+
+
+class DetectionResult(NamedTuple):
+    """Tanıma işinin sonucu: fotoğraftaki tüm yüzler (bbox, embedding, det_score)"""
+    path: str
+    faces: List[Dict]
+    error: Optional[str]
+
+
+class RecognitionResult(NamedTuple):
+    """Ana süreçte galeriyle eşleştirilmiş fotoğraf"""
+    path: str
+    faces: List[Dict]
+    matches: List[Optional[Tuple[int, str, float]]]  # Her yüz için (student_id, name, skor) veya None
+    error: Optional[str]
+
+
+# Her süreçte bir kez oluşturulan FaceProcessor
+_processor = None
+
+
+def _init_worker(onnx_threads: int):
+    """Süreç başlangıcı: modelleri bir kez yükler (BLAS/OpenMP sınırları ortamdan gelir)"""
+    global _processor
+    import cv2
+
+    # OpenCV'nin kendi iş parçacığı havuzu ortam değişkenlerini okumaz
+    cv2.setNumThreads(onnx_threads)
+    # Süreçler duygu analizi yapmaz; DeepFace/TensorFlow her süreçte yüklenmesin
+    sys.modules.setdefault('deepface', None)
+
+    # Her fotoğraf süreçte bir kez çözülür; çerçeveleri önbellekte tutmak yalnızca bellek harcar
+    import image_frame
+    image_frame.photo_config.decoded_image_cache_size = 0
+
+    from face_processor import FaceProcessor
+    _processor = FaceProcessor(onnx_threads=onnx_threads)
+
+
+def _process_photo(path: str) -> PhotoResult:
+    """Süreçte tek fotoğrafı işler: tespit, en iyi yüz ve kalite kontrolü"""
+    try:
+        # Görüntü bir kez çözülür, tespit ve kalite analizi aynı çerçeveyi kullanır
+        frame = load_image_frame(path)
+        faces = _processor.detect_faces(frame)
+        if not faces:
+            return PhotoResult(path, None, None, False, "Yüz bulunamadı")
+
+        best_face = max(faces, key=lambda x: x['det_score'])
+        quality = _processor.check_face_quality(frame, best_face['bbox'], best_face.get('landmark'))
+        return PhotoResult(path, best_face, quality, _processor.passes_registration_quality(quality), None)
+    except Exception as e:
+        return PhotoResult(path, None, None, False, str(e))
+
+
+def _detect_photo(path: str) -> DetectionResult:
+    """Süreçte tek fotoğraftaki tüm yüzleri tespit eder (tanıma işi)"""
+    try:
+        faces = _processor.detect_faces(path)
+        # Landmark'lar tanımada kullanılmaz; ana sürece yalnızca gerekli alanlar gönderilir
+        return DetectionResult(path, [{'bbox': face['bbox'], 'embedding': face['embedding'],
+                                       'det_score': face['det_score']} for face in faces], None)
+    except Exception as e:
+        return DetectionResult(path, [], str(e))
+
+
+class FaceWorkerFarm:
+    """
+    FaceAnalysis süreç havuzu
+    with FaceWorkerFarm() as farm:
+        for result in farm.process(paths): ...
+    """
+
+    def __init__(self, workers: Optional[int] = None, onnx_threads: Optional[int] = None):
+        self.onnx_threads = max(1, onnx_threads or getattr(ai_config, 'worker_onnx_threads', 1))
+        workers = workers if workers is not None else getattr(ai_config, 'worker_processes', 0)
+        if workers <= 0:
+            workers = max(1, (os.cpu_count() or 1) // self.onnx_threads)
+        self.workers = workers
+        self._pool = None
+        self._saved_environment = None
+
+    def start(self):
+        """Süreçleri başlatır (modeller her süreçte bir kez yüklenir)"""
+        if self._pool is None:
+            # Sınırlar süreçler başlamadan ana süreç ortamına yazılır (havuz kapanınca geri alınır);
+            # çocuk süreç numpy/cv2'yi içe aktardığında değerler zaten ortamdadır
+            self._saved_environment = {variable: os.environ.get(variable) for variable in THREAD_LIMIT_VARIABLES}
+            os.environ.update({variable: str(self.onnx_threads) for variable in THREAD_LIMIT_VARIABLES})
+            # fork, onnxruntime iş parçacıklarıyla güvenli değil; süreçler spawn ile başlatılır
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self.onnx_threads,))
+            print(f"🏭 {self.workers} işçi süreç başlatıldı (süreç başına {self.onnx_threads} ONNX iş parçacığı)")
+        return self
+
+    def process(self, image_paths: Iterable[str]) -> Iterator[PhotoResult]:
+        """Kayıt işi: fotoğrafları süreçlere dağıtır; sonuçlar hazır oldukça giriş sırasıyla döner"""
+        self.start()
+        return self._pool.imap(_process_photo, image_paths, chunksize=1)
+
+    def detect(self, image_paths: Iterable[str]) -> Iterator[DetectionResult]:
+        """Tanıma işi: her fotoğraftaki tüm yüzler giriş sırasıyla döner"""
+        self.start()
+        return self._pool.imap(_detect_photo, image_paths, chunksize=1)
+
+    def close(self):
+        """Süreçleri kapatır"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._restore_environment()
+
+    def _restore_environment(self):
+        if self._saved_environment is None:
+            return
+        for variable, value in self._saved_environment.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+        self._saved_environment = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self._pool is not None:
+            self._pool.terminate()
+        self.close()
+
+
+def enroll_students(db_manager, students: List[Tuple[str, str, str, List[str]]], farm,
+                    progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Öğrencileri toplu kaydeder
+    Tüm fotoğraflar tek akışta süreçlere dağıtılır; bir öğrencinin son fotoğrafı geldiğinde
+    öğrenci ana süreçte register_student_bulk ile tek işlemde kaydedilir. GUI ile aynı şart
+    geçerlidir: fotoğraflardan biri bile kalite kontrolünden geçemezse öğrenci kaydedilmez.
+    students: [(ad, öğrenci_no, sınıf, [fotoğraf yolları]), ...]
+    farm: process(paths) metodu olan işleyici (FaceWorkerFarm)
+    Returns: {'registered': [...], 'rejected': {öğrenci_no: [neden, ...]}, 'photos': int, 'elapsed': float}
+    """
+    start_time = time.time()
+    summary = {'registered': [], 'rejected': {}, 'photos': 0}
+    students = [student for student in students if student[3]]
+    results = farm.process(path for student in students for path in student[3])
+
+    for name, student_id, student_class, paths in students:
+        photo_results = [next(results) for _ in paths]
+        summary['photos'] += len(photo_results)
+
+        problems = [f"{os.path.basename(r.path)}: {r.error or 'düşük kalite'}" for r in photo_results if not r.accepted]
+        if problems:
+            summary['rejected'][student_id] = problems
+        else:
+            photos = [
+                (r.face_data['embedding'], r.path, r.quality['overall_quality'], r.quality,
+                 db_manager.generate_formatted_quality_report(r.path, r.quality))
+                for r in photo_results
+            ]
+            try:
+                db_manager.register_student_bulk(name, student_id, student_class, photos)
+                summary['registered'].append(student_id)
+            except Exception as e:
+                summary['rejected'][student_id] = [f"Kayıt hatası: {e}"]
+
+        if progress:
+            progress(summary)
+
+    summary['elapsed'] = time.time() - start_time
+    return summary
+
+
+def recognize_photos(farm, image_paths: Iterable[str], gallery, matcher) -> Iterator[RecognitionResult]:
+    """
+    Fotoğrafları toplu tanır
+    Tespit ve embedding süreçlerde, eşleştirme ana süreçte GUI ile aynı kurallarla yapılır:
+    eşik yüz sayısına göre FaceProcessor.recognition_threshold'dan alınır; çoklu yüzde birebir atama.
+    farm: detect(paths) metodu olan işleyici (FaceWorkerFarm)
+    matcher: find_best_matches_ranked sağlayan FaceProcessor (modelsiz: FaceProcessor(load_models=False))
+    """
+    for result in farm.detect(image_paths):
+        if result.error is not None or not result.faces:
+            yield RecognitionResult(result.path, result.faces, [None] * len(result.faces), result.error)
+            continue
+
+        face_count = len(result.faces)
+        matches = matcher.find_best_matches_ranked(
+            [face['embedding'] for face in result.faces], [gallery],
+            threshold=matcher.recognition_threshold(face_count), face_count=face_count,
+            one_to_one=face_count > 1 and matcher.face_assignment_enabled
+        )
+        yield RecognitionResult(result.path, result.faces, matches, None)
+
+
+def find_student_folders(root_directory: str, student_class: str = "") -> List[Tuple[str, str, str, List[str]]]:
+    """Her alt klasörü "<öğrenci_no>_<Ad Soyad>" olarak okuyup enroll_students girdisi üretir"""
+    students = []
+    for folder in sorted(os.listdir(root_directory)):
+        folder_path = os.path.join(root_directory, folder)
+        if not os.path.isdir(folder_path) or "_" not in folder:
+            continue
+        student_id, name = folder.split("_", 1)
+        paths = [os.path.join(folder_path, f) for f in sorted(os.listdir(folder_path))
+                 if f.lower().endswith(PHOTO_EXTENSIONS)]
+        students.append((name.replace("_", " "), student_id, student_class, paths))
+    return students
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Klasördeki öğrencileri çok süreçli olarak toplu kaydeder veya tanır")
+    parser.add_argument("directory", help="Öğrenci alt klasörlerini (kayıt) veya fotoğrafları (tanıma) içeren klasör")
+    parser.add_argument("--class", dest="student_class", default="",
+                        help="Öğrencilerin sınıfı (tanımada yalnızca bu sınıfta aranır)")
+    parser.add_argument("--recognize", action="store_true", help="Kayıt yerine toplu tanıma yap")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı (0 = otomatik)")
+    parser.add_argument("--onnx-threads", type=int, default=None, help="Süreç başına ONNX iş parçacığı")
+    args = parser.parse_args()
+
+    from database import DatabaseManager
+
+    db_manager = DatabaseManager()
+
+    if args.recognize:
+        from face_processor import FaceProcessor
+
+        gallery = db_manager.get_gallery([args.student_class] if args.student_class else None)
+        photos = [os.path.join(args.directory, f) for f in sorted(os.listdir(args.directory))
+                  if f.lower().endswith(PHOTO_EXTENSIONS)]
+        print("🔍 TOPLU TANIMA")
+        print("=" * 50)
+        print(f"{len(photos)} fotoğraf, galeride {len(gallery)} embedding")
+
+        start_time = time.time()
+        matcher = FaceProcessor(load_models=False)
+        with FaceWorkerFarm(args.workers, args.onnx_threads) as farm:
+            for result in recognize_photos(farm, photos, gallery, matcher):
+                if result.error:
+                    print(f"❌ {os.path.basename(result.path)}: {result.error}")
+                    continue
+                names = [f"{m[1]} (%{m[2] * 100:.0f})" if m else "Tanınmadı" for m in result.matches]
+                print(f"📸 {os.path.basename(result.path)}: {len(result.faces)} yüz → {', '.join(names) or '-'}")
+        elapsed = time.time() - start_time
+        print(f"✅ Tamamlandı: {len(photos)} fotoğraf ({elapsed:.1f}s, {len(photos) / max(elapsed, 1e-9):.1f} fotoğraf/s)")
+        db_manager.close()
+        sys.exit(0)
+
+    students = find_student_folders(args.directory, args.student_class)
+    print("🏫 TOPLU ÖĞRENCİ KAYDI")
+    print("=" * 50)
+    print(f"{len(students)} öğrenci, {sum(len(s[3]) for s in students)} fotoğraf")
+
+    with FaceWorkerFarm(args.workers, args.onnx_threads) as farm:
+        result = enroll_students(
+            db_manager, students, farm,
+            progress=lambda s: print(f"   {len(s['registered'])} kaydedildi, {len(s['rejected'])} reddedildi "
+                                     f"({s['photos']} fotoğraf)")
+        )
+
+    for student_id, problems in result['rejected'].items():
+        print(f"❌ {student_id}: {'; '.join(problems)}")
+    print(f"✅ Tamamlandı: {len(result['registered'])} öğrenci kaydedildi, {len(result['rejected'])} reddedildi "
+          f"({result['photos']} fotoğraf, {result['elapsed']:.1f}s, "
+          f"{result['photos'] / max(result['elapsed'], 1e-9):.1f} fotoğraf/s)")
+    db_manager.close()